@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -25,6 +27,139 @@ class Settings(BaseSettings):
 
     GOOGLE_API_KEY: str
     BASE_URL: str
+
+    # Upstream HTTP 클라이언트 (deployer :3001, ADK :30080)
+    HTTP_MAX_CONNECTIONS: int = 100           # upstream 별 최대 동시 연결 수
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20  # 유지할 keep-alive 연결 수
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0       # 유휴 keep-alive 연결 유지 시간(초)
+    HTTP2_ENABLED: bool = False               # True 시 h2 패키지 필요 (pip install httpx[http2])
+    DEPLOYER_TIMEOUT: float = 30.0
+    ADK_TIMEOUT: float = 30.0
+
+    # /agent/execute/stream
+    STREAM_QUEUE_SIZE: int = 64                  # 클라이언트로 보내지 못한 청크 최대 개수 (backpressure)
+    STREAM_DISCONNECT_POLL_INTERVAL: float = 0.5  # upstream 대기 중 연결 종료 확인 주기(초)
+
+    # /agent/execute exact-match 응답 캐시 (opt-in)
+    RESPONSE_CACHE_ENABLED: bool = False
+    RESPONSE_CACHE_TTL: int = 3600                    # 기본 TTL(초)
+    RESPONSE_CACHE_AGENT_TTLS: dict[str, int] = {}    # 에이전트별 TTL(초), 0이면 해당 에이전트는 캐시 안 함
+
+    # /agent/execute semantic 응답 캐시 (opt-in, pgvector)
+    SEMANTIC_CACHE_ENABLED: bool = False
+    SEMANTIC_CACHE_COLLECTION: str = "agent_semantic_cache"
+    SEMANTIC_CACHE_THRESHOLD: float = 0.95                   # 코사인 유사도 임계값
+    SEMANTIC_CACHE_AGENT_THRESHOLDS: dict[str, float] = {}   # 에이전트별 임계값, 1보다 크면 해당 에이전트는 사용 안 함
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 1000                   # 에이전트별 최대 저장 개수
+
+    # 비동기 배포 작업 큐 (/agent/deploy?job=true)
+    DEPLOY_WORKER_CONCURRENCY: int = 4        # 프로세스별 동시 배포 워커 수
+    DEPLOY_JOB_TIMEOUT: float = 300.0         # 작업 모드 deployer 요청 타임아웃(초)
+    DEPLOY_JOB_TTL: int = 86400               # 작업 상태/이벤트 보관 시간(초)
+    DEPLOY_JOB_CLAIM_IDLE_MS: int = 600000    # 이 시간 이상 ACK 되지 않은 작업은 다른 워커가 회수
+    DEPLOY_JOB_STREAM_MAXLEN: int = 10000
+
+    # 예약 배포 스케줄러
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_SYNC_INTERVAL: float = 30.0     # Redis 스케줄 목록 재동기화 주기(초)
+    SCHEDULER_FIRED_LOCK_TTL: int = 3600      # 중복 실행 방지 락 유지 시간(초)
+
+    # MCP 툴 ID → 이름 캐시
+    TOOL_CACHE_TTL: float = 300.0             # 프로세스 내 캐시 TTL(초)
+    TOOL_CACHE_MAX_ENTRIES: int = 10000
+    TOOL_REDIS_TTL: int = 3600                # Redis 캐시 TTL(초)
+
+    # ADK 세션 사전 생성 풀 (0이면 사용 안 함)
+    SESSION_POOL_SIZE: int = 0                        # (user_id, agent) 별 기본 풀 크기
+    SESSION_POOL_AGENT_SIZES: dict[str, int] = {}     # 에이전트별 풀 크기
+    SESSION_POOL_TTL: float = 1800.0                  # 미사용 세션 보관 시간(초)
+    SESSION_POOL_REAP_INTERVAL: float = 60.0
+    SESSION_POOL_REFILL_CONCURRENCY: int = 2
+    SESSION_POOL_REFILL_DELAY: float = 0.05           # 세션 생성 사이 대기(초)
+
+    # 세션 스냅샷/컴팩션
+    SESSION_COMPACTION_ENABLED: bool = False
+    SESSION_COMPACTION_INTERVAL: float = 300.0        # 컴팩터 실행 주기(초)
+    SESSION_COMPACTION_BATCH_SIZE: int = 100          # 주기당 최대 스냅샷 갱신 세션 수
+    SESSION_COMPACTION_SCAN_SIZE: int = 1000          # 후보 조회 한 페이지의 세션 수 (keyset)
+    SESSION_COMPACTION_MAX_PAGES: int = 10            # 주기당 최대 후보 조회 페이지 수
+    SESSION_SNAPSHOT_MIN_EVENTS: int = 200            # 마지막 스냅샷 이후 이벤트가 이 개수 이상이면 스냅샷
+    SESSION_SNAPSHOT_MAX_AGE: int = 86400             # 스냅샷 안 된 이벤트가 이 시간(초)보다 오래되면 스냅샷
+
+    # Gemini 임베딩
+    EMBEDDING_MODEL: str = "gemini-embedding-001"
+    EMBEDDING_OUTPUT_DIMENSIONALITY: Optional[int] = None  # 예: 768/1536 (None이면 모델 기본 3072), 컬렉션 차원과 맞출 것
+    EMBEDDING_BATCH_SIZE: int = 100         # 요청당 최대 텍스트 수 (batchEmbedContents 한도)
+    EMBEDDING_MAX_CONCURRENCY: int = 8      # 동시 요청 상한 (429 발생 시 자동으로 줄였다가 다시 늘림)
+    EMBEDDING_MAX_RETRIES: int = 6          # 429/5xx 재시도 횟수
+    EMBEDDING_BACKOFF_BASE: float = 1.0     # 재시도 대기 기본값(초), 지수 증가 + jitter
+    EMBEDDING_BACKOFF_MAX: float = 60.0
+
+    # PGVector 컬렉션 객체 캐시 (엔진/임베딩은 프로세스 전체 공유)
+    VECTORSTORE_CACHE_SIZE: int = 64
+
+    # PGVector ANN 인덱스 (python -m app.core.db.vector_index)
+    VECTOR_HNSW_M: int = 16
+    VECTOR_HNSW_EF_CONSTRUCTION: int = 64
+    VECTOR_HNSW_EF_SEARCH: int = 40           # 쿼리 기본값, 클수록 recall↑ 지연↑
+    VECTOR_IVFFLAT_PROBES: int = 10           # 쿼리 기본값, 클수록 recall↑ 지연↑
+    VECTOR_INDEX_MAINTENANCE_WORK_MEM: str = "1GB"  # 인덱스 생성 세션 메모리 (그래프가 들어가야 빠름)
+    VECTOR_RESCORE_FACTOR: int = 4            # halfvec/bit 인덱스 검색 시 k * 이 값 만큼 후보를 뽑아 원본 벡터로 재정렬
+
+    # 작은 컬렉션 메모리 벡터 인덱스 (app.core.hot_index)
+    HOT_INDEX_ENABLED: bool = False
+    HOT_INDEX_DIR: str = "data/hot_index"     # 스냅샷(.npy/.json) 저장 위치
+    HOT_INDEX_MAX_ROWS: int = 20000           # 이 청크 수 이하 컬렉션만 메모리 검색
+    HOT_INDEX_CHECK_INTERVAL: float = 30.0    # manifest 변경 확인 주기(초)
+
+    # 하이브리드 검색 (app.core.retrieval)
+    HYBRID_CANDIDATES: int = 20               # 키워드/벡터 검색별 후보 수
+    HYBRID_RRF_K: int = 60                    # RRF 상수 (클수록 하위 순위 영향↑)
+    HYBRID_LEXICAL_ONLY_MAX_CHARS: int = 20   # 이 길이 이하 쿼리는 키워드 결과가 충분하면 임베딩 생략
+
+    # 검색 API (/retrieval)
+    RETRIEVAL_MAX_K: int = 50                 # 요청당 최대 결과 수
+    RETRIEVAL_MAX_BATCH: int = 256            # 배치 요청당 최대 쿼리 수
+    RETRIEVAL_MMR_FETCH_K: int = 20           # MMR 후보 수 (k보다 작으면 k)
+    RETRIEVAL_MMR_LAMBDA: float = 0.5         # 1에 가까울수록 관련도, 0에 가까울수록 다양성
+    RETRIEVAL_ALLOWED_COLLECTIONS: list[str] = []  # 검색 허용 컬렉션 (비어 있으면 RAG_AGENT_COLLECTIONS 의 컬렉션)
+
+    # /agent/execute RAG (app.core.rag)
+    RAG_AGENT_COLLECTIONS: dict[str, str | list[str]] = {}  # 에이전트 이름 → 컬렉션(목록이면 첫 번째가 기본), 요청의 rag_collection 은 이 안에서만 선택
+    RAG_SEARCH_MODE: str = "hybrid"             # hybrid / vector
+    RAG_TOP_K: int = 4
+    RAG_TIMEOUT: float = 0.5                    # 검색 대기 한도(초), 넘으면 컨텍스트 없이 진행 (쿼리 임베딩 왕복 포함)
+    RAG_AGENT_TIMEOUTS: dict[str, float] = {}   # 에이전트별 검색 대기 한도(초)
+    RAG_CACHE_TTL: int = 600                    # (컬렉션, 정규화된 쿼리)별 검색 결과 캐시(초), 0이면 사용 안 함
+    RAG_MAX_CHUNK_CHARS: int = 1500             # 컨텍스트에 넣을 청크당 최대 글자 수
+
+    # 임베딩 캐시 (model + sha256(text) → float32 벡터)
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 2000   # 프로세스 내 LRU 항목 수 (3072차원 기준 항목당 약 12KB)
+    EMBEDDING_CACHE_TTL: int = 2592000        # Redis 보관 기간(초), 기본 30일
+
+    # PDF 파이프라인 적재 (python -m app.core.ingestion_pipeline)
+    INGEST_PARSE_WORKERS: int = 0           # 파싱 프로세스 수 (0이면 CPU 수)
+    INGEST_PAGES_PER_TASK: int = 8          # 프로세스 작업 1건당 페이지 수
+    INGEST_CHUNK_SIZE: int = 500
+    INGEST_CHUNK_OVERLAP: int = 50
+    INGEST_QUEUE_SIZE: int = 1000           # 단계 사이 큐 크기 (청크 수, 메모리 상한)
+    INGEST_EMBED_CONCURRENCY: int = 4       # 동시에 임베딩할 배치 수
+    INGEST_INSERT_BATCH_SIZE: int = 500     # PGVector bulk insert 단위
+    INGEST_INSERT_FLUSH_INTERVAL: float = 2.0  # 이 시간(초) 동안 새 청크가 없으면 덜 찬 버퍼도 저장
+
+    # 적재 시 청크 중복 제거 (app.core.dedup)
+    INGEST_DEDUP_ENABLED: bool = True
+    INGEST_DEDUP_THRESHOLD: float = 0.9     # rapidfuzz ratio(0~1) 이상이면 유사 중복
+    INGEST_DEDUP_MIN_CHARS: int = 50        # 이보다 짧은 청크는 정확 중복만 검사
+    INGEST_DEDUP_MEMORY_MAX_CHUNKS: int = 20000  # 컬렉션별 메모리 인덱스에 둘 대표 청크 수 (LRU, 넘치면 manifest로 확인)
+
+    # 세션 soft delete / 일괄 정리
+    SESSION_PURGE_DELAY_DAYS: int = 7                 # soft delete 후 실제 삭제까지 유예 기간(일)
+    SESSION_REAPER_ENABLED: bool = True
+    SESSION_REAPER_INTERVAL: float = 300.0            # 리퍼 실행 주기(초)
+    SESSION_REAPER_BATCH_SIZE: int = 500              # 한 번에 삭제할 세션 수
+    SESSION_REAPER_MAX_BATCHES: int = 20              # 주기당 최대 배치 수
     
     model_config = SettingsConfigDict(
         env_file=".env", extra="ignore", env_file_encoding="utf-8"
@@ -6,46 +6,92 @@ from typing import AsyncGenerator, Optional
 
 from pydantic import BaseModel
 
+from app.config import settings
+from app.utils.sse import SSEParser
+
 
 class RequestClient:
-    def __init__(self, base_url: str):
+    """
+    upstream 하나(deployer, ADK 등)에 대한 httpx 클라이언트 래퍼
+    - 내부 AsyncClient는 keep-alive 커넥션 풀을 가지며, 앱 lifespan 동안 재사용
+    - start()/close()는 app.main의 lifespan에서 호출, 그 외(스크립트 등)에서는 첫 요청 시 생성
+    """
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 30,
+        limits: Optional[httpx.Limits] = None,
+        http2: bool = False,
+    ):
         self.base_url = base_url
+        self.timeout = timeout
+        self.limits = limits or httpx.Limits()
+        self.http2 = http2
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self.http2,
+            )
+        return self._client
+
+    async def start(self):
+        _ = self.client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     # payload 있으면 post, 없으면 get으로 요청
-    async def post_client(self, url: str, payload: Optional[BaseModel|dict] = None):
-        async with httpx.AsyncClient(timeout=30) as client:
-            if payload: 
-                if isinstance(payload, BaseModel):
-                    payload = payload.model_dump(mode="json")
-                response = await client.post(url, json=payload)
-                response.raise_for_status()
-                return response.json()
-            else:
-                response = await client.get(url)
-                response.raise_for_status()
-                return response.json()
-    
-    async def delete_client(self, url: str):
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.delete(url)
+    # timeout: 요청별 타임아웃(초), None이면 클라이언트 기본값 사용
+    async def post_client(
+        self,
+        url: str,
+        payload: Optional[BaseModel|dict] = None,
+        timeout: Optional[float] = None,
+    ):
+        request_timeout = httpx.USE_CLIENT_DEFAULT if timeout is None else timeout
+        if payload: 
+            if isinstance(payload, BaseModel):
+                payload = payload.model_dump(mode="json")
+            response = await self.client.post(url, json=payload, timeout=request_timeout)
+            response.raise_for_status()
+            return response.json()
+        else:
+            response = await self.client.get(url, timeout=request_timeout)
             response.raise_for_status()
             return response.json()
+    
+    async def delete_client(self, url: str):
+        response = await self.client.delete(url)
+        response.raise_for_status()
+        return response.json()
 
     # 스트리밍 응답 시 사용
     async def stream_chat(self, user_id: str, chat_request: dict) -> AsyncGenerator[str, None]:
-        adk_run_url = f"{self.base_url}:30080/users/{user_id}/run_sse"
+        adk_run_url = f"{self.base_url}/users/{user_id}/run_sse"
+        parser = SSEParser()
         try:
-            async with httpx.AsyncClient(timeout=30) as client:
-                async with client.stream("POST", adk_run_url, json=chat_request) as r:
-                    async for chunk in r.aiter_text():
-                        chunk = chunk.strip()
-                        if not chunk.startswith("data:"):
-                            raise RuntimeError(f"Chat stream failed: {chunk}")
+            async with self.client.stream("POST", adk_run_url, json=chat_request) as r:
+                r.raise_for_status()
+                async for raw in r.aiter_bytes():
+                    for event in parser.feed(raw):
+                        if not event.data:
+                            continue
                         try:
-                            payload = json.loads(chunk[len("data:"):].strip())
+                            payload = json.loads(event.data)
                         except json.JSONDecodeError:
+                            print(f"⚠️ SSE data 파싱 실패: {event.data[:200]}")
                             continue
 
+                        if payload.get("error"):
+                            raise RuntimeError(f"Chat stream failed: {payload['error']}")
+
                         if payload.get("partial") is True:
                             parts = payload.get("content", {}).get("parts", [])
                             for part in parts:
@@ -56,9 +102,35 @@ class RequestClient:
                                 yield f"{json.dumps(payload, ensure_ascii=False)}\n"
 
         except asyncio.CancelledError:
-            raise RuntimeError("Chat stream cancelled by client.")
+            # 클라이언트 연결 종료로 취소된 경우 그대로 전파해야 upstream 스트림이 즉시 닫힘
+            raise
+        except RuntimeError:
+            raise
         except httpx.HTTPError as e:
             raise RuntimeError(f"Chat stream failed: {e}")
         except Exception as e:
             raise RuntimeError(f"Unexpected error in chat stream: {e}")
 
+
+# ===== 공유 클라이언트 (upstream 별 1개) =====
+http_limits = httpx.Limits(
+    max_connections=settings.HTTP_MAX_CONNECTIONS,
+    max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+)
+
+# 에이전트 배포/삭제 (:3001)
+deployer_client = RequestClient(
+    base_url=f"{settings.BASE_URL}:3001",
+    timeout=settings.DEPLOYER_TIMEOUT,
+    limits=http_limits,
+    http2=settings.HTTP2_ENABLED,
+)
+
+# ADK 세션/실행 (:30080)
+adk_client = RequestClient(
+    base_url=f"{settings.BASE_URL}:30080",
+    timeout=settings.ADK_TIMEOUT,
+    limits=http_limits,
+    http2=settings.HTTP2_ENABLED,
+)
@@ -0,0 +1,186 @@
+import base64
+import json
+from datetime import datetime
+from typing import AsyncGenerator, Optional
+from urllib.parse import quote_plus
+
+from google.adk.events import Event
+from google.adk.sessions.database_session_service import StorageEvent, StorageSession
+from sqlalchemy import exists, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import settings
+from app.model.tables import session_tombstones
+
+"""
+비동기(asyncpg) Postgres 엔진
+- 라우트(이벤트 루프)에서 직접 사용하는 조회/갱신용
+- ADK DatabaseSessionService(psycopg2, 동기)는 app.core.db.postgres 참고
+"""
+
+pg_password_quoted = quote_plus(settings.PG_PASSWORD)
+ASYNC_DATABASE_URL = (
+    f"postgresql+asyncpg://{settings.PG_USER}:{pg_password_quoted}@"
+    f"{settings.PG_HOST}:{settings.PG_PORT}/{settings.PG_DB}"
+)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_size=10,
+    max_overflow=20,
+    pool_timeout=30,
+    pool_pre_ping=True,
+    pool_recycle=1800,
+)
+async_session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def dispose_async_engine():
+    await async_engine.dispose()
+
+
+# ===== ADK 세션/이벤트 조회 (비동기) =====
+def to_adk_event(event: StorageEvent) -> Event:
+    """
+    StorageEvent → ADK Event 변환
+    """
+    # actions 필드가 dict가 아니면 dict로 변환
+    if hasattr(event, "actions") and not isinstance(event.actions, dict):
+        try:
+            event.actions = event.actions.dict()
+        except Exception:
+            event.actions = {}
+    return event.to_event()
+
+
+def is_session_deleted(app_name, user_id, session_id):
+    """soft delete(tombstone)된 세션 조건"""
+    t = session_tombstones.c
+    return exists().where(t.app_name == app_name, t.user_id == user_id, t.session_id == session_id)
+
+
+async def aget_sessions(app_name: str, user_id: str):
+    """
+    해당 app/user의 세션 목록 (최근 업데이트 순, soft delete된 세션 제외)
+    """
+    stmt = (
+        select(StorageSession.id, StorageSession.create_time, StorageSession.update_time)
+        .where(StorageSession.app_name == app_name)
+        .where(StorageSession.user_id == user_id)
+        .where(~is_session_deleted(StorageSession.app_name, StorageSession.user_id, StorageSession.id))
+        .order_by(StorageSession.update_time.desc())
+    )
+    async with async_session_factory() as session:
+        return (await session.execute(stmt)).all()
+
+
+def _session_events_stmt(app_name: str, user_id: str, session_id: str):
+    return (
+        select(StorageEvent)
+        .where(StorageEvent.app_name == app_name)
+        .where(StorageEvent.user_id == user_id)
+        .where(StorageEvent.session_id == session_id)
+        .where(~is_session_deleted(app_name, user_id, session_id))
+    )
+
+
+async def aget_events_for_session(app_name: str, user_id: str, session_id: str) -> list[Event]:
+    """
+    특정 세션의 이벤트 목록 (시간 순)
+    """
+    stmt = _session_events_stmt(app_name, user_id, session_id).order_by(
+        StorageEvent.timestamp, StorageEvent.id
+    )
+    async with async_session_factory() as session:
+        results = (await session.scalars(stmt)).all()
+        return [to_adk_event(event) for event in results]
+
+
+# ===== 이벤트 이력 keyset 페이지네이션 =====
+HISTORY_INDEX_NAME = "ix_events_session_timestamp_id"
+HISTORY_INDEX_DDL = text(
+    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {HISTORY_INDEX_NAME} "
+    "ON events (app_name, user_id, session_id, timestamp, id)"
+)
+HISTORY_INDEX_VALID_SQL = text(
+    "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+    "WHERE c.relname = :name AND pg_table_is_visible(c.oid)"
+)
+
+
+async def ensure_history_index():
+    """
+    (app_name, user_id, session_id, timestamp, id) 인덱스 생성
+    - keyset 조회(timestamp, id) > cursor 와 최신 N개(역순 스캔)를 인덱스만으로 처리
+    - events 쓰기를 막지 않도록 CONCURRENTLY 로 생성 (트랜잭션 밖 = AUTOCOMMIT 연결)
+    - 이전 생성이 중단돼 INVALID 로 남은 인덱스는 삭제 후 다시 생성
+    """
+    async with async_engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        valid = await conn.scalar(HISTORY_INDEX_VALID_SQL, {"name": HISTORY_INDEX_NAME})
+        if valid:
+            return
+        if valid is False:
+            await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {HISTORY_INDEX_NAME}"))
+        await conn.execute(HISTORY_INDEX_DDL)
+
+
+def encode_cursor(timestamp: datetime, event_id: str) -> str:
+    raw = json.dumps([timestamp.isoformat(), event_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        timestamp, event_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(timestamp), event_id
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"cursor 형식이 올바르지 않습니다: {cursor}") from e
+
+
+async def astream_events(
+    app_name: str,
+    user_id: str,
+    session_id: str,
+    after: Optional[str] = None,
+    limit: Optional[int] = None,
+    yield_per: int = 200,
+) -> AsyncGenerator[tuple[Event, str], None]:
+    """
+    세션 이벤트를 (timestamp, id) 순서로 하나씩 전달 (이벤트, 해당 이벤트의 cursor)
+    - after: 이전 응답의 cursor, 그 다음 이벤트부터 조회 (keyset, OFFSET 없음)
+    - 서버 사이드 커서 + yield_per 로 전체 결과를 메모리에 올리지 않음
+    """
+    stmt = _session_events_stmt(app_name, user_id, session_id)
+    if after:
+        after_timestamp, after_id = decode_cursor(after)
+        stmt = stmt.where(
+            tuple_(StorageEvent.timestamp, StorageEvent.id) > tuple_(after_timestamp, after_id)
+        )
+    stmt = stmt.order_by(StorageEvent.timestamp, StorageEvent.id)
+    if limit:
+        stmt = stmt.limit(limit)
+
+    async with async_session_factory() as session:
+        result = await session.stream_scalars(stmt.execution_options(yield_per=yield_per))
+        async for event in result:
+            yield to_adk_event(event), encode_cursor(event.timestamp, event.id)
+
+
+async def aget_latest_events(
+    app_name: str, user_id: str, session_id: str, count: int
+) -> list[tuple[Event, str]]:
+    """
+    최신 count개 이벤트를 시간 순으로 반환 (인덱스 역순 스캔 + LIMIT)
+    """
+    stmt = (
+        _session_events_stmt(app_name, user_id, session_id)
+        .order_by(StorageEvent.timestamp.desc(), StorageEvent.id.desc())
+        .limit(count)
+    )
+    async with async_session_factory() as session:
+        results = (await session.scalars(stmt)).all()
+        return [
+            (to_adk_event(event), encode_cursor(event.timestamp, event.id))
+            for event in reversed(results)
+        ]
@@ -1,19 +1,38 @@
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from langchain_core.embeddings import Embeddings
 from langchain_postgres import PGVector
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine
 from sqlalchemy.exc import OperationalError
 
 from app.config import settings
 from app.core.embedding import GeminiEmbeddings
+from app.core.embedding_cache import CachedEmbeddings
 
-def get_vectorstore(collection_name: str) -> PGVector:
-    connection_string =(
-                    f"postgresql+psycopg://{settings.PG_USER}:{settings.PG_PASSWORD}@"
-                    f"{settings.PG_HOST}:{settings.PG_PORT}/{settings.PG_DB}"
-                )
- 
-    try:    
+"""
+PGVector 레지스트리
+- 프로세스 전체에서 엔진(커넥션 풀) 1개, 임베딩 클라이언트 1개를 공유
+- 컬렉션별 PGVector 객체는 LRU로 캐시 (VECTORSTORE_CACHE_SIZE)
+- 종료 시 dispose_vectorstores()로 정리
+"""
+
+_engine: Optional[Engine] = None
+_embeddings: Optional[Embeddings] = None
+_stores: OrderedDict[str, PGVector] = OrderedDict()
+_lock = threading.Lock()  # to_thread 등 여러 스레드에서 호출됨
+
+
+def get_engine() -> Engine:
+    global _engine
+    if _engine is None:
+        connection_string =(
+                        f"postgresql+psycopg://{settings.PG_USER}:{settings.PG_PASSWORD}@"
+                        f"{settings.PG_HOST}:{settings.PG_PORT}/{settings.PG_DB}"
+                    )
         # https://docs.sqlalchemy.org/en/20/errors.html#error-e3q8
-        engine = create_engine(
+        _engine = create_engine(
             connection_string,
             pool_size=10,                    # 기본적으로 유지할 연결의 수를 설정합니다.
             max_overflow=20,                 # 기본 풀 크기를 초과하여 추가로 생성할 수 있는 연결의 수를 설정합니다.
@@ -22,14 +41,46 @@ def get_vectorstore(collection_name: str) -> PGVector:
             pool_recycle=1800,               # 일정 시간(30분) 동안 사용되지 않은 연결을 자동으로 재활용합니다.
             pool_reset_on_return='rollback'  # 연결이 반환될 때 트랜잭션을 롤백하여 일관된 상태를 유지합니다.
         )
+    return _engine
+
+
+def get_embeddings() -> Embeddings:
+    global _embeddings
+    if _embeddings is None:
         embeddings = GeminiEmbeddings(settings.GOOGLE_API_KEY)
+        if settings.EMBEDDING_CACHE_ENABLED:
+            embeddings = CachedEmbeddings(embeddings)
+        _embeddings = embeddings
+    return _embeddings
 
-        vectorstore =  PGVector(
-                        connection=engine,
-                        embeddings=embeddings,
-                        collection_name=collection_name
-                    )
-    except OperationalError as e:
-        print(f"Database connection failed: {e}")
-        raise
-    return vectorstore
\ No newline at end of file
+
+def get_vectorstore(collection_name: str) -> PGVector:
+    with _lock:
+        vectorstore = _stores.get(collection_name)
+        if vectorstore is not None:
+            _stores.move_to_end(collection_name)
+            return vectorstore
+
+        try:
+            vectorstore =  PGVector(
+                            connection=get_engine(),
+                            embeddings=get_embeddings(),
+                            collection_name=collection_name
+                        )
+        except OperationalError as e:
+            print(f"Database connection failed: {e}")
+            raise
+
+        _stores[collection_name] = vectorstore
+        while len(_stores) > settings.VECTORSTORE_CACHE_SIZE:
+            _stores.popitem(last=False)  # 엔진을 공유하므로 객체만 버리면 됨
+        return vectorstore
+
+
+def dispose_vectorstores():
+    global _engine
+    with _lock:
+        _stores.clear()
+        if _engine is not None:
+            _engine.dispose()
+            _engine = None
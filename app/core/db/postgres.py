@@ -3,6 +3,7 @@ from google.adk.sessions.database_session_service import StorageEvent
 from google.adk.sessions.database_session_service import StorageSession
 from google.adk.events import Event
 from app.config import settings
+from app.core.db.async_postgres import to_adk_event
 
 pg_username = settings.PG_USER
 pg_password = settings.PG_PASSWORD
@@ -42,20 +43,10 @@ def get_events_for_session(app_name: str, user_id: str, session_id: str) -> list
             .filter(StorageEvent.app_name == app_name)
             .filter(StorageEvent.user_id == user_id)
             .filter(StorageEvent.session_id == session_id)
-            .order_by(StorageEvent.timestamp)
-            .all()
+            .order_by(StorageEvent.timestamp, StorageEvent.id)
+            .yield_per(500)
         )
-        events: list[Event] = []
-        for event in results:
-            # actions 필드가 dict가 아니면 dict로 변환
-            if hasattr(event, "actions") and not isinstance(event.actions, dict):
-                try:
-                    event.actions = event.actions.dict()
-                except Exception:
-                    event.actions = {}
-            events.append(event.to_event())
-            print(events[-1])
-        return events
+        return [to_adk_event(event) for event in results]
     
     
 if __name__ == "__main__":
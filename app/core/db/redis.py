@@ -1,4 +1,5 @@
 import asyncio
+import redis as sync_redis
 import redis.asyncio as redis
 
 from app.config import settings
@@ -11,6 +12,22 @@ redis_client = redis.Redis(
     decode_responses=True
 )
 
+# 바이너리 값(임베딩 벡터 등) 저장용 클라이언트 (decode 하지 않음)
+redis_binary_client = redis.Redis(
+    host=settings.RD_HOST,
+    port=settings.RD_PORT,
+    password=settings.RD_PASSWORD,
+    decode_responses=False
+)
+
+# 동기 코드 경로(PGVector.add_texts 등)에서 쓰는 바이너리 클라이언트
+sync_redis_binary_client = sync_redis.Redis(
+    host=settings.RD_HOST,
+    port=settings.RD_PORT,
+    password=settings.RD_PASSWORD,
+    decode_responses=False
+)
+
 # Redis 연결 테스트 함수 (비동기)
 async def try_redis_server_connect():
     try:
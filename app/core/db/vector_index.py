@@ -0,0 +1,511 @@
+import argparse
+import json
+import math
+import time
+from typing import Optional
+
+from langchain_core.documents import Document
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.config import settings
+from app.core.db.pgvector import dispose_vectorstores, get_engine
+
+"""
+PGVector 컬렉션별 ANN / 키워드(pg_trgm) 인덱스 관리 + 인덱스를 타는 벡터 검색
+- langchain_pg_embedding.embedding 은 차원 없는 vector 컬럼이라, 컬렉션별 partial 인덱스를
+  (embedding::<type>(dims)) 식 인덱스로 생성 (WHERE collection_id = '<uuid>')
+- vector 타입 HNSW/IVFFlat 한도(2000차원)를 넘으면 halfvec(최대 4000차원)으로 인덱싱
+- 인덱스 설정은 langchain_pg_collection.cmetadata["index"] 에 기록, 검색 시 같은 식으로 정렬해야 인덱스 사용
+- 인덱스 메모리 절약: quantization="halfvec"(절반 크기) / "bit"(binary_quantize, 1/32 크기)
+  → 인덱스로 후보(k * VECTOR_RESCORE_FACTOR)를 뽑고 원본 벡터로 정확한 거리 재계산(re-scoring)
+- 차원 축소 마이그레이션: subvector + l2_normalize (Matryoshka 학습 모델이라 앞부분만 잘라도 유효)
+- 거리: cosine (PGVector 기본값과 동일, 반환 score = cosine distance)
+"""
+
+VECTOR_MAX_INDEX_DIMS = 2000
+HALFVEC_MAX_INDEX_DIMS = 4000
+INDEX_METHODS = ("hnsw", "ivfflat")
+QUANTIZATIONS = ("halfvec", "bit")
+
+
+def _index_name(collection_uuid) -> str:
+    return f"ix_emb_{collection_uuid.hex}"
+
+
+def _vector_type(dims: int) -> str:
+    if dims <= VECTOR_MAX_INDEX_DIMS:
+        return "vector"
+    if dims <= HALFVEC_MAX_INDEX_DIMS:
+        return "halfvec"
+    raise ValueError(f"{dims}차원은 인덱스 가능한 최대 차원({HALFVEC_MAX_INDEX_DIMS})을 넘습니다.")
+
+
+def _vector_literal(embedding: list[float]) -> str:
+    return "[" + ",".join(map(str, embedding)) + "]"
+
+
+def _index_expression(vector_type: str, dims: int, query_vector: str = ":embedding") -> tuple[str, str, str, str]:
+    """
+    (인덱스 식, 연산자 클래스, 거리 연산자, 쿼리 식) — 인덱스 생성과 검색이 같은 식을 써야 인덱스 사용
+    - query_vector: 쿼리 벡터 SQL 식 (바인드 파라미터 또는 배치 검색의 LATERAL 컬럼)
+    """
+    if vector_type == "bit":
+        return (
+            f"(binary_quantize(embedding)::bit({dims}))",
+            "bit_hamming_ops",
+            "<~>",
+            f"binary_quantize(CAST({query_vector} AS vector({dims})))::bit({dims})",
+        )
+    return (
+        f"(embedding::{vector_type}({dims}))",
+        f"{vector_type}_cosine_ops",
+        "<=>",
+        f"CAST({query_vector} AS {vector_type}({dims}))",
+    )
+
+
+def fit_dimensions(embedding: list[float], dims: Optional[int]) -> list[float]:
+    """
+    쿼리 벡터를 컬렉션 차원에 맞춤 (앞부분만 사용 + L2 정규화, 차원 축소 마이그레이션과 같은 방식)
+    """
+    if not dims or len(embedding) <= dims:
+        return embedding
+    head = embedding[:dims]
+    norm = math.sqrt(sum(x * x for x in head))
+    return [x / norm for x in head] if norm else head
+
+
+def get_collection(conn: Connection, collection_name: str):
+    row = conn.execute(
+        text("SELECT uuid, cmetadata FROM langchain_pg_collection WHERE name = :name"),
+        {"name": collection_name},
+    ).first()
+    if row is None:
+        raise ValueError(f"컬렉션이 없습니다: {collection_name}")
+    return row.uuid, dict(row.cmetadata or {})
+
+
+def _set_index_config(conn: Connection, collection_uuid, cmetadata: dict, config: Optional[dict]):
+    cmetadata = dict(cmetadata)
+    if config is None:
+        cmetadata.pop("index", None)
+    else:
+        cmetadata["index"] = config
+    conn.execute(
+        text("UPDATE langchain_pg_collection SET cmetadata = CAST(:cmetadata AS json) WHERE uuid = :uuid"),
+        {"cmetadata": json.dumps(cmetadata), "uuid": collection_uuid},
+    )
+
+
+def _autocommit():
+    # CREATE/DROP INDEX CONCURRENTLY 는 트랜잭션 밖에서 실행해야 함
+    return get_engine().connect().execution_options(isolation_level="AUTOCOMMIT")
+
+
+def create_index(
+    collection_name: str,
+    method: str = "hnsw",
+    dims: Optional[int] = None,
+    m: Optional[int] = None,
+    ef_construction: Optional[int] = None,
+    lists: Optional[int] = None,
+    quantization: Optional[str] = None,
+) -> dict:
+    """
+    컬렉션 partial ANN 인덱스 생성 (이미 있으면 새 인덱스를 만든 뒤 교체 = rebuild)
+    - dims 미지정 시 저장된 벡터에서 확인
+    - quantization: None(차원에 따라 vector/halfvec 자동) / "halfvec" / "bit"
+    - ivfflat lists 미지정 시 행 수 기준 (100만 이하: rows/1000, 초과: sqrt(rows))
+    - 반환: 기록된 인덱스 설정
+    """
+    if method not in INDEX_METHODS:
+        raise ValueError(f"지원하지 않는 인덱스: {method} (가능: {', '.join(INDEX_METHODS)})")
+    if quantization is not None and quantization not in QUANTIZATIONS:
+        raise ValueError(f"지원하지 않는 양자화: {quantization} (가능: {', '.join(QUANTIZATIONS)})")
+
+    with _autocommit() as conn:
+        collection_uuid, cmetadata = get_collection(conn, collection_name)
+        stats = conn.execute(
+            text(
+                "SELECT count(*) AS rows, max(vector_dims(embedding)) AS dims "
+                "FROM langchain_pg_embedding WHERE collection_id = :uuid"
+            ),
+            {"uuid": collection_uuid},
+        ).one()
+        dims = dims or stats.dims
+        if not dims:
+            raise ValueError(f"컬렉션에 벡터가 없어 차원을 알 수 없습니다: {collection_name}")
+        vector_type = quantization or _vector_type(dims)
+        if vector_type == "halfvec" and dims > HALFVEC_MAX_INDEX_DIMS:
+            raise ValueError(f"{dims}차원은 halfvec 인덱스 최대 차원({HALFVEC_MAX_INDEX_DIMS})을 넘습니다.")
+        expression, opclass, _, _ = _index_expression(vector_type, dims)
+
+        config = {"method": method, "dims": dims, "type": vector_type}
+        if method == "hnsw":
+            config["m"] = m or settings.VECTOR_HNSW_M
+            config["ef_construction"] = ef_construction or settings.VECTOR_HNSW_EF_CONSTRUCTION
+            options = f"m = {int(config['m'])}, ef_construction = {int(config['ef_construction'])}"
+        else:
+            rows = stats.rows
+            config["lists"] = lists or max(1, rows // 1000 if rows <= 1_000_000 else int(math.sqrt(rows)))
+            options = f"lists = {int(config['lists'])}"
+
+        index_name = _index_name(collection_uuid)
+        building = f"{index_name}_new"
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {building}"))  # 이전 실패 잔여물
+        conn.execute(text(f"SET maintenance_work_mem = '{settings.VECTOR_INDEX_MAINTENANCE_WORK_MEM}'"))
+        try:
+            # collection_id 는 DB에서 읽은 UUID → 리터럴로 넣어야 partial 인덱스 조건이 고정됨
+            conn.execute(text(
+                f"CREATE INDEX CONCURRENTLY {building} ON langchain_pg_embedding "
+                f"USING {method} ({expression} {opclass}) "
+                f"WITH ({options}) WHERE collection_id = '{collection_uuid}'"
+            ))
+        finally:
+            conn.execute(text("RESET maintenance_work_mem"))  # 풀로 돌아가는 연결에 남지 않도록
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}"))
+        conn.execute(text(f"ALTER INDEX {building} RENAME TO {index_name}"))
+        _set_index_config(conn, collection_uuid, cmetadata, config)
+    return config
+
+
+def drop_index(collection_name: str):
+    with _autocommit() as conn:
+        collection_uuid, cmetadata = get_collection(conn, collection_name)
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {_index_name(collection_uuid)}"))
+        _set_index_config(conn, collection_uuid, cmetadata, None)
+
+
+def create_lexical_index(collection_name: str):
+    """
+    컬렉션 partial pg_trgm GIN 인덱스 생성 (하이브리드 검색의 키워드 검색용, app.core.retrieval)
+    - 문자 단위 trigram이라 형태소 분석 없이 한국어 부분 일치에도 동작 (DB LC_CTYPE 이 UTF-8 계열이어야 함)
+    """
+    with _autocommit() as conn:
+        collection_uuid, _ = get_collection(conn, collection_name)
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conn.execute(text(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_trgm_{collection_uuid.hex} ON langchain_pg_embedding "
+            f"USING gin (document gin_trgm_ops) WHERE collection_id = '{collection_uuid}'"
+        ))
+
+
+def drop_lexical_index(collection_name: str):
+    with _autocommit() as conn:
+        collection_uuid, _ = get_collection(conn, collection_name)
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS ix_trgm_{collection_uuid.hex}"))
+
+
+def get_index_config(collection_name: str) -> Optional[dict]:
+    with get_engine().connect() as conn:
+        _, cmetadata = get_collection(conn, collection_name)
+    return cmetadata.get("index")
+
+
+def rebuild_index(collection_name: str) -> dict:
+    """
+    기록된 설정으로 인덱스 재생성 (대량 적재/삭제 후, ivfflat은 lists를 다시 계산)
+    """
+    config = get_index_config(collection_name)
+    if config is None:
+        raise ValueError(f"인덱스가 없습니다: {collection_name}")
+    return create_index(
+        collection_name,
+        method=config["method"],
+        dims=config["dims"],
+        m=config.get("m"),
+        ef_construction=config.get("ef_construction"),
+        quantization=config["type"] if config["type"] != "vector" else None,
+    )
+
+
+def _filter_clause(
+    params: dict,
+    filter: Optional[dict] = None,
+    page_range: Optional[tuple[Optional[int], Optional[int]]] = None,
+) -> str:
+    """
+    메타데이터 조건 SQL (params 에 바인드 값 추가)
+    - filter: cmetadata 동등 조건 (jsonb @>)
+    - page_range: (시작, 끝) 페이지 (양끝 포함, None이면 해당 방향 제한 없음)
+    """
+    clause = ""
+    if filter:
+        clause += " AND cmetadata @> CAST(:filter AS jsonb)"
+        params["filter"] = json.dumps(filter)
+    page_from, page_to = page_range or (None, None)
+    if page_from is not None:
+        clause += " AND (cmetadata->>'page')::int >= :page_from"
+        params["page_from"] = page_from
+    if page_to is not None:
+        clause += " AND (cmetadata->>'page')::int <= :page_to"
+        params["page_to"] = page_to
+    return clause
+
+
+def _set_search_params(conn: Connection, config: Optional[dict], ef_search: Optional[int], probes: Optional[int]):
+    # 트랜잭션 범위(set_config(..., true))라 풀로 돌아가는 연결에 남지 않음
+    if not config:
+        return
+    if config["method"] == "hnsw":
+        conn.execute(text("SELECT set_config('hnsw.ef_search', :value, true)"),
+                     {"value": str(ef_search or settings.VECTOR_HNSW_EF_SEARCH)})
+    else:
+        conn.execute(text("SELECT set_config('ivfflat.probes', :value, true)"),
+                     {"value": str(probes or settings.VECTOR_IVFFLAT_PROBES)})
+
+
+def _nearest_sql(config: Optional[dict], where: str, query_vector: str, with_embedding: bool = False) -> str:
+    """
+    query_vector 와 가까운 상위 :k 행 (id, document, cmetadata, [vector], distance)
+    - 인덱스가 있으면 인덱스와 같은 식으로 정렬, 양자화 인덱스는 후보(:candidates)를 원본 벡터로 재정렬
+    """
+    columns = "id, document, cmetadata" + (", embedding::text AS vector" if with_embedding else "")
+    exact = f"embedding <=> CAST({query_vector} AS vector)"
+    if not config:
+        return (
+            f"SELECT {columns}, ({exact}) AS distance "
+            f"FROM langchain_pg_embedding WHERE {where} ORDER BY distance LIMIT :k"
+        )
+    expression, _, operator, query = _index_expression(config["type"], int(config["dims"]), query_vector)
+    if config["type"] == "vector":
+        return (
+            f"SELECT {columns}, ({expression} {operator} {query}) AS distance "
+            f"FROM langchain_pg_embedding WHERE {where} ORDER BY distance LIMIT :k"
+        )
+    # 양자화 인덱스로 후보를 넉넉히 뽑고 원본 벡터로 재정렬
+    return (
+        f"SELECT {columns}, ({exact}) AS distance FROM ("
+        f"  SELECT id, document, cmetadata, embedding FROM langchain_pg_embedding "
+        f"  WHERE {where} ORDER BY {expression} {operator} {query} LIMIT :candidates"
+        f") candidates ORDER BY distance LIMIT :k"
+    )
+
+
+def _row_document(row) -> Document:
+    return Document(id=row.id, page_content=row.document, metadata=row.cmetadata or {})
+
+
+def search_by_vector(
+    collection_name: str,
+    embedding: list[float],
+    k: int = 4,
+    filter: Optional[dict] = None,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+    page_range: Optional[tuple[Optional[int], Optional[int]]] = None,
+) -> list[tuple[Document, float]]:
+    """
+    컬렉션 벡터 검색 (인덱스가 있으면 인덱스와 같은 식으로 정렬해 ANN 검색)
+    - ef_search(HNSW) / probes(IVFFlat): 쿼리별 recall/지연 조절, 값이 클수록 정확하지만 느림
+    - filter: cmetadata 동등 조건 (jsonb @>), page_range: (시작, 끝) 페이지
+    - 반환: [(Document, cosine distance)]
+    """
+    with get_engine().begin() as conn:
+        collection_uuid, cmetadata = get_collection(conn, collection_name)
+        config = cmetadata.get("index")
+        dims = config["dims"] if config else cmetadata.get("dimensions")
+        params = {"embedding": _vector_literal(fit_dimensions(embedding, dims)), "k": k,
+                  "candidates": k * settings.VECTOR_RESCORE_FACTOR}
+        where = f"collection_id = '{collection_uuid}'" + _filter_clause(params, filter, page_range)
+        _set_search_params(conn, config, ef_search, probes)
+        rows = conn.execute(text(_nearest_sql(config, where, ":embedding")), params).all()
+
+    return [(_row_document(row), row.distance) for row in rows]
+
+
+def search_by_vectors(
+    collection_name: str,
+    embeddings: list[list[float]],
+    k: int = 4,
+    filter: Optional[dict] = None,
+    page_range: Optional[tuple[Optional[int], Optional[int]]] = None,
+    with_embeddings: bool = False,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+) -> list[list[tuple[Document, float, Optional[list[float]]]]]:
+    """
+    여러 쿼리 벡터를 한 번의 쿼리로 검색 (unnest WITH ORDINALITY + LATERAL, 쿼리별로 인덱스 사용)
+    - with_embeddings: 결과 청크의 저장 벡터도 반환 (MMR 재정렬용)
+    - 반환: 쿼리 순서대로 [(Document, cosine distance, 벡터 또는 None)]
+    """
+    if not embeddings:
+        return []
+    with get_engine().begin() as conn:
+        collection_uuid, cmetadata = get_collection(conn, collection_name)
+        config = cmetadata.get("index")
+        dims = config["dims"] if config else cmetadata.get("dimensions")
+        params = {
+            "embeddings": [_vector_literal(fit_dimensions(embedding, dims)) for embedding in embeddings],
+            "k": k,
+            "candidates": k * settings.VECTOR_RESCORE_FACTOR,
+        }
+        where = f"collection_id = '{collection_uuid}'" + _filter_clause(params, filter, page_range)
+        _set_search_params(conn, config, ef_search, probes)
+        rows = conn.execute(text(
+            f"SELECT q.ord, r.* FROM unnest(CAST(:embeddings AS text[])) WITH ORDINALITY AS q(query_vector, ord) "
+            f"CROSS JOIN LATERAL ({_nearest_sql(config, where, 'q.query_vector', with_embeddings)}) r "
+            f"ORDER BY q.ord, r.distance"
+        ), params).all()
+
+    results: list[list] = [[] for _ in embeddings]
+    for row in rows:
+        vector = json.loads(row.vector) if with_embeddings else None
+        results[row.ord - 1].append((_row_document(row), row.distance, vector))
+    return results
+
+
+def migrate_dimensions(collection_name: str, dims: int, batch_size: int = 5000) -> int:
+    """
+    저장된 벡터를 dims 차원으로 축소 (subvector 앞부분 + l2_normalize), 변경한 행 수 반환
+    - 기존 ANN 인덱스는 식에 차원이 들어가 있어 먼저 삭제하고, 끝나면 같은 설정으로 새 차원에 재생성
+    - id keyset 배치로 나눠 커밋 (긴 트랜잭션/락 방지)
+    - 이후 이 컬렉션에 적재/검색할 때는 EMBEDDING_OUTPUT_DIMENSIONALITY 를 dims 로 맞출 것
+      (검색 쿼리 벡터는 search_by_vector 가 컬렉션 차원에 맞춰 자름)
+    """
+    previous = get_index_config(collection_name)
+    if previous:
+        drop_index(collection_name)
+
+    with get_engine().connect() as conn:
+        collection_uuid, _ = get_collection(conn, collection_name)
+
+    updated, last_id = 0, ""
+    while True:
+        with get_engine().begin() as conn:
+            ids = conn.execute(text(
+                "SELECT id FROM langchain_pg_embedding "
+                "WHERE collection_id = :uuid AND id > :last_id ORDER BY id LIMIT :batch_size"
+            ), {"uuid": collection_uuid, "last_id": last_id, "batch_size": batch_size}).scalars().all()
+            if not ids:
+                break
+            updated += conn.execute(text(
+                "UPDATE langchain_pg_embedding SET embedding = l2_normalize(subvector(embedding, 1, :dims)) "
+                "WHERE id = ANY(:ids) AND vector_dims(embedding) > :dims"
+            ), {"dims": dims, "ids": list(ids)}).rowcount
+            last_id = ids[-1]
+
+    with get_engine().begin() as conn:
+        collection_uuid, cmetadata = get_collection(conn, collection_name)
+        cmetadata["dimensions"] = dims
+        conn.execute(
+            text("UPDATE langchain_pg_collection SET cmetadata = CAST(:cmetadata AS json) WHERE uuid = :uuid"),
+            {"cmetadata": json.dumps(cmetadata), "uuid": collection_uuid},
+        )
+
+    if previous:
+        create_index(
+            collection_name,
+            method=previous["method"],
+            dims=dims,
+            m=previous.get("m"),
+            ef_construction=previous.get("ef_construction"),
+            quantization=previous["type"] if previous["type"] != "vector" else None,
+        )
+    return updated
+
+
+def recall_report(
+    collection_name: str,
+    sample: int = 50,
+    k: int = 10,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+) -> dict:
+    """
+    인덱스 검색 recall@k 측정 (컬렉션에서 sample개 벡터를 쿼리로 사용, 정확한 전체 탐색 결과와 비교)
+    - 반환: recall, ANN/정확 탐색 평균 지연(ms), 인덱스 크기(bytes), 인덱스 설정
+    """
+    with get_engine().connect() as conn:
+        collection_uuid, cmetadata = get_collection(conn, collection_name)
+        queries = conn.execute(text(
+            "SELECT embedding::text FROM langchain_pg_embedding "
+            "WHERE collection_id = :uuid ORDER BY random() LIMIT :sample"
+        ), {"uuid": collection_uuid, "sample": sample}).scalars().all()
+        index_bytes = conn.execute(
+            text("SELECT pg_relation_size(to_regclass(:name))"), {"name": _index_name(collection_uuid)}
+        ).scalar()
+
+    recalls, ann_ms, exact_ms = [], [], []
+    for raw in queries:
+        embedding = json.loads(raw)
+
+        started = time.perf_counter()
+        with get_engine().connect() as conn:
+            exact_ids = set(conn.execute(text(
+                "SELECT id FROM langchain_pg_embedding WHERE collection_id = :uuid "
+                "ORDER BY embedding <=> CAST(:embedding AS vector) LIMIT :k"
+            ), {"uuid": collection_uuid, "embedding": raw, "k": k}).scalars())
+        exact_ms.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        ann_ids = {doc.id for doc, _ in search_by_vector(
+            collection_name, embedding, k=k, ef_search=ef_search, probes=probes
+        )}
+        ann_ms.append((time.perf_counter() - started) * 1000)
+
+        if exact_ids:
+            recalls.append(len(exact_ids & ann_ids) / len(exact_ids))
+
+    return {
+        "collection": collection_name,
+        "index": cmetadata.get("index"),
+        "queries": len(recalls),
+        f"recall@{k}": round(sum(recalls) / len(recalls), 4) if recalls else None,
+        "ann_ms_avg": round(sum(ann_ms) / len(ann_ms), 2) if ann_ms else None,
+        "exact_ms_avg": round(sum(exact_ms) / len(exact_ms), 2) if exact_ms else None,
+        "index_bytes": index_bytes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PGVector 컬렉션 ANN 인덱스 관리 / 차원 축소 / recall 측정")
+    parser.add_argument(
+        "action", choices=["create", "rebuild", "drop", "show", "lexical", "drop-lexical", "migrate", "recall"]
+    )
+    parser.add_argument("collection")
+    parser.add_argument("--method", choices=INDEX_METHODS, default="hnsw")
+    parser.add_argument("--dims", type=int)
+    parser.add_argument("--m", type=int)
+    parser.add_argument("--ef-construction", type=int)
+    parser.add_argument("--lists", type=int)
+    parser.add_argument("--quantization", choices=QUANTIZATIONS, help="인덱스 저장 형식 (기본: 차원에 따라 자동)")
+    parser.add_argument("--sample", type=int, default=50, help="recall 측정 쿼리 수")
+    parser.add_argument("--k", type=int, default=10, help="recall@k")
+    parser.add_argument("--ef-search", type=int)
+    parser.add_argument("--probes", type=int)
+    args = parser.parse_args()
+
+    try:
+        if args.action == "rebuild":
+            print(f"✅ 인덱스 재생성: {args.collection} {rebuild_index(args.collection)}")
+        elif args.action == "create":
+            config = create_index(
+                args.collection, args.method, args.dims, args.m, args.ef_construction, args.lists, args.quantization
+            )
+            print(f"✅ 인덱스 생성: {args.collection} {config}")
+        elif args.action == "lexical":
+            create_lexical_index(args.collection)
+            print(f"✅ 키워드(pg_trgm) 인덱스 생성: {args.collection}")
+        elif args.action == "drop-lexical":
+            drop_lexical_index(args.collection)
+            print(f"🗑️ 키워드(pg_trgm) 인덱스 삭제: {args.collection}")
+        elif args.action == "migrate":
+            if not args.dims:
+                parser.error("migrate 에는 --dims 가 필요합니다.")
+            updated = migrate_dimensions(args.collection, args.dims)
+            print(f"✅ {args.collection}: {updated}건 {args.dims}차원으로 변경 (EMBEDDING_OUTPUT_DIMENSIONALITY={args.dims} 로 맞출 것)")
+        elif args.action == "recall":
+            print(recall_report(args.collection, args.sample, args.k, args.ef_search, args.probes))
+        elif args.action == "drop":
+            drop_index(args.collection)
+            print(f"🗑️ 인덱스 삭제: {args.collection}")
+        else:
+            print(get_index_config(args.collection))
+    finally:
+        dispose_vectorstores()
+
+
+if __name__ == "__main__":
+    main()
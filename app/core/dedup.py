@@ -0,0 +1,220 @@
+import hashlib
+import re
+import unicodedata
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from rapidfuzz import fuzz
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.types import BigInteger
+
+from app.config import settings
+from app.core.db.pgvector import get_engine
+
+"""
+적재 시 청크 중복 제거 (정확 중복 + 유사 중복)
+- 정확 중복: 정규화된 본문(NFKC, 공백 정리, 대소문자 무시)의 sha256
+- 유사 중복: 문자 5-gram MinHash(64) → LSH(16밴드 × 4행, 유사도 약 0.5 이상이 후보) → rapidfuzz ratio 로 확인
+- 같은 실행 안(메모리 인덱스, 최근 INGEST_DEDUP_MEMORY_MAX_CHUNKS 개 LRU)과 컬렉션 전체(ingestion_chunks.content_hash / lsh_bands GIN 인덱스)를 함께 검사
+- 중복 청크는 임베딩/저장하지 않고 manifest에 duplicate_of(대신 저장된 청크ID)로 기록,
+  대표 청크의 cmetadata["duplicates"] 에 출처(chunk_id, source, page)를 남김 (app.core.ingestion.record_manifest)
+- NUM_PERM/BANDS/SHINGLE_SIZE 를 바꾸면 저장된 lsh_bands 와 호환되지 않음
+"""
+
+NUM_PERM = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _permutations() -> tuple[np.ndarray, np.ndarray]:
+    # 프로세스/버전과 무관하게 같은 값이어야 하므로 난수 대신 sha256 으로 생성
+    values = [
+        int.from_bytes(hashlib.sha256(f"minhash:{i}".encode()).digest()[:16], "big")
+        for i in range(NUM_PERM)
+    ]
+    a = np.array([(v >> 64) % ((1 << 61) - 2) + 1 for v in values], dtype=np.uint64)
+    b = np.array([(v & ((1 << 64) - 1)) % ((1 << 61) - 1) for v in values], dtype=np.uint64)
+    return a, b
+
+
+_PERM_A, _PERM_B = _permutations()
+
+CONTENT_MATCH_SQL = text("""
+    SELECT content_hash, coalesce(duplicate_of, chunk_id) AS stored_id
+    FROM ingestion_chunks
+    WHERE collection_name = :collection_name AND content_hash = ANY(:hashes)
+""")
+
+BAND_CANDIDATES_SQL = text("""
+    SELECT DISTINCT coalesce(duplicate_of, chunk_id) AS stored_id, lsh_bands
+    FROM ingestion_chunks
+    WHERE collection_name = :collection_name AND lsh_bands && :bands
+""").bindparams(bindparam("bands", type_=ARRAY(BigInteger)))
+
+DOCUMENTS_SQL = text("SELECT id, document FROM langchain_pg_embedding WHERE id = ANY(:ids)")
+
+
+def normalize_text(value: str) -> str:
+    value = unicodedata.normalize("NFKC", value)
+    return _WHITESPACE.sub(" ", value).strip().casefold()
+
+
+def content_sha256(value: str) -> str:
+    return hashlib.sha256(normalize_text(value).encode("utf-8")).hexdigest()
+
+
+def minhash(normalized: str) -> np.ndarray:
+    """문자 SHINGLE_SIZE-gram MinHash 서명 (NUM_PERM개, uint64)"""
+    shingles = {normalized[i:i + SHINGLE_SIZE] for i in range(max(1, len(normalized) - SHINGLE_SIZE + 1))}
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+    # (a * x + b) mod p — uint64 overflow 는 datasketch 와 같은 방식으로 무시
+    with np.errstate(over="ignore"):
+        permuted = ((hashes[:, None] * _PERM_A + _PERM_B) % _MERSENNE_PRIME) & _MAX_HASH
+    return permuted.min(axis=0)
+
+
+def lsh_bands(signature: np.ndarray) -> list[int]:
+    """밴드별 hash (밴드 번호 포함 → 다른 밴드끼리 충돌 없음, bigint 범위)"""
+    bands = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].astype("<u4").tobytes()
+        digest = hashlib.blake2b(bytes([band]) + rows, digest_size=8).digest()
+        bands.append(int.from_bytes(digest, "big", signed=True))
+    return bands
+
+
+def is_near_duplicate(a: str, b: str, threshold: Optional[float] = None) -> bool:
+    """정규화된 두 본문의 rapidfuzz ratio(0~1)가 임계값 이상인지"""
+    threshold = settings.INGEST_DEDUP_THRESHOLD if threshold is None else threshold
+    return fuzz.ratio(a, b, score_cutoff=threshold * 100) > 0
+
+
+@dataclass(slots=True)
+class DedupMatch:
+    content_hash: str
+    bands: Optional[list[int]] = None  # 짧은 청크는 유사 중복 검사 안 함
+    duplicate_of: Optional[str] = None
+
+
+class ChunkDeduplicator:
+    """
+    컬렉션 하나의 중복 검사기 (같은 실행에서 검사한 청크는 메모리 인덱스로, 이전 적재분은 manifest로 확인)
+    - check() 에서 중복이 아닌 청크는 대표 청크로 등록 → 이후 청크의 비교 대상
+    - 메모리 인덱스는 최근 사용한 INGEST_DEDUP_MEMORY_MAX_CHUNKS 개까지만 유지 (LRU), 밀려난 청크는 manifest 조회로 확인
+    """
+
+    def __init__(self, collection_name: str, max_chunks: Optional[int] = None):
+        self.collection_name = collection_name
+        self.max_chunks = max_chunks or settings.INGEST_DEDUP_MEMORY_MAX_CHUNKS
+        self._exact: dict[str, str] = {}          # content_hash → 저장된 청크ID
+        self._buckets: dict[int, list[str]] = {}  # 밴드 hash → 저장된 청크ID
+        self._texts: dict[str, str] = {}          # 저장된 청크ID → 정규화된 본문
+        self._entries: OrderedDict[str, DedupMatch] = OrderedDict()  # 저장된 청크ID → 등록 정보 (LRU 순서)
+
+    def _register(self, stored_id: str, match: DedupMatch, normalized: str):
+        self._exact.setdefault(match.content_hash, stored_id)
+        if match.bands:
+            for band in match.bands:
+                self._buckets.setdefault(band, []).append(stored_id)
+            self._texts[stored_id] = normalized
+        self._entries[stored_id] = match
+        while len(self._entries) > self.max_chunks:
+            self._evict(*self._entries.popitem(last=False))
+
+    def _evict(self, stored_id: str, match: DedupMatch):
+        if self._exact.get(match.content_hash) == stored_id:
+            del self._exact[match.content_hash]
+        for band in match.bands or ():
+            bucket = self._buckets.get(band)
+            if bucket is not None:
+                bucket.remove(stored_id)
+                if not bucket:
+                    del self._buckets[band]
+        self._texts.pop(stored_id, None)
+
+    def _touch(self, stored_id: str):
+        if stored_id in self._entries:
+            self._entries.move_to_end(stored_id)
+
+    def _load_collection(self, matches: list[DedupMatch]) -> tuple[dict[str, str], list[tuple[str, set[int]]], dict[str, str]]:
+        """manifest에서 (정확 일치, 밴드 후보, 후보 본문) 조회"""
+        all_bands = sorted({band for match in matches if match.bands for band in match.bands})
+        with get_engine().connect() as conn:
+            exact = {
+                row.content_hash: row.stored_id
+                for row in conn.execute(CONTENT_MATCH_SQL, {
+                    "collection_name": self.collection_name,
+                    "hashes": [match.content_hash for match in matches],
+                })
+            }
+            candidates = []
+            if all_bands:
+                candidates = [
+                    (row.stored_id, set(row.lsh_bands))
+                    for row in conn.execute(BAND_CANDIDATES_SQL, {
+                        "collection_name": self.collection_name, "bands": all_bands,
+                    })
+                ]
+            ids = set(exact.values()) | {stored_id for stored_id, _ in candidates}
+            documents = {}
+            if ids:
+                documents = {
+                    row.id: normalize_text(row.document)
+                    for row in conn.execute(DOCUMENTS_SQL, {"ids": list(ids)})
+                }
+        return exact, candidates, documents
+
+    def check(self, chunks: list[tuple[str, str]]) -> list[DedupMatch]:
+        """
+        chunks: [(청크ID, 본문)] (문서 순서), 반환: 청크별 DedupMatch (duplicate_of 가 있으면 중복)
+        - 컬렉션 조회는 호출당 3회(정확 일치, 밴드 후보, 후보 본문)로 묶어서 처리
+        """
+        normalized = [normalize_text(body) for _, body in chunks]
+        matches = []
+        for value in normalized:
+            match = DedupMatch(content_hash=hashlib.sha256(value.encode("utf-8")).hexdigest())
+            if len(value) >= settings.INGEST_DEDUP_MIN_CHARS:
+                match.bands = lsh_bands(minhash(value))
+            matches.append(match)
+        if not matches:
+            return matches
+
+        db_exact, db_candidates, documents = self._load_collection(matches)
+        for (chunk_id, _), value, match in zip(chunks, normalized, matches):
+            stored_id = self._exact.get(match.content_hash)
+            if stored_id is None and db_exact.get(match.content_hash) in documents:
+                stored_id = db_exact[match.content_hash]  # manifest 에만 있고 벡터가 없는 행은 제외
+            if stored_id is None and match.bands:
+                stored_id = self._near_duplicate(value, match.bands, db_candidates, documents)
+            if stored_id is not None:
+                match.duplicate_of = stored_id
+                self._touch(stored_id)
+            else:
+                self._register(chunk_id, match, value)
+        return matches
+
+    def _near_duplicate(
+        self,
+        value: str,
+        bands: list[int],
+        db_candidates: list[tuple[str, set[int]]],
+        documents: dict[str, str],
+    ) -> Optional[str]:
+        candidates = dict.fromkeys(stored_id for band in bands for stored_id in self._buckets.get(band, ()))
+        band_set = set(bands)
+        for stored_id, row_bands in db_candidates:
+            if row_bands & band_set:
+                candidates.setdefault(stored_id)
+        for stored_id in candidates:
+            other = self._texts.get(stored_id) or documents.get(stored_id)
+            if other is not None and is_near_duplicate(value, other):
+                return stored_id
+        return None
@@ -0,0 +1,207 @@
+import asyncio
+import json
+import os
+import socket
+import uuid
+from contextlib import suppress
+from typing import AsyncGenerator, Optional
+
+from redis.exceptions import RedisError, ResponseError
+
+from app.config import settings
+from app.core.db.redis import redis_client
+from app.core.deploy_service import run_deploy
+from app.model.agent_models import UIDeployRequest
+from app.utils.timezone import get_KST_timestamp
+
+"""
+비동기 배포 작업 큐 (Redis Stream)
+- /agent/deploy?job=true 요청은 UIDeployRequest를 stream에 넣고 job_id만 즉시 반환
+- 각 API 프로세스의 워커(DEPLOY_WORKER_CONCURRENCY개)가 consumer group으로 작업을 나눠 처리 → 동시 배포 수 제한
+- 작업 상태는 hash(deploy:job:{id}), 진행 이벤트는 작업별 stream(deploy:job:{id}:events)에 기록
+- 처리 중 죽은 워커의 작업은 DEPLOY_JOB_CLAIM_IDLE_MS 이후 다른 워커가 XAUTOCLAIM으로 가져가 재처리
+"""
+
+JOB_STREAM = "deploy:jobs"
+JOB_GROUP = "deploy-workers"
+JOB_PREFIX = "deploy:job"
+
+# 작업 상태
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+TERMINAL_STATUSES = {JOB_SUCCEEDED, JOB_FAILED}
+
+_worker_tasks: list[asyncio.Task] = []
+_group_ready = False
+
+
+def _job_key(job_id: str) -> str:
+    return f"{JOB_PREFIX}:{job_id}"
+
+
+def _events_key(job_id: str) -> str:
+    return f"{JOB_PREFIX}:{job_id}:events"
+
+
+async def _publish(job_id: str, status: str, stage: str, message: str, result: Optional[dict] = None):
+    """작업 상태 갱신 + 진행 이벤트 기록"""
+    fields = {"status": status, "stage": stage, "message": message, "updated_at": get_KST_timestamp()}
+    if result is not None:
+        fields["result"] = json.dumps(result, ensure_ascii=False, default=str)
+
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.hset(_job_key(job_id), mapping=fields)
+        pipe.xadd(_events_key(job_id), fields)
+        pipe.expire(_job_key(job_id), settings.DEPLOY_JOB_TTL)
+        pipe.expire(_events_key(job_id), settings.DEPLOY_JOB_TTL)
+        await pipe.execute()
+
+
+async def enqueue_deploy(request: UIDeployRequest) -> str:
+    """
+    배포 요청을 큐에 넣고 job_id 반환
+    """
+    job_id = str(uuid.uuid4())
+    await redis_client.hset(
+        _job_key(job_id),
+        mapping={
+            "request": request.model_dump_json(),
+            "created_at": get_KST_timestamp(),
+        },
+    )
+    await _publish(job_id, JOB_QUEUED, "queued", "배포 요청이 접수되었습니다.")
+    await redis_client.xadd(
+        JOB_STREAM, {"job_id": job_id}, maxlen=settings.DEPLOY_JOB_STREAM_MAXLEN, approximate=True
+    )
+    return job_id
+
+
+async def get_job(job_id: str) -> Optional[dict]:
+    job = await redis_client.hgetall(_job_key(job_id))
+    if not job:
+        return None
+    if "result" in job:
+        job["result"] = json.loads(job["result"])
+    job.pop("request", None)
+    return job
+
+
+async def stream_job_events(job_id: str, block_ms: int = 15000) -> AsyncGenerator[dict, None]:
+    """
+    작업 진행 이벤트를 처음부터 순서대로 전달, 종료 상태(succeeded/failed)가 나오면 끝냄
+    """
+    last_id = "0"
+    while True:
+        entries = await redis_client.xread({_events_key(job_id): last_id}, count=100, block=block_ms)
+        if not entries:
+            # 블록 시간 동안 이벤트가 없으면 작업이 만료되었는지 확인
+            if not await redis_client.exists(_job_key(job_id)):
+                return
+            continue
+        for _, messages in entries:
+            for message_id, fields in messages:
+                last_id = message_id
+                if "result" in fields:
+                    fields["result"] = json.loads(fields["result"])
+                yield fields
+                if fields.get("status") in TERMINAL_STATUSES:
+                    return
+
+
+async def _process_job(job_id: str):
+    job = await redis_client.hgetall(_job_key(job_id))
+    if not job or job.get("status") in TERMINAL_STATUSES:
+        return  # 만료되었거나 이미 처리된 작업 (재처리 시)
+
+    async def progress(stage: str, message: str):
+        await _publish(job_id, JOB_RUNNING, stage, message)
+
+    try:
+        # 잘못되었거나 이전 스키마의 payload 도 실패로 기록 (재처리해도 같은 결과)
+        request = UIDeployRequest.model_validate_json(job["request"])
+        result = await run_deploy(
+            request,
+            progress=progress,
+            timeout=settings.DEPLOY_JOB_TIMEOUT,
+            # 즉시배포(01)가 아닌 작업은 예약 실행 → 초기 메시지 전송
+            send_initial_message=request.agent_sch_type != "01",
+        )
+    except Exception as e:
+        await _publish(job_id, JOB_FAILED, "failed", f"에이전트 배포에 실패하였습니다: {e}")
+        return
+
+    if not result["result"]["success_ind"]:
+        await _publish(job_id, JOB_FAILED, "failed", "에이전트 배포에 실패하였습니다.", result=result)
+        return
+
+    await _publish(job_id, JOB_SUCCEEDED, "completed", "에이전트 배포가 완료되었습니다.", result=result)
+
+
+async def _ensure_group():
+    """consumer group 생성 (Redis 장애 중 기동해도 API는 뜨도록 워커에서 지연 생성)"""
+    global _group_ready
+    if _group_ready:
+        return
+    try:
+        await redis_client.xgroup_create(JOB_STREAM, JOB_GROUP, id="0", mkstream=True)
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):  # 이미 group이 있으면 무시
+            raise
+    _group_ready = True
+
+
+async def _worker(consumer: str):
+    while True:
+        try:
+            await _ensure_group()
+            # 오래 처리되지 않은(죽은 워커의) 작업 우선 회수
+            _, messages, *_ = await redis_client.xautoclaim(
+                JOB_STREAM, JOB_GROUP, consumer,
+                min_idle_time=settings.DEPLOY_JOB_CLAIM_IDLE_MS, start_id="0-0", count=1,
+            )
+            if not messages:
+                entries = await redis_client.xreadgroup(
+                    JOB_GROUP, consumer, {JOB_STREAM: ">"}, count=1, block=5000
+                )
+                messages = entries[0][1] if entries else []
+
+            for message_id, fields in messages:
+                ack = True
+                try:
+                    if fields:  # 삭제(trim)된 메시지는 fields가 비어 있음
+                        await _process_job(fields["job_id"])
+                except asyncio.CancelledError:
+                    ack = False  # 종료 중이던 작업은 ack 하지 않음 → 재기동 후 XAUTOCLAIM 으로 재처리
+                    raise
+                finally:
+                    # 처리 중 오류가 나도 ack → 같은 메시지가 반복 회수되지 않음
+                    if ack:
+                        await redis_client.xack(JOB_STREAM, JOB_GROUP, message_id)
+        except asyncio.CancelledError:
+            raise
+        except RedisError as e:
+            print(f"❌ 배포 워커 Redis 오류({consumer}): {e}")
+            if "NOGROUP" in str(e):  # stream/group 이 삭제된 경우 다시 생성
+                global _group_ready
+                _group_ready = False
+            await asyncio.sleep(1)
+        except Exception as e:
+            print(f"❌ 배포 워커 오류({consumer}): {e}")
+            await asyncio.sleep(1)
+
+
+async def start_deploy_workers():
+    base_name = f"{socket.gethostname()}-{os.getpid()}"
+    for i in range(settings.DEPLOY_WORKER_CONCURRENCY):
+        _worker_tasks.append(asyncio.create_task(_worker(f"{base_name}-{i}")))
+
+
+async def stop_deploy_workers():
+    for task in _worker_tasks:
+        task.cancel()
+    for task in _worker_tasks:
+        with suppress(asyncio.CancelledError):
+            await task
+    _worker_tasks.clear()
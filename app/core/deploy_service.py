@@ -0,0 +1,144 @@
+from typing import Awaitable, Callable, Optional
+
+import httpx
+from google.genai.types import Content, Part
+
+from app.config import settings
+from app.core.chat_client import adk_client, deployer_client
+from app.core.response_cache import invalidate_agent_cache
+from app.core.semantic_cache import invalidate_semantic_cache
+from app.core.session_pool import acquire_session
+from app.core.tool_resolver import ToolResolutionError, resolve_tool_names
+from app.model.agent_models import (
+    AgentDeployResponse,
+    AgentDeployResponseData,
+    AgentResponseResult,
+    ChatADKRequest,
+    DeploymentRequest,
+    ResponseMessage,
+    ResponseReason,
+    UIDeployRequest,
+)
+from app.utils.formatter import sanitize_agent_name
+
+"""
+에이전트 배포 처리
+- /agent/deploy (동기 모드)와 배포 작업 큐 워커(app.core.deploy_queue)가 함께 사용
+"""
+
+# 진행 상황 콜백: (stage, message)
+ProgressCallback = Callable[[str, str], Awaitable[None]]
+
+
+async def run_deploy(
+    request: UIDeployRequest,
+    progress: Optional[ProgressCallback] = None,
+    timeout: Optional[float] = None,
+    send_initial_message: bool = False,
+) -> dict:
+    """
+    deployer에 배포(overwrite) 요청 후 ADK 세션을 생성하고 AgentDeployResponse 형식으로 반환
+    - timeout: deployer 요청 타임아웃(초), None이면 클라이언트 기본값
+    - send_initial_message: 예약 실행 시 생성한 세션으로 agent_sch_init_message 전송
+    """
+    async def report(stage: str, message: str):
+        if progress is not None:
+            await progress(stage, message)
+
+    agent_name = sanitize_agent_name(request.agent_name)
+    OVERWRITE_DEPLOY_URL = f"{settings.BASE_URL}:3001/api/v1/agents/deploy/overwrite"
+    response_data = AgentDeployResponseData(
+        user_id=request.user_id,
+        user_uuid=request.user_uuid,
+        agent_id=request.agent_id,
+        agent_name=agent_name,
+        mcp_id=request.mcp_id,
+        agent_sch_type=request.agent_sch_type,
+    )
+    try:
+        # mcp_id → 툴 이름 (캐시 + 일괄 조회)
+        tool_names = await resolve_tool_names(request.mcp_id)
+        request_payload = DeploymentRequest(
+            user_id=str(request.user_id),
+            agent_config={
+                "name": agent_name, 
+                "description": request.agent_instruction_message,
+                "instruction": request.agent_instruction_message,
+                "model": "gemini-2.0-flash",
+                "template": "single_node_agent",
+                "max_tokens": 2000,
+                "temperature": 0.7,
+                "tools": tool_names,
+            },
+            user_credentials={
+                "openai_api_key": None,  # OpenAI API 키가 필요한 경우 여기에 추가
+                "google_api_key": settings.GOOGLE_API_KEY,  # Google API 키가 필요한 경우 여기에 추가
+                "weather_api_key": None,  # 날씨 API 키가 필요한 경우 여기에 추가
+            },
+            overwrite=False,
+        )
+
+        await report("deploying", "에이전트 배포 요청 중입니다.")
+        response = await deployer_client.post_client(
+            OVERWRITE_DEPLOY_URL, payload=request_payload, timeout=timeout
+        )
+        # 에이전트 설정이 바뀌었으므로 기존 응답 캐시 무효화
+        await invalidate_agent_cache(str(request.user_id), agent_name)
+        await invalidate_semantic_cache(str(request.user_id), agent_name)
+        
+        await report("creating_session", "세션 생성 중입니다.")
+        # 세션 풀 사용 시 미리 만든 세션을 받고, 다음 "새 채팅"을 위해 풀을 채워 둠
+        session_id = await acquire_session(str(request.user_id), agent_name)
+        response_data.session_id = session_id
+
+        initial_message = request.agent_sch_detail.agent_sch_init_message
+        if send_initial_message and initial_message:
+            await report("sending_initial_message", "초기 메시지 전송 중입니다.")
+            chat_adk_request = ChatADKRequest(
+                appName=agent_name,
+                userId=str(request.user_id),
+                sessionId=str(session_id),
+                newMessage=Content(parts=[Part(text=initial_message)], role="user").model_dump(),
+                streaming=False,
+            )
+            await adk_client.post_client(
+                url=f"{settings.BASE_URL}:30080/users/{request.user_id}/run",
+                payload=chat_adk_request,
+                timeout=timeout,
+            )
+
+        message = ResponseMessage(
+            code=f"AGENT-{agent_name}",
+            text=f"에이전트 배포가 완료되었습니다.",
+        )
+        result_data = AgentResponseResult(
+            success_ind=True,
+            status="04",
+            message=message,
+        )
+        return_format = AgentDeployResponse(
+            response=response_data, result=result_data
+        ).model_dump(exclude_none=True)
+
+        return return_format
+
+    except (httpx.HTTPStatusError, ToolResolutionError) as e:
+        if isinstance(e, ToolResolutionError):
+            location = "deploy - resolve_tool_names"
+        else:
+            location = f"{OVERWRITE_DEPLOY_URL} - {e.response.status_code}"
+        reason = ResponseReason(text=str(e), location=location)
+
+        message = ResponseMessage(
+            code=f"AGENT-{agent_name}",
+            text=f"에이전트 배포에 실패하였습니다.",
+        )
+        result_data = AgentResponseResult(
+            success_ind=False,
+            status="99",
+            message=message,
+            reason=reason,
+        )
+        return_format = AgentDeployResponse(response=response_data, result=result_data).model_dump(exclude_none=True)
+
+        return return_format
@@ -1,22 +1,159 @@
+import asyncio
+import math
+import random
+import time
+from typing import Optional
+
 from google import genai
+from google.genai import errors, types
 from langchain_core.embeddings import Embeddings
 
+from app.config import settings
+from app.core.metrics import EMBEDDING_REQUESTS
+
+"""
+Gemini 임베딩
+- 입력을 EMBEDDING_BATCH_SIZE 단위로 나눠 요청 (결과는 입력 순서 유지)
+- 비동기(aembed_*)는 배치를 동시에 보내되, 동시 요청 수를 AIMD로 조절
+  (429 → 상한 절반, 성공 → 상한 천천히 증가) 하여 provider quota 한도에 맞춰 처리량을 유지
+- 429/5xx는 지수 backoff + jitter 로 재시도
+- EMBEDDING_OUTPUT_DIMENSIONALITY 지정 시 문서/쿼리 모두 같은 차원으로 요청하고 L2 정규화
+  (gemini-embedding-001은 전체 차원 출력만 정규화되어 나옴)
+"""
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def l2_normalize(vector: list[float]) -> list[float]:
+    norm = math.sqrt(sum(x * x for x in vector))
+    return [x / norm for x in vector] if norm else vector
+
+
+def _is_retryable(e: Exception) -> bool:
+    return isinstance(e, errors.APIError) and e.code in RETRYABLE_STATUS
+
+
+def _backoff(attempt: int) -> float:
+    # full jitter
+    return random.uniform(0, min(settings.EMBEDDING_BACKOFF_MAX, settings.EMBEDDING_BACKOFF_BASE * 2 ** attempt))
+
+
+class AdaptiveLimiter:
+    """
+    AIMD 동시성 제한
+    - 성공: limit += 1/limit (대략 limit번 성공마다 +1)
+    - quota 초과: limit /= 2 (최소 1)
+    """
+
+    def __init__(self, max_limit: int):
+        self.max_limit = max(1, max_limit)
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self._cond: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _condition(self) -> asyncio.Condition:
+        # 이벤트 루프마다 새로 생성 (asyncio.run 을 여러 번 쓰는 배치 스크립트 대비)
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._cond, self.in_flight = loop, asyncio.Condition(), 0
+        return self._cond
+
+    async def __aenter__(self):
+        cond = self._condition()
+        async with cond:
+            await cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        cond = self._condition()
+        async with cond:
+            self.in_flight -= 1
+            cond.notify_all()
+
+    def on_success(self):
+        self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def on_throttle(self):
+        self.limit = max(1.0, self.limit / 2)
+
+
 class GeminiEmbeddings(Embeddings):
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        model: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        output_dimensionality: Optional[int] = None,
+    ):
         self.client = genai.Client(api_key=api_key)
-
-    def embed_documents(self, texts: list[str]) -> list[list[float]]:
-        results = self.client.models.embed_content(
-            model="gemini-embedding-001",
-            contents=texts
+        self.model = model or settings.EMBEDDING_MODEL
+        self.output_dimensionality = output_dimensionality or settings.EMBEDDING_OUTPUT_DIMENSIONALITY
+        self.config = (
+            types.EmbedContentConfig(output_dimensionality=self.output_dimensionality)
+            if self.output_dimensionality else None
         )
+        self.batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+        self.limiter = AdaptiveLimiter(max_concurrency or settings.EMBEDDING_MAX_CONCURRENCY)
+
+    def _vectors(self, results) -> list[list[float]]:
+        vectors = [item.values for item in results.embeddings]
+        if self.output_dimensionality:
+            vectors = [l2_normalize(vector) for vector in vectors]
+        return vectors
 
-        embeddings = [item.values for item in results.embeddings]
+    def _batches(self, texts: list[str]) -> list[list[str]]:
+        return [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+
+    # ===== 동기 =====
+    def _embed_batch(self, contents) -> list[list[float]]:
+        for attempt in range(settings.EMBEDDING_MAX_RETRIES + 1):
+            try:
+                results = self.client.models.embed_content(model=self.model, contents=contents, config=self.config)
+                EMBEDDING_REQUESTS.labels(result="ok").inc()
+                return self._vectors(results)
+            except Exception as e:
+                if not _is_retryable(e) or attempt == settings.EMBEDDING_MAX_RETRIES:
+                    EMBEDDING_REQUESTS.labels(result="error").inc()
+                    raise
+                EMBEDDING_REQUESTS.labels(result="retry").inc()
+                time.sleep(_backoff(attempt))
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        embeddings: list[list[float]] = []
+        for batch in self._batches(texts):
+            embeddings.extend(self._embed_batch(batch))
         return embeddings
 
     def embed_query(self, text: str) -> list[float]:
-        results = self.client.models.embed_content(
-            model="gemini-embedding-001",
-            contents=text
-        )
-        return results.embeddings[0].values
+        return self._embed_batch(text)[0]
+
+    # ===== 비동기 =====
+    async def _aembed_batch(self, contents) -> list[list[float]]:
+        for attempt in range(settings.EMBEDDING_MAX_RETRIES + 1):
+            try:
+                async with self.limiter:
+                    results = await self.client.aio.models.embed_content(
+                        model=self.model, contents=contents, config=self.config
+                    )
+                self.limiter.on_success()
+                EMBEDDING_REQUESTS.labels(result="ok").inc()
+                return self._vectors(results)
+            except Exception as e:
+                if not _is_retryable(e) or attempt == settings.EMBEDDING_MAX_RETRIES:
+                    EMBEDDING_REQUESTS.labels(result="error").inc()
+                    raise
+                if e.code == 429:
+                    self.limiter.on_throttle()
+                EMBEDDING_REQUESTS.labels(result="retry").inc()
+                await asyncio.sleep(_backoff(attempt))
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        # gather는 입력 순서대로 결과를 돌려주므로 배치 순서 = 입력 순서
+        results = await asyncio.gather(*(self._aembed_batch(batch) for batch in self._batches(texts)))
+        return [embedding for batch in results for embedding in batch]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return (await self._aembed_batch(text))[0]
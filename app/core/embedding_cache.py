@@ -0,0 +1,161 @@
+import hashlib
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Optional
+
+from langchain_core.embeddings import Embeddings
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.core.db.redis import redis_binary_client, sync_redis_binary_client
+from app.core.metrics import EMBEDDING_CACHE_REQUESTS
+
+"""
+임베딩 캐시
+- 키: (model, 출력 차원, sha256(text)) → 같은 텍스트는 문서/쿼리 구분 없이 한 번만 임베딩
+- 1차: 프로세스 내 LRU (float32 array로 보관해 메모리 절약)
+- 2차: Redis, float32 바이너리(array('f').tobytes()) 로 저장 — JSON 리스트 대비 약 1/4 크기
+- Redis 장애 시 캐시 없이 원래 임베딩으로 동작
+"""
+
+CACHE_KEY_PREFIX = "emb"
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def encode_vector(vector: list[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def decode_vector(raw: bytes) -> array:
+    vector = array("f")
+    vector.frombytes(raw)
+    return vector
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings 래퍼: 캐시에 없는 텍스트만 내부 embeddings로 요청
+    """
+
+    def __init__(self, embeddings: Embeddings, max_entries: Optional[int] = None, ttl: Optional[int] = None):
+        self.embeddings = embeddings
+        self.max_entries = max_entries or settings.EMBEDDING_CACHE_MAX_ENTRIES
+        self.ttl = ttl or settings.EMBEDDING_CACHE_TTL
+        self._memory: OrderedDict[str, array] = OrderedDict()
+        self._lock = threading.Lock()  # 동기 경로가 to_thread 에서도 호출됨
+
+    @property
+    def namespace(self) -> str:
+        # 같은 모델이라도 출력 차원이 다르면 다른 벡터
+        model = getattr(self.embeddings, "model", type(self.embeddings).__name__)
+        dims = getattr(self.embeddings, "output_dimensionality", None)
+        return f"{model}:{dims}" if dims else model
+
+    def _key(self, digest: str) -> str:
+        return f"{CACHE_KEY_PREFIX}:{self.namespace}:{digest}"
+
+    # ===== 1차 (프로세스 내 LRU) =====
+    def _memory_get(self, key: str) -> Optional[array]:
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+        EMBEDDING_CACHE_REQUESTS.labels(tier="memory", result="miss" if vector is None else "hit").inc()
+        return vector
+
+    def _memory_set(self, key: str, vector: array):
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    # ===== 공통 =====
+    def _plan(self, texts: list[str]) -> tuple[list[str], dict[str, array]]:
+        """텍스트별 캐시 키, 1차 캐시 hit 결과"""
+        keys = [self._key(text_hash(text)) for text in texts]
+        found: dict[str, array] = {}
+        for key in dict.fromkeys(keys):  # 중복 텍스트는 한 번만 조회
+            vector = self._memory_get(key)
+            if vector is not None:
+                found[key] = vector
+        return keys, found
+
+    def _apply_redis(self, missing: list[str], raws: list[Optional[bytes]], found: dict[str, array]):
+        for key, raw in zip(missing, raws):
+            EMBEDDING_CACHE_REQUESTS.labels(tier="redis", result="miss" if raw is None else "hit").inc()
+            if raw is not None:
+                vector = decode_vector(raw)
+                found[key] = vector
+                self._memory_set(key, vector)
+
+    def _misses(self, texts: list[str], keys: list[str], found: dict[str, array]) -> dict[str, str]:
+        """임베딩 요청이 필요한 {키: 텍스트}"""
+        return {key: text for key, text in zip(keys, texts) if key not in found}
+
+    def _collect(self, embedded: dict[str, list[float]], found: dict[str, array]) -> dict[str, bytes]:
+        payload = {}
+        for key, values in embedded.items():
+            vector = array("f", values)
+            found[key] = vector
+            self._memory_set(key, vector)
+            payload[key] = vector.tobytes()
+        return payload
+
+    # ===== 동기 =====
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys, found = self._plan(texts)
+        missing = [key for key in dict.fromkeys(keys) if key not in found]
+        if missing:
+            try:
+                self._apply_redis(missing, sync_redis_binary_client.mget(missing), found)
+            except RedisError:
+                EMBEDDING_CACHE_REQUESTS.labels(tier="redis", result="error").inc()
+
+        pending = self._misses(texts, keys, found)
+        if pending:
+            vectors = self.embeddings.embed_documents(list(pending.values()))
+            payload = self._collect(dict(zip(pending, vectors)), found)
+            try:
+                with sync_redis_binary_client.pipeline(transaction=False) as pipe:
+                    for key, raw in payload.items():
+                        pipe.set(key, raw, ex=self.ttl)
+                    pipe.execute()
+            except RedisError:
+                EMBEDDING_CACHE_REQUESTS.labels(tier="redis", result="error").inc()
+
+        return [found[key].tolist() for key in keys]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+    # ===== 비동기 =====
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys, found = self._plan(texts)
+        missing = [key for key in dict.fromkeys(keys) if key not in found]
+        if missing:
+            try:
+                self._apply_redis(missing, await redis_binary_client.mget(missing), found)
+            except RedisError:
+                EMBEDDING_CACHE_REQUESTS.labels(tier="redis", result="error").inc()
+
+        pending = self._misses(texts, keys, found)
+        if pending:
+            vectors = await self.embeddings.aembed_documents(list(pending.values()))
+            payload = self._collect(dict(zip(pending, vectors)), found)
+            try:
+                async with redis_binary_client.pipeline(transaction=False) as pipe:
+                    for key, raw in payload.items():
+                        pipe.set(key, raw, ex=self.ttl)
+                    await pipe.execute()
+            except RedisError:
+                EMBEDDING_CACHE_REQUESTS.labels(tier="redis", result="error").inc()
+
+        return [found[key].tolist() for key in keys]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return (await self.aembed_documents([text]))[0]
@@ -0,0 +1,182 @@
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from langchain_core.documents import Document
+from sqlalchemy import text
+
+from app.config import settings
+from app.core.db.pgvector import get_engine
+from app.core.db.vector_index import fit_dimensions, get_collection, search_by_vector
+
+"""
+작은 컬렉션용 프로세스 내 벡터 인덱스 (NumPy)
+- manifest(ingestion_files)로 적재된 컬렉션 중 HOT_INDEX_MAX_ROWS 이하만 대상
+- 벡터를 정규화된 float32 행렬로 로컬 스냅샷(.npy)에 저장하고 mmap으로 읽음 → 프로세스 재시작/여러 워커가 같은 파일 공유
+- 검색: 행렬 × 쿼리 벡터 1회 + argpartition 으로 top-k (cosine distance = 1 - 내적)
+- HOT_INDEX_CHECK_INTERVAL 마다 manifest 버전(파일 수, 청크 수, 최종 적재시간)을 확인해 바뀌면 스냅샷 재생성
+- 대상이 아니면 search_vectors 가 DB 검색(search_by_vector)으로 처리
+"""
+
+MANIFEST_VERSION_SQL = text("""
+    SELECT count(*) AS files, coalesce(sum(chunk_count), 0) AS chunks, max(ingested_at) AS ingested_at
+    FROM ingestion_files WHERE collection_name = :collection_name
+""")
+
+
+@dataclass(slots=True)
+class HotIndex:
+    version: str
+    matrix: np.ndarray  # (rows, dims) 정규화된 float32, mmap
+    ids: list[str]
+    documents: list[str]
+    metadatas: list[dict]
+    checked_at: float
+
+    def search(self, embedding: list[float], k: int, filter: Optional[dict] = None) -> list[tuple[Document, float]]:
+        if not self.ids:
+            return []
+        query = np.asarray(fit_dimensions(embedding, self.matrix.shape[1]), dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query /= norm
+        scores = self.matrix @ query
+        if filter:
+            mask = np.fromiter(
+                (all(meta.get(key) == value for key, value in filter.items()) for meta in self.metadatas),
+                dtype=bool,
+                count=len(self.metadatas),
+            )
+            scores = np.where(mask, scores, -np.inf)
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            (Document(id=self.ids[i], page_content=self.documents[i], metadata=self.metadatas[i]), float(1 - scores[i]))
+            for i in top
+            if np.isfinite(scores[i])
+        ]
+
+
+_indexes: dict[str, Optional[HotIndex]] = {}
+_checked: dict[str, float] = {}  # 대상 아님으로 확인한 시간
+_lock = threading.Lock()
+
+
+def _snapshot_name(collection_name: str) -> str:
+    return re.sub(r"[^0-9A-Za-z_-]", "_", collection_name)
+
+
+def _snapshot_paths(collection_name: str, version: str) -> tuple[Path, Path]:
+    base = Path(settings.HOT_INDEX_DIR) / f"{_snapshot_name(collection_name)}.{version}"
+    return Path(f"{base}.npy"), Path(f"{base}.json")
+
+
+def _manifest_version(collection_name: str) -> Optional[tuple[str, int]]:
+    """(버전 문자열, 청크 수), manifest가 없으면 None"""
+    with get_engine().connect() as conn:
+        row = conn.execute(MANIFEST_VERSION_SQL, {"collection_name": collection_name}).one()
+    if not row.files:
+        return None
+    stamp = row.ingested_at.strftime("%Y%m%d%H%M%S%f")
+    return f"{row.files}-{row.chunks}-{stamp}", row.chunks
+
+
+def _build_snapshot(collection_name: str, version: str):
+    matrix_path, meta_path = _snapshot_paths(collection_name, version)
+    matrix_path.parent.mkdir(parents=True, exist_ok=True)
+    with get_engine().connect() as conn:
+        collection_uuid, _ = get_collection(conn, collection_name)
+        rows = conn.execute(text(
+            "SELECT id, document, cmetadata, embedding::text AS embedding "
+            "FROM langchain_pg_embedding WHERE collection_id = :uuid ORDER BY id"
+        ), {"uuid": collection_uuid}).all()
+
+    matrix = np.array([json.loads(row.embedding) for row in rows], dtype=np.float32)
+    if len(rows):
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms == 0, 1, norms)
+
+    # 다른 프로세스가 읽는 중일 수 있으므로 임시 파일에 쓰고 교체
+    tmp_matrix = matrix_path.with_suffix(f".{os.getpid()}.tmp.npy")
+    tmp_meta = meta_path.with_suffix(f".{os.getpid()}.tmp")
+    np.save(tmp_matrix, matrix)
+    tmp_meta.write_text(json.dumps({
+        "ids": [row.id for row in rows],
+        "documents": [row.document for row in rows],
+        "metadatas": [row.cmetadata or {} for row in rows],
+    }, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp_matrix, matrix_path)
+    os.replace(tmp_meta, meta_path)
+
+    # 이전 버전 스냅샷 정리 (mmap 중인 프로세스는 unlink 후에도 기존 파일을 계속 읽을 수 있음)
+    pattern = re.compile(re.escape(_snapshot_name(collection_name)) + r"\.\d+-\d+-\d+\.(npy|json)")
+    for old in matrix_path.parent.iterdir():
+        if pattern.fullmatch(old.name) and old not in (matrix_path, meta_path):
+            old.unlink(missing_ok=True)
+
+
+def _load_snapshot(collection_name: str, version: str) -> HotIndex:
+    matrix_path, meta_path = _snapshot_paths(collection_name, version)
+    if not (matrix_path.exists() and meta_path.exists()):
+        _build_snapshot(collection_name, version)
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    return HotIndex(
+        version=version,
+        matrix=np.load(matrix_path, mmap_mode="r"),
+        ids=meta["ids"],
+        documents=meta["documents"],
+        metadatas=meta["metadatas"],
+        checked_at=time.monotonic(),
+    )
+
+
+def get_hot_index(collection_name: str) -> Optional[HotIndex]:
+    """
+    컬렉션 hot 인덱스, 대상이 아니면 None (HOT_INDEX_CHECK_INTERVAL 동안은 DB 확인 없이 캐시 사용)
+    """
+    if not settings.HOT_INDEX_ENABLED:
+        return None
+    now = time.monotonic()
+    index = _indexes.get(collection_name)
+    last_checked = index.checked_at if index else _checked.get(collection_name)
+    if last_checked is not None and now - last_checked < settings.HOT_INDEX_CHECK_INTERVAL:
+        return index
+
+    with _lock:
+        manifest = _manifest_version(collection_name)
+        if manifest is None or manifest[1] > settings.HOT_INDEX_MAX_ROWS:
+            _indexes.pop(collection_name, None)
+            _checked[collection_name] = now
+            return None
+        version, _ = manifest
+        index = _indexes.get(collection_name)
+        if index is None or index.version != version:
+            index = _load_snapshot(collection_name, version)
+            _indexes[collection_name] = index
+        index.checked_at = now
+        return index
+
+
+def search_vectors(
+    collection_name: str,
+    embedding: list[float],
+    k: int = 4,
+    filter: Optional[dict] = None,
+) -> list[tuple[Document, float]]:
+    """
+    벡터 검색: hot 인덱스 대상이면 메모리에서, 아니면 DB(search_by_vector)
+    - 반환: [(Document, cosine distance)]
+    """
+    index = get_hot_index(collection_name)
+    if index is not None:
+        return index.search(embedding, k, filter)
+    return search_by_vector(collection_name, embedding, k=k, filter=filter)
@@ -0,0 +1,366 @@
+import hashlib
+import json
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import pymupdf
+from langchain_community.document_loaders.parsers.pdf import PyMuPDFParser, _validate_metadata
+from langchain_core.documents import Document
+from langchain_core.documents.base import Blob
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from sqlalchemy import delete, select, text
+from sqlalchemy.dialects.postgresql import insert
+
+from app.config import settings
+from app.core.db.pgvector import get_engine, get_vectorstore
+from app.core.dedup import ChunkDeduplicator, DedupMatch
+from app.model.tables import ingestion_chunks, ingestion_files, metadata
+
+"""
+증분 문서 적재 (ingestion manifest)
+- 컬렉션별로 파일 sha256 + 청크별 내용 sha256 을 ingestion_files / ingestion_chunks 에 기록
+- 파일 hash가 같으면 파싱/임베딩 없이 건너뜀
+- 바뀐 파일은 새로 생긴 청크만 임베딩하고, 없어진 청크는 PGVector에서 삭제
+- 청크ID는 (컬렉션, 파일, 청크 hash, 같은 hash 내 순번)의 uuid5 → 다시 실행해도 같은 ID (upsert라 중복 적재 없음)
+- 새 청크는 중복 검사(app.core.dedup) 후 대표 청크만 임베딩/저장, 중복은 manifest의 duplicate_of 로 대표 청크를 참조
+  → 벡터 행은 참조하는 manifest 행이 모두 없어질 때 삭제 (대표 청크의 파일만 바뀌면 다음 출처로 메타데이터 승격)
+"""
+
+CHUNK_NAMESPACE = uuid.UUID("5f0c7a52-4b59-4c1e-9d0a-3c7e2f4b8a61")
+
+# manifest 도입 전(랜덤 ID) 적재된 같은 파일의 청크 정리용
+DELETE_UNTRACKED_SQL = text("""
+    DELETE FROM langchain_pg_embedding e
+    USING langchain_pg_collection c
+    WHERE e.collection_id = c.uuid
+      AND c.name = :collection_name
+      AND e.cmetadata ->> 'source' = :source
+""")
+
+# create_all 은 기존 테이블에 컬럼/인덱스를 추가하지 않으므로 중복 검사 도입 전 테이블 보완
+MANIFEST_UPGRADE_DDL = [
+    "ALTER TABLE ingestion_chunks ADD COLUMN IF NOT EXISTS content_hash varchar(64)",
+    "ALTER TABLE ingestion_chunks ADD COLUMN IF NOT EXISTS lsh_bands bigint[]",
+    "ALTER TABLE ingestion_chunks ADD COLUMN IF NOT EXISTS duplicate_of varchar(36)",
+    "CREATE INDEX IF NOT EXISTS ix_ingestion_chunks_content ON ingestion_chunks (collection_name, content_hash)",
+    "CREATE INDEX IF NOT EXISTS ix_ingestion_chunks_duplicate ON ingestion_chunks (collection_name, duplicate_of)",
+    "CREATE INDEX IF NOT EXISTS ix_ingestion_chunks_bands ON ingestion_chunks USING gin (lsh_bands)",
+]
+
+# 중복 청크 출처를 대표 청크 메타데이터에 추가
+PROVENANCE_APPEND_SQL = text("""
+    UPDATE langchain_pg_embedding
+    SET cmetadata = jsonb_set(cmetadata, '{duplicates}', coalesce(cmetadata -> 'duplicates', '[]'::jsonb) || CAST(:entries AS jsonb))
+    WHERE id = :stored_id
+""")
+
+# 없어진 중복 청크의 출처 제거
+PROVENANCE_REMOVE_SQL = text("""
+    UPDATE langchain_pg_embedding
+    SET cmetadata = jsonb_set(cmetadata, '{duplicates}', (
+        SELECT coalesce(jsonb_agg(d), '[]'::jsonb)
+        FROM jsonb_array_elements(cmetadata -> 'duplicates') d
+        WHERE NOT (d ->> 'chunk_id' = ANY(:removed))
+    ))
+    WHERE id = ANY(:stored_ids) AND jsonb_typeof(cmetadata -> 'duplicates') = 'array'
+""")
+
+# 대표 청크(owner)가 없어졌지만 다른 중복이 참조 중이면 첫 번째 출처를 대표로 승격
+PROVENANCE_PROMOTE_SQL = text("""
+    UPDATE langchain_pg_embedding
+    SET cmetadata = cmetadata || jsonb_build_object(
+        'source', cmetadata -> 'duplicates' -> 0 -> 'source',
+        'file_path', cmetadata -> 'duplicates' -> 0 -> 'source',
+        'page', cmetadata -> 'duplicates' -> 0 -> 'page',
+        'owner', cmetadata -> 'duplicates' -> 0 -> 'chunk_id',
+        'duplicates', (cmetadata -> 'duplicates') - 0
+    )
+    WHERE id = ANY(:stored_ids)
+      AND coalesce(cmetadata ->> 'owner', id) = ANY(:removed)
+      AND jsonb_array_length(coalesce(cmetadata -> 'duplicates', '[]'::jsonb)) > 0
+""")
+
+REFERENCED_SQL = text("""
+    SELECT chunk_id AS stored_id FROM ingestion_chunks
+    WHERE collection_name = :collection_name AND chunk_id = ANY(:stored_ids) AND duplicate_of IS NULL
+    UNION
+    SELECT duplicate_of FROM ingestion_chunks
+    WHERE collection_name = :collection_name AND duplicate_of = ANY(:stored_ids)
+""")
+
+_tables_ready = False
+
+
+@dataclass(slots=True)
+class IngestionResult:
+    collection_name: str
+    source: str
+    skipped: bool = False  # 파일 변경 없음
+    added: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    duplicates: int = 0  # 새 청크 중 중복으로 저장하지 않은 수
+
+
+@dataclass(slots=True)
+class ChunkRecord:
+    """manifest에 기록할 새 청크"""
+    chunk_id: str
+    chunk_hash: str
+    content_hash: Optional[str] = None
+    lsh_bands: Optional[list[int]] = None
+    duplicate_of: Optional[str] = None   # 중복이면 대신 저장된 청크ID
+    provenance: Optional[dict] = None    # 대표 청크 cmetadata["duplicates"] 에 추가할 출처
+
+
+def ensure_manifest_tables():
+    global _tables_ready
+    if not _tables_ready:
+        metadata.create_all(get_engine(), tables=[ingestion_files, ingestion_chunks])
+        with get_engine().begin() as conn:
+            for ddl in MANIFEST_UPGRADE_DDL:
+                conn.execute(text(ddl))
+        _tables_ready = True
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_sha256(doc: Document) -> str:
+    # 페이지가 바뀐 청크는 메타데이터가 달라지므로 페이지 번호까지 포함
+    page = doc.metadata.get("page", "")
+    return hashlib.sha256(f"{page}\x00{doc.page_content}".encode("utf-8")).hexdigest()
+
+
+def chunk_id(collection_name: str, source: str, chunk_hash: str, occurrence: int) -> str:
+    return str(uuid.uuid5(CHUNK_NAMESPACE, f"{collection_name}:{source}:{chunk_hash}:{occurrence}"))
+
+
+def chunk_ids(collection_name: str, source: str, hashes: list[str]) -> list[str]:
+    seen: dict[str, int] = {}
+    ids = []
+    for chunk_hash in hashes:
+        occurrence = seen.get(chunk_hash, 0)
+        seen[chunk_hash] = occurrence + 1
+        ids.append(chunk_id(collection_name, source, chunk_hash, occurrence))
+    return ids
+
+
+def load_pdf_pages(path: str, start: int = 0, end: Optional[int] = None) -> list[Document]:
+    """
+    [start, end) 페이지 Document (PyMuPDFLoader 기본 mode="page" 와 같은 파서/메타데이터)
+    - 파이프라인 워커도 이 함수를 쓰므로 두 적재 경로의 청크 hash/ID가 같음
+    """
+    parser = PyMuPDFParser(mode="page")
+    blob = Blob.from_path(path)
+    with pymupdf.open(path) as doc:
+        base = {"producer": "PyMuPDF", "creator": "PyMuPDF", "creationdate": ""} | parser._extract_metadata(doc, blob)
+        pages = range(start, len(doc) if end is None else min(end, len(doc)))
+        return [
+            Document(
+                page_content=parser._get_page_content(doc, doc[page_no], parser.text_kwargs).strip(),
+                metadata=_validate_metadata(base | {"page": page_no}),
+            )
+            for page_no in pages
+        ]
+
+
+def split_pdf_pages(
+    path: str, start: int = 0, end: Optional[int] = None, chunk_size: int = 500, chunk_overlap: int = 50
+) -> list[Document]:
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    return splitter.split_documents(load_pdf_pages(path, start, end))
+
+
+def load_pdf_chunks(path: str, chunk_size: int = 500, chunk_overlap: int = 50) -> list[Document]:
+    return split_pdf_pages(path, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+
+def apply_dedup(records: list[ChunkRecord], matches: list[DedupMatch], metadatas: list[dict]):
+    """중복 검사 결과를 manifest 기록에 반영 (중복이면 대표 청크에 남길 출처 포함)"""
+    for record, match, meta in zip(records, matches, metadatas):
+        record.content_hash = match.content_hash
+        record.lsh_bands = match.bands
+        record.duplicate_of = match.duplicate_of
+        if match.duplicate_of is not None:
+            record.provenance = {"chunk_id": record.chunk_id, "source": meta.get("source"), "page": meta.get("page")}
+
+
+def get_file_manifest(collection_name: str, source: str) -> Optional[str]:
+    """기록된 파일 hash, 없으면 None"""
+    with get_engine().connect() as conn:
+        return conn.execute(
+            select(ingestion_files.c.file_hash).where(
+                ingestion_files.c.collection_name == collection_name,
+                ingestion_files.c.source == source,
+            )
+        ).scalar_one_or_none()
+
+
+def get_chunk_manifest(collection_name: str, source: str) -> set[str]:
+    """기록된 청크ID 목록"""
+    with get_engine().connect() as conn:
+        return set(conn.execute(
+            select(ingestion_chunks.c.chunk_id).where(
+                ingestion_chunks.c.collection_name == collection_name,
+                ingestion_chunks.c.source == source,
+            )
+        ).scalars())
+
+
+def delete_untracked_chunks(collection_name: str, source: str):
+    """manifest에 없는 파일 → 이전 방식으로 적재된 청크가 있으면 중복되므로 먼저 삭제"""
+    with get_engine().begin() as conn:
+        conn.execute(DELETE_UNTRACKED_SQL, {"collection_name": collection_name, "source": source})
+
+
+def _release_chunks(conn, collection_name: str, removed: list[str]):
+    """
+    manifest에서 빠진 청크 정리 (같은 트랜잭션)
+    - 중복 청크: 대표 청크의 출처 목록에서 제거
+    - 대표 청크: 다른 중복이 참조 중이면 메타데이터 승격, 아무도 참조하지 않는 벡터 행은 삭제
+    """
+    rows = conn.execute(
+        select(ingestion_chunks.c.chunk_id, ingestion_chunks.c.duplicate_of).where(
+            ingestion_chunks.c.collection_name == collection_name,
+            ingestion_chunks.c.chunk_id.in_(removed),
+        )
+    ).all()
+    conn.execute(delete(ingestion_chunks).where(
+        ingestion_chunks.c.collection_name == collection_name,
+        ingestion_chunks.c.chunk_id.in_(removed),
+    ))
+    stored_ids = list({row.duplicate_of or row.chunk_id for row in rows})
+    params = {"collection_name": collection_name, "stored_ids": stored_ids, "removed": removed}
+    conn.execute(PROVENANCE_REMOVE_SQL, params)
+    conn.execute(PROVENANCE_PROMOTE_SQL, params)
+    referenced = set(conn.execute(REFERENCED_SQL, params).scalars())
+    orphaned = [stored_id for stored_id in stored_ids if stored_id not in referenced]
+    if orphaned:
+        conn.execute(text("DELETE FROM langchain_pg_embedding WHERE id = ANY(:ids)"), {"ids": orphaned})
+
+
+def record_manifest(
+    collection_name: str,
+    source: str,
+    file_hash: str,
+    chunk_count: int,
+    added: list[ChunkRecord],
+    removed: list[str],
+):
+    """
+    벡터 반영 후 manifest 기록 + 없어진 청크 정리 (중간에 실패해도 재실행 시 같은 ID로 upsert 되므로 안전)
+    - added: 새 청크 (대표 청크는 이미 PGVector에 저장된 상태), removed: [청크ID]
+    """
+    with get_engine().begin() as conn:
+        if added:
+            conn.execute(
+                insert(ingestion_chunks).on_conflict_do_nothing(),
+                [
+                    {
+                        "collection_name": collection_name,
+                        "chunk_id": record.chunk_id,
+                        "source": source,
+                        "chunk_hash": record.chunk_hash,
+                        "content_hash": record.content_hash,
+                        "lsh_bands": record.lsh_bands,
+                        "duplicate_of": record.duplicate_of,
+                    }
+                    for record in added
+                ],
+            )
+            provenance: dict[str, list[dict]] = {}
+            for record in added:
+                if record.duplicate_of is not None:
+                    provenance.setdefault(record.duplicate_of, []).append(record.provenance)
+            if provenance:
+                conn.execute(PROVENANCE_APPEND_SQL, [
+                    {"stored_id": stored_id, "entries": json.dumps(entries, ensure_ascii=False)}
+                    for stored_id, entries in provenance.items()
+                ])
+        if removed:
+            _release_chunks(conn, collection_name, removed)
+        stmt = insert(ingestion_files).values(
+            collection_name=collection_name, source=source, file_hash=file_hash, chunk_count=chunk_count
+        )
+        conn.execute(stmt.on_conflict_do_update(
+            index_elements=["collection_name", "source"],
+            set_={
+                "file_hash": stmt.excluded.file_hash,
+                "chunk_count": stmt.excluded.chunk_count,
+                "ingested_at": stmt.excluded.ingested_at,
+            },
+        ))
+
+
+def sync_chunks(
+    collection_name: str,
+    source: str,
+    file_hash: str,
+    chunks: list[Document],
+) -> IngestionResult:
+    """
+    청크 목록을 컬렉션에 반영 (새 청크 중 중복이 아닌 것만 임베딩/저장, 없어진 청크 정리) 후 manifest 갱신
+    """
+    ensure_manifest_tables()
+    hashes = [chunk_sha256(doc) for doc in chunks]
+    ids = chunk_ids(collection_name, source, hashes)
+
+    existing = get_chunk_manifest(collection_name, source)
+    new_positions = [i for i, chunk_id in enumerate(ids) if chunk_id not in existing]
+    removed = list(existing - set(ids))
+
+    records = [ChunkRecord(chunk_id=ids[i], chunk_hash=hashes[i]) for i in new_positions]
+    if settings.INGEST_DEDUP_ENABLED and new_positions:
+        matches = ChunkDeduplicator(collection_name).check(
+            [(ids[i], chunks[i].page_content) for i in new_positions]
+        )
+        apply_dedup(records, matches, [chunks[i].metadata for i in new_positions])
+    store_positions = [i for i, record in zip(new_positions, records) if record.duplicate_of is None]
+
+    vectorstore = get_vectorstore(collection_name)
+    if not existing:
+        delete_untracked_chunks(collection_name, source)
+    if store_positions:
+        vectorstore.add_texts(
+            texts=[chunks[i].page_content for i in store_positions],
+            metadatas=[chunks[i].metadata for i in store_positions],
+            ids=[ids[i] for i in store_positions],
+        )
+
+    record_manifest(
+        collection_name,
+        source,
+        file_hash,
+        chunk_count=len(ids),
+        added=records,
+        removed=removed,
+    )
+    return IngestionResult(
+        collection_name=collection_name,
+        source=source,
+        added=len(store_positions),
+        removed=len(removed),
+        unchanged=len(ids) - len(new_positions),
+        duplicates=len(new_positions) - len(store_positions),
+    )
+
+
+def ingest_pdf(path: str, collection_name: Optional[str] = None, force: bool = False) -> IngestionResult:
+    """
+    PDF 한 개 증분 적재 (컬렉션 기본값: 파일명)
+    - force=True 이면 파일 hash가 같아도 청크 단위 비교를 다시 수행
+    """
+    ensure_manifest_tables()
+    collection_name = collection_name or Path(path).stem
+    file_hash = file_sha256(path)
+    if not force and get_file_manifest(collection_name, path) == file_hash:
+        return IngestionResult(collection_name=collection_name, source=path, skipped=True)
+    return sync_chunks(collection_name, path, file_hash, load_pdf_chunks(path))
@@ -0,0 +1,317 @@
+import argparse
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import pymupdf
+from langchain_core.documents import Document
+
+from app.config import settings
+from app.core.db.pgvector import dispose_vectorstores, get_embeddings, get_vectorstore
+from app.core.dedup import ChunkDeduplicator
+from app.core.ingestion import (
+    ChunkRecord,
+    IngestionResult,
+    apply_dedup,
+    chunk_id,
+    chunk_sha256,
+    delete_untracked_chunks,
+    ensure_manifest_tables,
+    file_sha256,
+    get_chunk_manifest,
+    get_file_manifest,
+    record_manifest,
+    split_pdf_pages,
+)
+
+"""
+파이프라인 PDF 적재 (디렉터리 단위 대량 적재용)
+- 파싱: 프로세스 풀에서 페이지 범위(INGEST_PAGES_PER_TASK) 단위로 텍스트 추출 + 청크 분리
+- 임베딩: 청크를 bounded 큐로 받아 EMBEDDING_BATCH_SIZE 단위 배치를 INGEST_EMBED_CONCURRENCY 개 동시 처리
+- 저장: 임베딩된 청크를 INGEST_INSERT_BATCH_SIZE 단위로 PGVector에 bulk insert (파일 완료/유휴 시에는 남은 만큼)
+- 모든 단계가 bounded 큐로 연결되어 문서 크기와 무관하게 메모리 사용량이 일정
+- manifest(app.core.ingestion)를 그대로 사용하므로 바뀌지 않은 파일/청크는 임베딩하지 않음
+
+사용법: python -m app.core.ingestion_pipeline <디렉터리> [--collection 이름] [--pattern "*.pdf"] [--force]
+"""
+
+_SENTINEL = None
+
+
+@dataclass(slots=True)
+class Chunk:
+    collection_name: str
+    chunk_id: str
+    chunk_hash: str
+    text: str
+    metadata: dict
+    job: "FileJob"
+    embedding: Optional[list[float]] = None
+
+
+@dataclass(slots=True)
+class FileJob:
+    """파일 1개의 진행 상태 (모든 청크 저장 후 manifest 기록)"""
+    collection_name: str
+    source: str
+    file_hash: str
+    existing: set[str]
+    seen: dict[str, int] = field(default_factory=dict)  # 청크 hash별 순번 (chunk_ids와 같은 규칙)
+    current: set[str] = field(default_factory=set)
+    added: list[ChunkRecord] = field(default_factory=list)
+    depends_on: list["FileJob"] = field(default_factory=list)  # 중복 대상 청크를 저장 중인 다른 파일
+    pending: int = 0
+    buffered: int = 0  # 저장 대기 버퍼에 있는 청크 수
+    enqueued_all: bool = False
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def check_done(self):
+        if self.enqueued_all and self.pending == 0:
+            self.done.set()
+
+
+# ===== 파싱 (프로세스 풀) =====
+def parse_pages(path: str, start: int, end: int, chunk_size: int, chunk_overlap: int) -> list[tuple[str, dict]]:
+    """
+    [start, end) 페이지 텍스트 추출 + 청크 분리 (워커 프로세스에서 실행)
+    - ingest_pdf 와 같은 구현(split_pdf_pages)이라 어느 경로로 적재해도 청크 hash/ID가 같음
+    """
+    return [(d.page_content, d.metadata) for d in split_pdf_pages(path, start, end, chunk_size, chunk_overlap)]
+
+
+def page_count(path: str) -> int:
+    with pymupdf.open(path) as doc:
+        return len(doc)
+
+
+class IngestionPipeline:
+    def __init__(
+        self,
+        parse_workers: Optional[int] = None,
+        force: bool = False,
+    ):
+        self.parse_workers = parse_workers or settings.INGEST_PARSE_WORKERS or os.cpu_count() or 1
+        self.force = force
+        self.embeddings = get_embeddings()
+        self.results: list[IngestionResult] = []
+        self.deduplicators: dict[str, ChunkDeduplicator] = {}
+        self.pending_rows: dict[str, FileJob] = {}  # 이번 실행에서 저장 중인 대표 청크ID → 파일
+
+    async def run(self, files: list[tuple[str, str]]) -> list[IngestionResult]:
+        """
+        files: [(파일 경로, 컬렉션 이름)]
+        - 한 단계라도 실패하면 TaskGroup이 나머지 단계를 취소하고 예외를 올림
+        """
+        await asyncio.to_thread(ensure_manifest_tables)
+        chunk_queue: asyncio.Queue = asyncio.Queue(maxsize=settings.INGEST_QUEUE_SIZE)
+        insert_queue: asyncio.Queue = asyncio.Queue(maxsize=settings.INGEST_QUEUE_SIZE)
+        pool = ProcessPoolExecutor(max_workers=self.parse_workers)
+        try:
+            async with asyncio.TaskGroup() as tg:
+                embedders = [
+                    tg.create_task(self._embed_worker(chunk_queue, insert_queue))
+                    for _ in range(settings.INGEST_EMBED_CONCURRENCY)
+                ]
+                tg.create_task(self._insert_worker(insert_queue))
+
+                for path, collection_name in files:
+                    job = await self._parse_file(pool, path, collection_name, chunk_queue)
+                    if job is not None:
+                        tg.create_task(self._finalize(job))
+
+                for _ in embedders:
+                    await chunk_queue.put(_SENTINEL)
+                await asyncio.gather(*embedders)
+                await insert_queue.put(_SENTINEL)
+        finally:
+            pool.shutdown(cancel_futures=True)
+        return self.results
+
+    async def _parse_file(
+        self, pool: ProcessPoolExecutor, path: str, collection_name: str, chunk_queue: asyncio.Queue
+    ) -> Optional[FileJob]:
+        loop = asyncio.get_running_loop()
+        file_hash = await asyncio.to_thread(file_sha256, path)
+        if not self.force and await asyncio.to_thread(get_file_manifest, collection_name, path) == file_hash:
+            self.results.append(IngestionResult(collection_name=collection_name, source=path, skipped=True))
+            return None
+
+        existing = await asyncio.to_thread(get_chunk_manifest, collection_name, path)
+        if not existing:
+            await asyncio.to_thread(delete_untracked_chunks, collection_name, path)
+        job = FileJob(collection_name=collection_name, source=path, file_hash=file_hash, existing=existing)
+
+        # 페이지 범위를 워커 수만큼 미리 제출하고, 결과는 페이지 순서대로 소비 (청크ID 순번이 결정적이도록)
+        total = await loop.run_in_executor(pool, page_count, path)
+        step = settings.INGEST_PAGES_PER_TASK
+        ranges = [(start, start + step) for start in range(0, total, step)]
+        window: list[asyncio.Future] = []
+        next_range = 0
+        while next_range < len(ranges) or window:
+            while next_range < len(ranges) and len(window) < self.parse_workers * 2:
+                start, end = ranges[next_range]
+                window.append(loop.run_in_executor(
+                    pool, parse_pages, path, start, end,
+                    settings.INGEST_CHUNK_SIZE, settings.INGEST_CHUNK_OVERLAP,
+                ))
+                next_range += 1
+            await self._enqueue_chunks(job, await window.pop(0), chunk_queue)
+
+        job.enqueued_all = True
+        job.check_done()
+        return job
+
+    async def _enqueue_chunks(self, job: FileJob, parsed: list[tuple[str, dict]], chunk_queue: asyncio.Queue):
+        chunks = []
+        for text, metadata in parsed:
+            chunk_hash = chunk_sha256(Document(page_content=text, metadata=metadata))
+            occurrence = job.seen.get(chunk_hash, 0)
+            job.seen[chunk_hash] = occurrence + 1
+            new_id = chunk_id(job.collection_name, job.source, chunk_hash, occurrence)
+            job.current.add(new_id)
+            if new_id not in job.existing:  # 이미 저장된 청크는 제외
+                chunks.append(Chunk(job.collection_name, new_id, chunk_hash, text, metadata, job))
+        if not chunks:
+            return
+
+        records = [ChunkRecord(chunk_id=chunk.chunk_id, chunk_hash=chunk.chunk_hash) for chunk in chunks]
+        if settings.INGEST_DEDUP_ENABLED:
+            deduplicator = self.deduplicators.get(job.collection_name)
+            if deduplicator is None:
+                deduplicator = self.deduplicators[job.collection_name] = ChunkDeduplicator(job.collection_name)
+            matches = await asyncio.to_thread(deduplicator.check, [(chunk.chunk_id, chunk.text) for chunk in chunks])
+            apply_dedup(records, matches, [chunk.metadata for chunk in chunks])
+
+        for chunk, record in zip(chunks, records):
+            job.added.append(record)
+            if record.duplicate_of is not None:
+                owner = self.pending_rows.get(record.duplicate_of)
+                if owner is not None and owner is not job and all(owner is not other for other in job.depends_on):
+                    job.depends_on.append(owner)
+                continue
+            self.pending_rows[chunk.chunk_id] = job
+            job.pending += 1
+            await chunk_queue.put(chunk)
+
+    # ===== 임베딩 =====
+    async def _embed_worker(self, chunk_queue: asyncio.Queue, insert_queue: asyncio.Queue):
+        finished = False
+        while not finished:
+            batch: list[Chunk] = []
+            item = await chunk_queue.get()
+            while True:
+                if item is _SENTINEL:
+                    finished = True
+                    break
+                batch.append(item)
+                if len(batch) >= settings.EMBEDDING_BATCH_SIZE or chunk_queue.empty():
+                    break
+                item = chunk_queue.get_nowait()
+            if batch:
+                vectors = await self.embeddings.aembed_documents([chunk.text for chunk in batch])
+                for chunk, vector in zip(batch, vectors):
+                    chunk.embedding = vector
+                    await insert_queue.put(chunk)
+
+    # ===== 저장 =====
+    async def _insert_worker(self, insert_queue: asyncio.Queue):
+        """
+        컬렉션별 버퍼가 INGEST_INSERT_BATCH_SIZE 에 도달하거나, 파일의 남은 청크가 모두 버퍼에 들어오면 저장
+        - INGEST_INSERT_FLUSH_INTERVAL 동안 들어온 청크가 없으면 남은 버퍼 저장 (대기 중인 파일이 끝날 수 있도록)
+        """
+        buffers: dict[str, list[Chunk]] = {}
+        while True:
+            try:
+                item = await asyncio.wait_for(insert_queue.get(), timeout=settings.INGEST_INSERT_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                for collection_name in list(buffers):
+                    await self._flush(buffers.pop(collection_name))
+                continue
+            if item is _SENTINEL:
+                break
+            buffer = buffers.setdefault(item.collection_name, [])
+            buffer.append(item)
+            job = item.job
+            job.buffered += 1
+            if len(buffer) >= settings.INGEST_INSERT_BATCH_SIZE or (job.enqueued_all and job.buffered == job.pending):
+                await self._flush(buffers.pop(item.collection_name))
+        for buffer in buffers.values():
+            await self._flush(buffer)
+
+    async def _flush(self, batch: list[Chunk]):
+        if not batch:
+            return
+        vectorstore = get_vectorstore(batch[0].collection_name)
+        await asyncio.to_thread(
+            vectorstore.add_embeddings,
+            texts=[chunk.text for chunk in batch],
+            embeddings=[chunk.embedding for chunk in batch],
+            metadatas=[chunk.metadata for chunk in batch],
+            ids=[chunk.chunk_id for chunk in batch],
+        )
+        for chunk in batch:
+            chunk.job.pending -= 1
+            chunk.job.buffered -= 1
+            chunk.job.check_done()
+
+    # ===== 파일 완료 =====
+    async def _finalize(self, job: FileJob):
+        await job.done.wait()
+        for owner in job.depends_on:
+            await owner.done.wait()  # 출처를 남길 대표 청크가 저장된 뒤 기록
+        removed = list(job.existing - job.current)
+        await asyncio.to_thread(
+            record_manifest,
+            job.collection_name,
+            job.source,
+            job.file_hash,
+            len(job.current),
+            job.added,
+            removed,
+        )
+        for record in job.added:
+            if self.pending_rows.get(record.chunk_id) is job:
+                del self.pending_rows[record.chunk_id]  # 저장 완료 → 이후 중복은 기다릴 필요 없음
+        duplicates = sum(record.duplicate_of is not None for record in job.added)
+        result = IngestionResult(
+            collection_name=job.collection_name,
+            source=job.source,
+            added=len(job.added) - duplicates,
+            removed=len(removed),
+            unchanged=len(job.current) - len(job.added),
+            duplicates=duplicates,
+        )
+        self.results.append(result)
+        print(
+            f"✅ {job.source} → {job.collection_name} "
+            f"(추가 {result.added}, 중복 {result.duplicates}, 삭제 {result.removed}, 유지 {result.unchanged})"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="디렉터리 PDF 파이프라인 적재")
+    parser.add_argument("directory")
+    parser.add_argument("--collection", help="모든 파일을 넣을 컬렉션 (기본: 파일명)")
+    parser.add_argument("--pattern", default="*.pdf")
+    parser.add_argument("--workers", type=int, help="파싱 프로세스 수 (기본: INGEST_PARSE_WORKERS 또는 CPU 수)")
+    parser.add_argument("--force", action="store_true", help="파일 hash가 같아도 청크 단위 비교")
+    args = parser.parse_args()
+
+    files = [
+        (str(path), args.collection or path.stem)
+        for path in sorted(Path(args.directory).rglob(args.pattern))
+    ]
+    pipeline = IngestionPipeline(parse_workers=args.workers, force=args.force)
+    try:
+        results = asyncio.run(pipeline.run(files))
+    finally:
+        dispose_vectorstores()
+    skipped = sum(result.skipped for result in results)
+    print(f"📦 파일 {len(results)}개 처리 (변경 없음 {skipped}개)")
+
+
+if __name__ == "__main__":
+    main()
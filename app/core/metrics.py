@@ -0,0 +1,47 @@
+from prometheus_client import Counter, Histogram
+
+"""
+애플리케이션 커스텀 Prometheus 메트릭
+- prometheus_client 기본 REGISTRY에 등록되므로 Instrumentator가 노출하는 /metrics 에 함께 노출됨
+"""
+
+# /agent/execute 응답 캐시 (layer: exact/semantic, result: hit/miss/error)
+RESPONSE_CACHE_REQUESTS = Counter(
+    "agent_response_cache_requests_total",
+    "Agent response cache lookups",
+    ["layer", "result"],
+)
+
+# semantic 캐시 조회 지연 (임베딩 + pgvector 검색)
+SEMANTIC_CACHE_LOOKUP_SECONDS = Histogram(
+    "agent_semantic_cache_lookup_seconds",
+    "Semantic response cache lookup latency (embedding + vector search)",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+# Gemini 임베딩 API 호출 (result: ok/retry/error)
+EMBEDDING_REQUESTS = Counter(
+    "embedding_requests_total",
+    "Gemini embed_content calls",
+    ["result"],
+)
+
+# /agent/execute RAG 컨텍스트 조회 (result: hit/miss/timeout/error)
+RAG_RETRIEVAL_REQUESTS = Counter(
+    "agent_rag_retrieval_requests_total",
+    "Agent RAG context retrievals",
+    ["result"],
+)
+
+RAG_RETRIEVAL_SECONDS = Histogram(
+    "agent_rag_retrieval_seconds",
+    "Agent RAG context retrieval latency (cache + embedding + search)",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+# 임베딩 캐시 (tier: memory/redis, result: hit/miss/error)
+EMBEDDING_CACHE_REQUESTS = Counter(
+    "embedding_cache_requests_total",
+    "Embedding cache lookups per text",
+    ["tier", "result"],
+)
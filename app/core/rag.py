@@ -0,0 +1,174 @@
+import asyncio
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Optional
+
+from google.genai.types import Part
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.core.db.pgvector import get_embeddings
+from app.core.db.redis import redis_client
+from app.core.hot_index import search_vectors
+from app.core.metrics import RAG_RETRIEVAL_REQUESTS, RAG_RETRIEVAL_SECONDS
+from app.core.response_cache import normalize_prompt
+from app.core.retrieval import hybrid_search
+from app.utils.formatter import sanitize_agent_name
+
+"""
+/agent/execute RAG 컨텍스트
+- 에이전트 ↔ 컬렉션 연결: RAG_AGENT_COLLECTIONS[에이전트 이름], 요청의 rag_collection 은 그 안에서만 선택
+- 요청 수신 즉시 검색 task를 시작해 응답 캐시 조회와 동시에 진행, 최대 RAG_TIMEOUT(에이전트별 RAG_AGENT_TIMEOUTS) 까지만 대기
+- 제한 시간을 넘기면 컨텍스트 없이 진행하고, 검색은 백그라운드에서 끝까지 수행해 캐시를 채움 (다음 같은 질문부터 hit)
+- 검색 결과는 (컬렉션, top-k, 정규화된 쿼리) 단위로 Redis에 RAG_CACHE_TTL 동안 캐시
+- 결과 청크는 출처/페이지와 함께 newMessage 의 텍스트 part로 프롬프트 앞에 추가
+"""
+
+CACHE_PREFIX = "rag"
+_background: set[asyncio.Task] = set()  # 제한 시간 후에도 계속 실행 중인 검색 (GC 방지)
+
+
+def agent_collections(agent_name: str) -> list[str]:
+    """에이전트에 연결된 컬렉션 목록 (첫 번째가 기본)"""
+    collections = settings.RAG_AGENT_COLLECTIONS.get(sanitize_agent_name(agent_name)) or []
+    return [collections] if isinstance(collections, str) else list(collections)
+
+
+def get_rag_collection(agent_name: str, requested: Optional[str] = None) -> Optional[str]:
+    """
+    RAG 대상 컬렉션, 연결되지 않은 에이전트면 None
+    - 요청의 rag_collection 은 에이전트에 연결된 컬렉션일 때만 사용, 아니면 무시하고 기본 컬렉션으로 진행
+    """
+    collections = agent_collections(agent_name)
+    if requested and requested in collections:
+        return requested
+    if requested:
+        print(f"⚠️ 에이전트에 연결되지 않은 rag_collection 무시: {agent_name} → {requested}")
+    return collections[0] if collections else None
+
+
+def get_rag_timeout(agent_name: str) -> float:
+    return settings.RAG_AGENT_TIMEOUTS.get(sanitize_agent_name(agent_name), settings.RAG_TIMEOUT)
+
+
+def _cache_key(collection_name: str, query: str, k: int) -> str:
+    query_hash = hashlib.sha256(normalize_prompt(query).encode("utf-8")).hexdigest()
+    return f"{CACHE_PREFIX}:{collection_name}:{settings.RAG_SEARCH_MODE}:{k}:{query_hash}"
+
+
+async def _search(collection_name: str, query: str, k: int) -> list[dict]:
+    if settings.RAG_SEARCH_MODE == "vector":
+        embedding = await get_embeddings().aembed_query(query)
+        results = await asyncio.to_thread(search_vectors, collection_name, embedding, k)
+    else:
+        results = await hybrid_search(collection_name, query, k=k)
+    return [
+        {
+            "text": doc.page_content[:settings.RAG_MAX_CHUNK_CHARS],
+            "source": doc.metadata.get("source"),
+            "page": doc.metadata.get("page"),
+            "score": round(float(score), 4),
+        }
+        for doc, score in results
+    ]
+
+
+async def retrieve_context(collection_name: str, query: str, k: Optional[int] = None) -> list[dict]:
+    """
+    컬렉션 검색 (Redis 캐시 우선)
+    - 반환: [{"text", "source", "page", "score"}]
+    """
+    k = k or settings.RAG_TOP_K
+    key = _cache_key(collection_name, query, k)
+    if settings.RAG_CACHE_TTL > 0:
+        try:
+            raw = await redis_client.get(key)
+            if raw is not None:
+                RAG_RETRIEVAL_REQUESTS.labels(result="hit").inc()
+                return json.loads(raw)
+        except RedisError:
+            pass  # 캐시 장애 시 검색으로 진행
+
+    chunks = await _search(collection_name, query, k)
+    RAG_RETRIEVAL_REQUESTS.labels(result="miss").inc()
+    if settings.RAG_CACHE_TTL > 0:
+        try:
+            await redis_client.set(key, json.dumps(chunks, ensure_ascii=False), ex=settings.RAG_CACHE_TTL)
+        except RedisError:
+            pass
+    return chunks
+
+
+async def fetch_context(collection_name: str, query: str, timeout: Optional[float] = None) -> list[dict]:
+    """
+    timeout(기본 RAG_TIMEOUT) 안에 끝난 검색 결과, 시간 초과/실패 시 빈 리스트
+    - 시간 초과는 agent_rag_retrieval_requests_total{result="timeout"} 으로 집계
+    """
+    timeout = settings.RAG_TIMEOUT if timeout is None else timeout
+    started = time.perf_counter()
+    search = asyncio.create_task(retrieve_context(collection_name, query))
+    try:
+        return await asyncio.wait_for(asyncio.shield(search), timeout=timeout)
+    except asyncio.TimeoutError:
+        RAG_RETRIEVAL_REQUESTS.labels(result="timeout").inc()
+        print(f"⚡ RAG 검색 시간 초과({timeout}s), 컨텍스트 없이 진행: {collection_name}")
+        _keep_running(search)
+        return []
+    except asyncio.CancelledError:
+        _keep_running(search)
+        raise
+    except Exception as e:
+        RAG_RETRIEVAL_REQUESTS.labels(result="error").inc()
+        print(f"❌ RAG 검색 실패 ({collection_name}): {e}")
+        return []
+    finally:
+        RAG_RETRIEVAL_SECONDS.observe(time.perf_counter() - started)
+
+
+def _keep_running(task: asyncio.Task):
+    _background.add(task)
+    task.add_done_callback(_finish_background)
+
+
+def _finish_background(task: asyncio.Task):
+    _background.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"❌ RAG 백그라운드 검색 실패: {task.exception()}")
+
+
+def start_context_fetch(agent_name: str, query: str, requested: Optional[str] = None) -> Optional[asyncio.Task]:
+    """
+    RAG 대상이면 컨텍스트 검색 task를 바로 시작 (호출 측은 다른 작업 후 context_parts 로 결과 수신)
+    """
+    collection_name = get_rag_collection(agent_name, requested)
+    if not collection_name:
+        return None
+    return asyncio.create_task(fetch_context(collection_name, query, get_rag_timeout(agent_name)))
+
+
+def format_chunk(index: int, chunk: dict) -> str:
+    source = Path(chunk["source"]).name if chunk.get("source") else "unknown"
+    # PyMuPDF 페이지 번호는 0부터
+    page = f" p.{chunk['page'] + 1}" if isinstance(chunk.get("page"), int) else ""
+    return f"[참고 {index}] {source}{page}\n{chunk['text']}"
+
+
+async def context_parts(task: Optional[asyncio.Task]) -> list[Part]:
+    """
+    검색 결과를 newMessage 에 넣을 Part 목록으로 변환 (결과가 없으면 빈 리스트)
+    """
+    if task is None:
+        return []
+    chunks = await task
+    if not chunks:
+        return []
+    header = "다음 참고 문서를 근거로 답변하고, 사용한 문서의 출처와 페이지를 밝혀 주세요."
+    return [Part(text=header)] + [Part(text=format_chunk(i, chunk)) for i, chunk in enumerate(chunks, start=1)]
+
+
+def cancel_context_fetch(task: Optional[asyncio.Task]):
+    """응답 캐시 hit 등으로 컨텍스트가 필요 없을 때 (진행 중 검색은 백그라운드로 캐시를 채움)"""
+    if task is not None and not task.done():
+        task.cancel()
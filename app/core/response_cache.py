@@ -0,0 +1,106 @@
+import hashlib
+import json
+import re
+import unicodedata
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.core.db.redis import redis_client
+from app.core.metrics import RESPONSE_CACHE_REQUESTS
+from app.utils.formatter import sanitize_agent_name
+
+"""
+/agent/execute exact-match 응답 캐시 (Redis)
+- key: (user_id, agent_name, agent-config version, 정규화된 prompt의 sha256)
+- agent-config version은 /agent/deploy, /agent/stop 시 INCR → 이전 버전 캐시는 자연스럽게 무효화(TTL로 만료)
+- 캐시 hit 시 ADK를 호출하지 않으므로 해당 턴은 ADK 세션 이력에 남지 않음 (FAQ/스케줄성 에이전트용 opt-in)
+"""
+
+CACHE_PREFIX = "agent_cache"
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt_text: str) -> str:
+    # 유니코드 정규화 + 대소문자/공백 차이 무시
+    text = unicodedata.normalize("NFKC", prompt_text)
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+def agent_scope(user_id: str, agent_name: str) -> str:
+    return f"{user_id}:{sanitize_agent_name(agent_name)}"
+
+
+def _version_key(user_id: str, agent_name: str) -> str:
+    return f"{CACHE_PREFIX}:version:{agent_scope(user_id, agent_name)}"
+
+
+def _response_key(user_id: str, agent_name: str, version: int, prompt_text: str) -> str:
+    prompt_hash = hashlib.sha256(normalize_prompt(prompt_text).encode("utf-8")).hexdigest()
+    return f"{CACHE_PREFIX}:response:{agent_scope(user_id, agent_name)}:v{version}:{prompt_hash}"
+
+
+def get_cache_ttl(agent_name: str) -> int:
+    """에이전트별 TTL(초), 0이면 캐시 사용 안 함"""
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return 0
+    return settings.RESPONSE_CACHE_AGENT_TTLS.get(
+        sanitize_agent_name(agent_name), settings.RESPONSE_CACHE_TTL
+    )
+
+
+def is_cache_enabled(agent_name: str) -> bool:
+    return get_cache_ttl(agent_name) > 0
+
+
+async def get_config_version(user_id: str, agent_name: str) -> int:
+    version = await redis_client.get(_version_key(user_id, agent_name))
+    return int(version) if version else 0
+
+
+async def get_cached_response(user_id: str, agent_name: str, prompt_text: str) -> Optional[dict]:
+    """
+    캐시된 응답 조회 ({"message": ..., "mime_type": ...}), 없거나 Redis 오류 시 None
+    """
+    try:
+        version = await get_config_version(user_id, agent_name)
+        cached = await redis_client.get(_response_key(user_id, agent_name, version, prompt_text))
+    except RedisError as e:
+        print(f"❌ 응답 캐시 조회 실패: {e}")
+        RESPONSE_CACHE_REQUESTS.labels(layer="exact", result="error").inc()
+        return None
+
+    if cached is None:
+        RESPONSE_CACHE_REQUESTS.labels(layer="exact", result="miss").inc()
+        return None
+
+    RESPONSE_CACHE_REQUESTS.labels(layer="exact", result="hit").inc()
+    return json.loads(cached)
+
+
+async def set_cached_response(
+    user_id: str, agent_name: str, prompt_text: str, message: str, mime_type: str
+):
+    ttl = get_cache_ttl(agent_name)
+    if ttl <= 0:
+        return
+    try:
+        version = await get_config_version(user_id, agent_name)
+        await redis_client.set(
+            _response_key(user_id, agent_name, version, prompt_text),
+            json.dumps({"message": message, "mime_type": mime_type}, ensure_ascii=False),
+            ex=ttl,
+        )
+    except RedisError as e:
+        print(f"❌ 응답 캐시 저장 실패: {e}")
+
+
+async def invalidate_agent_cache(user_id: str, agent_name: str):
+    """
+    에이전트 설정 변경(배포/삭제) 시 호출 - version을 올려 기존 캐시를 모두 무효화
+    """
+    try:
+        await redis_client.incr(_version_key(user_id, agent_name))
+    except RedisError as e:
+        print(f"❌ 응답 캐시 무효화 실패: {e}")
@@ -0,0 +1,154 @@
+import asyncio
+import json
+from typing import Optional
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.vectorstores.utils import maximal_marginal_relevance
+from sqlalchemy import text
+
+from app.config import settings
+from app.core.db.pgvector import get_embeddings, get_engine
+from app.core.db.vector_index import get_collection, search_by_vectors
+from app.core.hot_index import search_vectors
+
+"""
+하이브리드 검색 (키워드 + 벡터, Reciprocal Rank Fusion)
+- 키워드: pg_trgm (부분 일치 ILIKE + word_similarity), 컬렉션별 partial GIN 인덱스 사용
+  (python -m app.core.db.vector_index lexical <컬렉션>)
+- 벡터: search_vectors (작은 컬렉션은 메모리 hot 인덱스, 아니면 DB — ANN 인덱스가 있으면 사용)
+- 두 검색을 동시에 실행하고 순위 기반 RRF(1 / (k + rank))로 병합 → 점수 스케일 차이와 무관
+- 짧은 쿼리는 키워드 검색만으로 충분한 결과가 나오면 임베딩 호출 없이 반환
+- 배치 벡터 검색(search_batch): 쿼리 임베딩 1회 배치 호출 + DB 1회 조회, 점수 하한/MMR 재정렬 (/retrieval)
+"""
+
+
+def _like_pattern(query: str) -> str:
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def lexical_search(
+    collection_name: str,
+    query: str,
+    k: int = 4,
+    filter: Optional[dict] = None,
+) -> list[tuple[Document, float]]:
+    """
+    키워드 검색: 부분 일치(ILIKE) 또는 단어 유사도(<%) 조건, word_similarity 내림차순
+    - 반환: [(Document, word_similarity)]
+    """
+    with get_engine().connect() as conn:
+        collection_uuid, _ = get_collection(conn, collection_name)
+        where = f"collection_id = '{collection_uuid}' AND (document ILIKE :pattern OR :query <% document)"
+        params = {"query": query, "pattern": _like_pattern(query), "k": k}
+        if filter:
+            where += " AND cmetadata @> CAST(:filter AS jsonb)"
+            params["filter"] = json.dumps(filter)
+        rows = conn.execute(text(
+            f"SELECT id, document, cmetadata, "
+            f"(document ILIKE :pattern) AS exact, word_similarity(:query, document) AS score "
+            f"FROM langchain_pg_embedding WHERE {where} "
+            f"ORDER BY exact DESC, score DESC LIMIT :k"
+        ), params).all()
+
+    return [
+        (Document(id=row.id, page_content=row.document, metadata=row.cmetadata or {}), row.score)
+        for row in rows
+    ]
+
+
+def reciprocal_rank_fusion(
+    result_lists: list[list[tuple[Document, float]]],
+    k: int = 60,
+) -> list[tuple[Document, float]]:
+    """
+    여러 검색 결과를 순위 기준으로 병합 (문서 id 기준 중복 제거), 반환: [(Document, RRF 점수)] 내림차순
+    """
+    scores: dict[str, float] = {}
+    documents: dict[str, Document] = {}
+    for results in result_lists:
+        for rank, (doc, _) in enumerate(results, start=1):
+            scores[doc.id] = scores.get(doc.id, 0.0) + 1.0 / (k + rank)
+            documents.setdefault(doc.id, doc)
+    return [(documents[doc_id], score) for doc_id, score in sorted(scores.items(), key=lambda x: x[1], reverse=True)]
+
+
+async def hybrid_search(
+    collection_name: str,
+    query: str,
+    k: int = 4,
+    filter: Optional[dict] = None,
+    candidates: Optional[int] = None,
+) -> list[tuple[Document, float]]:
+    """
+    키워드 + 벡터 하이브리드 검색
+    - 각 검색에서 candidates(기본 HYBRID_CANDIDATES)개씩 가져와 RRF 병합 후 상위 k개
+    - 짧은 쿼리(HYBRID_LEXICAL_ONLY_MAX_CHARS 이하)는 쿼리를 그대로 포함한 키워드 결과가 k개 이상이면 임베딩 없이 반환
+    - 반환: [(Document, 점수)] (RRF 점수, 키워드 전용 경로는 word_similarity)
+    """
+    candidates = max(k, candidates or settings.HYBRID_CANDIDATES)
+
+    async def vector_search():
+        embedding = await get_embeddings().aembed_query(query)
+        return await asyncio.to_thread(search_vectors, collection_name, embedding, candidates, filter)
+
+    lexical_coro = asyncio.to_thread(lexical_search, collection_name, query, candidates, filter)
+    if len(query.strip()) <= settings.HYBRID_LEXICAL_ONLY_MAX_CHARS:
+        lexical = await lexical_coro
+        needle = query.strip().casefold()
+        if len(lexical) >= k and all(needle in doc.page_content.casefold() for doc, _ in lexical[:k]):
+            return lexical[:k]  # 상위 k개가 모두 정확히 포함 → 임베딩 생략
+        vector = await vector_search()
+    else:
+        lexical, vector = await asyncio.gather(lexical_coro, vector_search())
+    return reciprocal_rank_fusion([lexical, vector], k=settings.HYBRID_RRF_K)[:k]
+
+
+def _mmr(
+    query_embedding: list[float],
+    hits: list[tuple[Document, float, Optional[list[float]]]],
+    k: int,
+    lambda_mult: float,
+) -> list[tuple[Document, float, Optional[list[float]]]]:
+    if len(hits) <= 1:
+        return hits[:k]
+    candidates = [vector for _, _, vector in hits]
+    dims = len(candidates[0])  # 차원 축소 컬렉션이면 쿼리 벡터도 같은 길이로
+    selected = maximal_marginal_relevance(
+        np.array(query_embedding[:dims], dtype=np.float32), candidates, lambda_mult=lambda_mult, k=k
+    )
+    return [hits[i] for i in selected]
+
+
+async def search_batch(
+    collection_name: str,
+    queries: list[str],
+    k: int = 4,
+    filter: Optional[dict] = None,
+    page_range: Optional[tuple[Optional[int], Optional[int]]] = None,
+    min_score: Optional[float] = None,
+    mmr: bool = False,
+    fetch_k: Optional[int] = None,
+    mmr_lambda: Optional[float] = None,
+) -> list[list[tuple[Document, float]]]:
+    """
+    여러 쿼리 벡터 검색 (임베딩 배치 1회 + search_by_vectors 1회)
+    - min_score: 코사인 유사도(1 - distance) 하한
+    - mmr: fetch_k개 후보에서 MMR로 k개 선택 (관련도/다양성 비율 mmr_lambda)
+    - 반환: 쿼리 순서대로 [(Document, 코사인 유사도)]
+    """
+    embeddings = await get_embeddings().aembed_documents(queries)
+    fetch = max(k, fetch_k or settings.RETRIEVAL_MMR_FETCH_K) if mmr else k
+    rows = await asyncio.to_thread(
+        search_by_vectors, collection_name, embeddings, fetch, filter, page_range, mmr
+    )
+
+    results = []
+    for embedding, hits in zip(embeddings, rows):
+        if min_score is not None:
+            hits = [hit for hit in hits if 1 - hit[1] >= min_score]
+        if mmr:
+            hits = _mmr(embedding, hits, k, settings.RETRIEVAL_MMR_LAMBDA if mmr_lambda is None else mmr_lambda)
+        results.append([(doc, 1 - distance) for doc, distance, _ in hits[:k]])
+    return results
@@ -0,0 +1,255 @@
+import asyncio
+import heapq
+import json
+import time
+import uuid
+from contextlib import suppress
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.core.db.redis import redis_client
+from app.core.deploy_queue import enqueue_deploy
+from app.model.agent_models import UIDeployRequest, UIDeploySchDetail
+from app.utils.formatter import sanitize_agent_name
+from app.utils.timezone import get_KST_timestamp
+
+"""
+예약 배포 스케줄러 (UIDeployRequest.agent_sch_type != "01")
+- 스케줄은 Redis에 저장 → 재시작해도 유지
+    - deploy:schedules       (hash) schedule_id -> 요청 JSON
+    - deploy:schedules:due   (zset) schedule_id -> 다음 실행 시각(epoch)
+- 각 프로세스는 due zset을 주기적으로 읽어 in-process min-heap을 구성하고, 가장 이른 시각까지만 대기
+- 실행 시각이 되면 deploy:schedule:fired:{id}:{ts} 를 SET NX로 선점한 프로세스만 실행 → uvicorn 워커가 여러 개여도 중복 실행 없음
+- 실행은 배포 작업 큐(app.core.deploy_queue)에 넣어 동시 배포 수 제한을 그대로 따름 (초기 메시지는 배포 워커가 전송)
+
+스케줄 해석 (KST 기준)
+- agent_sch_exec_time : 실행 시각 "HH:MM" (또는 "HHMM")
+- agent_sch_exect_week: 실행 요일 "1"(월)~"7"(일) 또는 "MON"~"SUN", 비어 있으면 매일
+- agent_sch_exec_month: 실행 월 "1"~"12", 비어 있으면 매월
+- agent_sch_exec_cycle: 실행 주기
+    - "01"/"02" 1회  : 조건을 만족하는 첫 시각에 한 번 실행 후 스케줄 삭제
+    - "03" 매일      : 요일/월 조건을 만족하는 날마다
+    - "04" 매주      : 지정한 요일마다 (agent_sch_exect_week 필수)
+    - "05" 매월      : 매월 조건(요일)을 만족하는 첫 날, 요일 조건이 없으면 1일
+- 재등록/다음 실행 시각 갱신 시 이전 heap 항목은 due zset 점수와 비교해 실행 시점에 버림
+"""
+
+IMMEDIATE = "01"  # 즉시배포
+
+CYCLE_ONCE = ("01", "02")
+CYCLE_DAILY = "03"
+CYCLE_WEEKLY = "04"
+CYCLE_MONTHLY = "05"
+
+SCHEDULES_KEY = "deploy:schedules"
+DUE_KEY = "deploy:schedules:due"
+FIRED_PREFIX = "deploy:schedule:fired"
+
+KST = timezone(timedelta(hours=9))
+WEEKDAY_NAMES = {"MON": 1, "TUE": 2, "WED": 3, "THU": 4, "FRI": 5, "SAT": 6, "SUN": 7}
+
+_heap: list[tuple[float, str]] = []
+_wakeup = asyncio.Event()
+_tasks: list[asyncio.Task] = []
+
+
+def is_scheduled(request: UIDeployRequest) -> bool:
+    return request.agent_sch_type != IMMEDIATE
+
+
+def schedule_id_for(user_id: str, agent_name: str) -> str:
+    # 사용자/에이전트 당 스케줄 1개 (재배포 시 덮어씀)
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"deploy-schedule:{user_id}:{sanitize_agent_name(agent_name)}"))
+
+
+def _parse_time(value: str) -> tuple[int, int]:
+    value = value.strip().replace(":", "")
+    if len(value) != 4 or not value.isdigit():
+        raise ValueError(f"agent_sch_exec_time 형식이 올바르지 않습니다: {value}")
+    hour, minute = int(value[:2]), int(value[2:])
+    if hour > 23 or minute > 59:
+        raise ValueError(f"agent_sch_exec_time 범위가 올바르지 않습니다: {value}")
+    return hour, minute
+
+
+def _parse_weekday(value: str) -> int:
+    value = value.strip().upper()
+    if value in WEEKDAY_NAMES:
+        return WEEKDAY_NAMES[value]
+    if value.isdigit() and 1 <= int(value) <= 7:
+        return int(value)
+    raise ValueError(f"agent_sch_exect_week 값이 올바르지 않습니다: {value}")
+
+
+def _parse_month(value: str) -> int:
+    if value.strip().isdigit() and 1 <= int(value) <= 12:
+        return int(value)
+    raise ValueError(f"agent_sch_exec_month 값이 올바르지 않습니다: {value}")
+
+
+def is_one_off(detail: UIDeploySchDetail) -> bool:
+    return detail.agent_sch_exec_cycle in CYCLE_ONCE
+
+
+def next_run_time(detail: UIDeploySchDetail, after: datetime) -> Optional[datetime]:
+    """after 이후 첫 실행 시각, 실행 주기(agent_sch_exec_cycle) 기준 (조건을 만족하는 날이 1년 내에 없으면 None)"""
+    cycle = detail.agent_sch_exec_cycle
+    if cycle not in (*CYCLE_ONCE, CYCLE_DAILY, CYCLE_WEEKLY, CYCLE_MONTHLY):
+        raise ValueError(f"agent_sch_exec_cycle 값이 올바르지 않습니다: {cycle}")
+    hour, minute = _parse_time(detail.agent_sch_exec_time)
+    weekdays = {_parse_weekday(v) for v in detail.agent_sch_exect_week}
+    months = {_parse_month(v) for v in detail.agent_sch_exec_month}
+    if cycle == CYCLE_WEEKLY and not weekdays:
+        raise ValueError("매주 실행은 agent_sch_exect_week 가 필요합니다.")
+
+    def matches(day) -> bool:
+        return (not months or day.month in months) and (not weekdays or day.isoweekday() in weekdays)
+
+    def first_in_month(day) -> bool:
+        # 매월: 그 달에서 조건을 만족하는 첫 날만
+        return not any(matches(day.replace(day=d)) for d in range(1, day.day))
+
+    after = after.astimezone(KST)
+    day = after.date()
+    for _ in range(366 + 31):
+        if matches(day) and (cycle != CYCLE_MONTHLY or first_in_month(day)):
+            candidate = datetime(day.year, day.month, day.day, hour, minute, tzinfo=KST)
+            if candidate > after:
+                return candidate
+        day += timedelta(days=1)
+    return None
+
+
+def _drop_heap_entries(schedule_id: str):
+    _heap[:] = [entry for entry in _heap if entry[1] != schedule_id]
+    heapq.heapify(_heap)
+
+
+async def register_schedule(request: UIDeployRequest) -> tuple[str, datetime]:
+    """
+    예약 배포 등록 (같은 사용자/에이전트의 기존 스케줄은 교체)
+    - 반환: (schedule_id, 첫 실행 시각)
+    """
+    run_at = next_run_time(request.agent_sch_detail, datetime.now(KST))
+    if run_at is None:
+        raise ValueError("조건을 만족하는 실행 시각이 없습니다.")
+
+    schedule_id = schedule_id_for(request.user_id, request.agent_name)
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.hset(SCHEDULES_KEY, schedule_id, json.dumps({
+            "request": request.model_dump(mode="json"),
+            "created_at": get_KST_timestamp(),
+        }, ensure_ascii=False))
+        pipe.zadd(DUE_KEY, {schedule_id: run_at.timestamp()})
+        await pipe.execute()
+
+    # 이전 실행 시각 항목 교체 (다른 프로세스의 heap은 실행 시점 점수 비교로 걸러짐)
+    _drop_heap_entries(schedule_id)
+    heapq.heappush(_heap, (run_at.timestamp(), schedule_id))
+    _wakeup.set()
+    return schedule_id, run_at
+
+
+async def remove_schedule(user_id: str, agent_name: str) -> bool:
+    schedule_id = schedule_id_for(user_id, agent_name)
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.hdel(SCHEDULES_KEY, schedule_id)
+        pipe.zrem(DUE_KEY, schedule_id)
+        removed, _ = await pipe.execute()
+    _drop_heap_entries(schedule_id)  # 다른 프로세스의 heap 항목은 실행 시점에 zset 조회로 걸러짐
+    return bool(removed)
+
+
+async def _sync_from_redis():
+    """due zset 기준으로 heap 재구성 (다른 프로세스에서 등록/삭제한 스케줄 반영)"""
+    entries = await redis_client.zrange(DUE_KEY, 0, -1, withscores=True)
+    _heap[:] = [(score, schedule_id) for schedule_id, score in entries]
+    heapq.heapify(_heap)
+    _wakeup.set()
+
+
+async def _fire(schedule_id: str, due_ts: float):
+    # 재등록/삭제/이미 실행되어 실행 시각이 바뀐 항목은 버림
+    current = await redis_client.zscore(DUE_KEY, schedule_id)
+    if current is None or int(current) != int(due_ts):
+        return
+
+    # 같은 (스케줄, 실행 시각)은 한 프로세스만 실행
+    claimed = await redis_client.set(
+        f"{FIRED_PREFIX}:{schedule_id}:{int(due_ts)}", "1", nx=True, ex=settings.SCHEDULER_FIRED_LOCK_TTL
+    )
+    if not claimed:
+        return
+
+    raw = await redis_client.hget(SCHEDULES_KEY, schedule_id)
+    if raw is None:  # 삭제된 스케줄
+        await redis_client.zrem(DUE_KEY, schedule_id)
+        return
+    request = UIDeployRequest.model_validate(json.loads(raw)["request"])
+
+    # 다음 실행 시각을 먼저 기록한 뒤 배포 작업 등록 (1회 실행은 스케줄 삭제)
+    run_at = None
+    if not is_one_off(request.agent_sch_detail):
+        run_at = next_run_time(request.agent_sch_detail, datetime.fromtimestamp(due_ts, KST))
+    if run_at is None:
+        await remove_schedule(request.user_id, request.agent_name)
+    else:
+        await redis_client.zadd(DUE_KEY, {schedule_id: run_at.timestamp()}, xx=True)
+        heapq.heappush(_heap, (run_at.timestamp(), schedule_id))
+
+    job_id = await enqueue_deploy(request)
+    print(f"⏰ 예약 배포 실행: schedule={schedule_id}, job={job_id}")
+
+
+async def _timer_loop():
+    while True:
+        try:
+            if not _heap:
+                _wakeup.clear()
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(_wakeup.wait(), timeout=settings.SCHEDULER_SYNC_INTERVAL)
+                continue
+
+            due_ts, schedule_id = _heap[0]
+            delay = due_ts - time.time()
+            if delay > 0:
+                _wakeup.clear()
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(_wakeup.wait(), timeout=delay)
+                continue
+
+            heapq.heappop(_heap)
+            await _fire(schedule_id, due_ts)
+        except asyncio.CancelledError:
+            raise
+        except (RedisError, ValueError) as e:
+            print(f"❌ 예약 배포 실행 실패: {e}")
+            await asyncio.sleep(1)
+
+
+async def _sync_loop():
+    while True:
+        try:
+            await _sync_from_redis()
+        except RedisError as e:
+            print(f"❌ 예약 배포 스케줄 동기화 실패: {e}")
+        await asyncio.sleep(settings.SCHEDULER_SYNC_INTERVAL)
+
+
+async def start_scheduler():
+    if not settings.SCHEDULER_ENABLED:
+        return
+    _tasks.append(asyncio.create_task(_sync_loop()))
+    _tasks.append(asyncio.create_task(_timer_loop()))
+
+
+async def stop_scheduler():
+    for task in _tasks:
+        task.cancel()
+    for task in _tasks:
+        with suppress(asyncio.CancelledError):
+            await task
+    _tasks.clear()
@@ -0,0 +1,133 @@
+import asyncio
+import time
+import uuid
+from typing import Optional
+
+
+from app.config import settings
+from app.core.db.pgvector import get_vectorstore
+from app.core.db.redis import redis_client
+from app.core.metrics import RESPONSE_CACHE_REQUESTS, SEMANTIC_CACHE_LOOKUP_SECONDS
+from app.core.response_cache import agent_scope, get_config_version, normalize_prompt
+from app.utils.formatter import sanitize_agent_name
+
+"""
+/agent/execute semantic 응답 캐시 (pgvector)
+- prompt를 임베딩해 같은 에이전트(user_id, agent_name)의 이전 prompt 중 가장 가까운 것을 조회
+- 코사인 유사도가 에이전트별 임계값 이상이면 저장된 응답을 반환
+- 에이전트별 최대 개수(SEMANTIC_CACHE_MAX_ENTRIES)를 넘으면 오래된 항목부터 삭제 (Redis ZSET으로 순서 관리)
+- exact 캐시와 같은 agent-config version을 metadata filter로 사용 → 배포/삭제 시 함께 무효화
+"""
+
+ENTRIES_PREFIX = "semantic_cache:entries"
+
+def _get_cache_vectorstore():
+    # PGVector 레지스트리에서 공유 (엔진/임베딩 재사용)
+    return get_vectorstore(collection_name=settings.SEMANTIC_CACHE_COLLECTION)
+
+
+def _entries_key(scope: str) -> str:
+    return f"{ENTRIES_PREFIX}:{scope}"
+
+
+def get_similarity_threshold(agent_name: str) -> float:
+    return settings.SEMANTIC_CACHE_AGENT_THRESHOLDS.get(
+        sanitize_agent_name(agent_name), settings.SEMANTIC_CACHE_THRESHOLD
+    )
+
+
+def is_semantic_cache_enabled(agent_name: str) -> bool:
+    if not settings.SEMANTIC_CACHE_ENABLED:
+        return False
+    return get_similarity_threshold(agent_name) <= 1.0
+
+
+async def lookup_semantic_cache(
+    user_id: str, agent_name: str, prompt_text: str
+) -> tuple[Optional[dict], Optional[list[float]]]:
+    """
+    가장 유사한 이전 prompt의 응답 조회
+    - 반환: (캐시 응답 | None, prompt 임베딩) → miss 시 저장할 때 임베딩을 재사용
+    """
+    scope = agent_scope(user_id, agent_name)
+    started = time.perf_counter()
+    try:
+        vectorstore = _get_cache_vectorstore()
+        embedding = await vectorstore.embeddings.aembed_query(normalize_prompt(prompt_text))
+        version = await get_config_version(user_id, agent_name)
+        results = await asyncio.to_thread(
+            vectorstore.similarity_search_with_score_by_vector,
+            embedding,
+            k=1,
+            filter={"scope": {"$eq": scope}, "config_version": {"$eq": version}},
+        )
+    except Exception as e:
+        print(f"❌ semantic 캐시 조회 실패: {e}")
+        RESPONSE_CACHE_REQUESTS.labels(layer="semantic", result="error").inc()
+        return None, None
+    finally:
+        SEMANTIC_CACHE_LOOKUP_SECONDS.observe(time.perf_counter() - started)
+
+    if results:
+        doc, distance = results[0]
+        similarity = 1.0 - distance  # PGVector 기본 거리 = cosine distance
+        if similarity >= get_similarity_threshold(agent_name):
+            RESPONSE_CACHE_REQUESTS.labels(layer="semantic", result="hit").inc()
+            return {
+                "message": doc.metadata["message"],
+                "mime_type": doc.metadata["mime_type"],
+            }, embedding
+
+    RESPONSE_CACHE_REQUESTS.labels(layer="semantic", result="miss").inc()
+    return None, embedding
+
+
+async def store_semantic_cache(
+    user_id: str,
+    agent_name: str,
+    prompt_text: str,
+    embedding: list[float],
+    message: str,
+    mime_type: str,
+):
+    scope = agent_scope(user_id, agent_name)
+    entry_id = str(uuid.uuid4())
+    try:
+        version = await get_config_version(user_id, agent_name)
+        vectorstore = _get_cache_vectorstore()
+        await asyncio.to_thread(
+            vectorstore.add_embeddings,
+            texts=[normalize_prompt(prompt_text)],
+            embeddings=[embedding],
+            metadatas=[{
+                "scope": scope,
+                "config_version": version,
+                "message": message,
+                "mime_type": mime_type,
+            }],
+            ids=[entry_id],
+        )
+
+        # 크기 제한: 에이전트별 오래된 항목부터 제거
+        key = _entries_key(scope)
+        await redis_client.zadd(key, {entry_id: time.time()})
+        overflow = await redis_client.zcard(key) - settings.SEMANTIC_CACHE_MAX_ENTRIES
+        if overflow > 0:
+            evicted = await redis_client.zpopmin(key, overflow)
+            await asyncio.to_thread(vectorstore.delete, ids=[entry for entry, _ in evicted])
+    except Exception as e:
+        print(f"❌ semantic 캐시 저장 실패: {e}")
+
+
+async def invalidate_semantic_cache(user_id: str, agent_name: str):
+    """
+    에이전트 배포/삭제 시 해당 에이전트의 semantic 캐시 항목을 모두 삭제
+    """
+    key = _entries_key(agent_scope(user_id, agent_name))
+    try:
+        entry_ids = await redis_client.zrange(key, 0, -1)
+        if entry_ids:
+            await asyncio.to_thread(_get_cache_vectorstore().delete, ids=list(entry_ids))
+        await redis_client.delete(key)
+    except Exception as e:
+        print(f"❌ semantic 캐시 무효화 실패: {e}")
@@ -0,0 +1,148 @@
+import asyncio
+from contextlib import suppress
+from typing import Optional
+
+from google.adk.sessions.database_session_service import StorageEvent, StorageSession
+from sqlalchemy import delete, func, literal_column, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+
+from app.config import settings
+from app.core.db.async_postgres import async_engine
+from app.model.tables import metadata, session_snapshots, session_tombstones
+
+"""
+세션 soft delete / 일괄 정리
+- 삭제 요청은 session_tombstones에 (세션, purge_after)만 기록 → 목록/이력 조회에서 즉시 제외
+- 실제 삭제는 리퍼가 purge_after 지난 세션을 배치 단위로 events/snapshots/sessions 에서 set-based DELETE
+  (세션당 ADK DELETE 호출 없음)
+- 배치는 FOR UPDATE SKIP LOCKED로 가져오므로 여러 프로세스에서 리퍼가 돌아도 겹치지 않음
+"""
+
+_NOW = literal_column("LOCALTIMESTAMP")  # sessions.update_time(TIMESTAMP)과 같은 기준
+
+
+def _days(days: int):
+    # make_interval(years, months, weeks, days)
+    return func.make_interval(0, 0, 0, days)
+
+
+_reaper_task: Optional[asyncio.Task] = None
+
+
+async def ensure_lifecycle_tables():
+    async with async_engine.begin() as conn:
+        await conn.run_sync(metadata.create_all, tables=[session_tombstones, session_snapshots])
+
+
+async def soft_delete_sessions(
+    app_name: str,
+    user_id: str,
+    session_ids: Optional[list[str]] = None,
+    idle_days: Optional[int] = None,
+    purge_delay_days: Optional[int] = None,
+) -> int:
+    """
+    세션 soft delete, 새로 삭제 처리된 세션 수 반환
+    - session_ids: 지정한 세션만 / idle_days: N일 이상 업데이트 없는 세션만 / 둘 다 없으면 해당 app/user 전체
+    - purge_delay_days 후 리퍼가 실제 삭제 (0이면 다음 리퍼 주기)
+    """
+    if purge_delay_days is None:
+        purge_delay_days = settings.SESSION_PURGE_DELAY_DAYS
+
+    targets = (
+        select(
+            StorageSession.app_name,
+            StorageSession.user_id,
+            StorageSession.id,
+            _NOW + _days(purge_delay_days),
+        )
+        .where(StorageSession.app_name == app_name)
+        .where(StorageSession.user_id == user_id)
+    )
+    if session_ids is not None:
+        targets = targets.where(StorageSession.id.in_(session_ids))
+    if idle_days is not None:
+        targets = targets.where(StorageSession.update_time < _NOW - _days(idle_days))
+
+    stmt = insert(session_tombstones).from_select(
+        ["app_name", "user_id", "session_id", "purge_after"], targets
+    ).on_conflict_do_nothing()
+    async with async_engine.begin() as conn:
+        return (await conn.execute(stmt)).rowcount
+
+
+async def purge_session_batch(batch_size: int) -> int:
+    """
+    purge_after 지난 세션 batch_size개를 실제 삭제, 삭제한 세션 수 반환
+    - 한 트랜잭션 안에서 events → session_snapshots → sessions → tombstones 순으로 배치 DELETE
+    """
+    t = session_tombstones.c
+    async with async_engine.begin() as conn:
+        keys = (await conn.execute(
+            select(t.app_name, t.user_id, t.session_id)
+            .where(t.purge_after <= _NOW)
+            .order_by(t.purge_after)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )).all()
+        if not keys:
+            return 0
+        keys = [tuple(key) for key in keys]
+
+        s = session_snapshots.c
+        await conn.execute(delete(StorageEvent).where(
+            tuple_(StorageEvent.app_name, StorageEvent.user_id, StorageEvent.session_id).in_(keys)
+        ))
+        await conn.execute(delete(session_snapshots).where(
+            tuple_(s.app_name, s.user_id, s.session_id).in_(keys)
+        ))
+        await conn.execute(delete(StorageSession).where(
+            tuple_(StorageSession.app_name, StorageSession.user_id, StorageSession.id).in_(keys)
+        ))
+        await conn.execute(delete(session_tombstones).where(
+            tuple_(t.app_name, t.user_id, t.session_id).in_(keys)
+        ))
+        return len(keys)
+
+
+async def run_reaper_cycle() -> int:
+    """
+    삭제 대상이 없거나 주기당 최대 배치 수에 도달할 때까지 배치 삭제, 삭제한 세션 수 반환
+    """
+    purged = 0
+    for _ in range(settings.SESSION_REAPER_MAX_BATCHES):
+        count = await purge_session_batch(settings.SESSION_REAPER_BATCH_SIZE)
+        purged += count
+        if count < settings.SESSION_REAPER_BATCH_SIZE:
+            break
+    return purged
+
+
+async def _reaper_loop():
+    while True:
+        try:
+            purged = await run_reaper_cycle()
+            if purged:
+                print(f"🧹 세션 삭제: {purged}건")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # DB 연결 실패(OSError, 타임아웃 등)에도 루프는 계속 (다음 주기에 재시도)
+            print(f"❌ 세션 리퍼 실패: {e!r}")
+        await asyncio.sleep(settings.SESSION_REAPER_INTERVAL)
+
+
+async def start_session_reaper():
+    global _reaper_task
+    if not settings.SESSION_REAPER_ENABLED:
+        return
+    _reaper_task = asyncio.create_task(_reaper_loop())
+
+
+async def stop_session_reaper():
+    global _reaper_task
+    if _reaper_task is not None:
+        _reaper_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await _reaper_task
+        _reaper_task = None
@@ -0,0 +1,142 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import suppress
+
+from app.config import settings
+from app.core.chat_client import adk_client
+from app.utils.formatter import sanitize_agent_name
+
+"""
+ADK 세션 사전 생성 풀 (opt-in, SESSION_POOL_SIZE / SESSION_POOL_AGENT_SIZES)
+- (user_id, agent_name) 별로 미리 만들어 둔 세션을 deque에서 O(1)로 꺼내 사용
+- agent_name 은 배포 시와 같이 sanitize_agent_name 으로 정규화해 키/ADK 앱 이름으로 사용
+- 풀에서 꺼내면 백그라운드 refill 워커가 목표 크기까지 천천히 다시 채움 (API 요청보다 낮은 우선순위)
+- 풀이 비어 있으면 기존처럼 ADK에 바로 생성 요청
+- 사용되지 않은 채 SESSION_POOL_TTL이 지난 세션은 reaper가 ADK에서 삭제
+- 풀은 프로세스 내 메모리에만 있으며, 종료 시 남은 세션은 삭제
+"""
+
+_pools: dict[tuple[str, str], deque[tuple[str, float]]] = {}  # key -> (session_id, 생성 시각)
+_refill_queue: asyncio.Queue = asyncio.Queue()
+_refill_pending: set[tuple[str, str]] = set()
+_tasks: list[asyncio.Task] = []
+_background: set[asyncio.Task] = set()
+
+
+def _session_url(user_id: str, agent_name: str) -> str:
+    return f"{settings.BASE_URL}:30080/users/{user_id}/apps/{agent_name}/users/{user_id}/sessions"
+
+
+def get_pool_size(agent_name: str) -> int:
+    return settings.SESSION_POOL_AGENT_SIZES.get(
+        sanitize_agent_name(agent_name), settings.SESSION_POOL_SIZE
+    )
+
+
+async def create_adk_session(user_id: str, agent_name: str) -> str:
+    payload = {"app_name": agent_name, "user_id": user_id}
+    session = await adk_client.post_client(_session_url(user_id, agent_name), payload=payload)
+    return session["id"]
+
+
+async def _delete_adk_session(user_id: str, agent_name: str, session_id: str):
+    try:
+        await adk_client.delete_client(f"{_session_url(user_id, agent_name)}/{session_id}")
+    except Exception as e:
+        print(f"❌ 풀 세션 삭제 실패({agent_name}/{session_id}): {e}")
+
+
+def _schedule_refill(key: tuple[str, str]):
+    if key not in _refill_pending:
+        _refill_pending.add(key)
+        _refill_queue.put_nowait(key)
+
+
+async def acquire_session(user_id: str, agent_name: str) -> str:
+    """
+    세션 ID 반환 - 풀에 유효한 세션이 있으면 바로, 없으면 ADK에 생성 요청
+    """
+    user_id, agent_name = str(user_id), sanitize_agent_name(agent_name)
+    if get_pool_size(agent_name) <= 0:
+        return await create_adk_session(user_id, agent_name)
+
+    key = (user_id, agent_name)
+    pool = _pools.setdefault(key, deque())
+    expires_before = time.monotonic() - settings.SESSION_POOL_TTL
+    session_id = None
+    while pool:
+        candidate, created_at = pool.popleft()
+        if created_at >= expires_before:
+            session_id = candidate
+            break
+        task = asyncio.create_task(_delete_adk_session(user_id, agent_name, candidate))
+        _background.add(task)
+        task.add_done_callback(_background.discard)
+
+    _schedule_refill(key)
+    if session_id is None:
+        session_id = await create_adk_session(user_id, agent_name)
+    return session_id
+
+
+async def drop_pool(user_id: str, agent_name: str):
+    """에이전트 삭제 시 해당 풀의 세션 정리"""
+    user_id, agent_name = str(user_id), sanitize_agent_name(agent_name)
+    pool = _pools.pop((user_id, agent_name), None)
+    while pool:
+        session_id, _ = pool.popleft()
+        await _delete_adk_session(user_id, agent_name, session_id)
+
+
+async def _refill_worker():
+    while True:
+        key = await _refill_queue.get()
+        _refill_pending.discard(key)
+        user_id, agent_name = key
+        pool = _pools.get(key)
+        try:
+            while pool is not None and len(pool) < get_pool_size(agent_name):
+                session_id = await create_adk_session(user_id, agent_name)
+                if _pools.get(key) is not pool:
+                    # 생성 도중 drop_pool 된 경우 방금 만든 세션 정리
+                    await _delete_adk_session(user_id, agent_name, session_id)
+                    break
+                pool.append((session_id, time.monotonic()))
+                # 요청 처리에 양보 (낮은 우선순위)
+                await asyncio.sleep(settings.SESSION_POOL_REFILL_DELAY)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"❌ 세션 풀 채우기 실패({agent_name}): {e}")
+
+
+async def _reaper():
+    while True:
+        await asyncio.sleep(settings.SESSION_POOL_REAP_INTERVAL)
+        expires_before = time.monotonic() - settings.SESSION_POOL_TTL
+        for (user_id, agent_name), pool in list(_pools.items()):
+            expired = []
+            while pool and pool[0][1] < expires_before:  # 오래된 세션이 앞쪽
+                expired.append(pool.popleft()[0])
+            for session_id in expired:
+                await _delete_adk_session(user_id, agent_name, session_id)
+
+
+async def start_session_pool():
+    for _ in range(settings.SESSION_POOL_REFILL_CONCURRENCY):
+        _tasks.append(asyncio.create_task(_refill_worker()))
+    _tasks.append(asyncio.create_task(_reaper()))
+
+
+async def stop_session_pool():
+    for task in _tasks:
+        task.cancel()
+    for task in _tasks:
+        with suppress(asyncio.CancelledError):
+            await task
+    _tasks.clear()
+
+    # 사용되지 않은 세션 정리
+    for user_id, agent_name in list(_pools):
+        await drop_pool(user_id, agent_name)
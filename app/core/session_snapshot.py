@@ -0,0 +1,302 @@
+import asyncio
+from contextlib import suppress
+from typing import Optional
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert
+
+from app.config import settings
+from app.core.db.async_postgres import async_engine, encode_cursor, is_session_deleted
+from app.model.tables import metadata, session_compaction_runs, session_snapshots
+
+"""
+세션 스냅샷/컴팩션
+- 이벤트가 일정 개수(SESSION_SNAPSHOT_MIN_EVENTS) 이상 쌓였거나, 스냅샷 이후 첫 이벤트가 일정 시간(SESSION_SNAPSHOT_MAX_AGE)을 넘긴 세션은
+  현재 세션 상태 + 요약(summary)을 session_snapshots에 기록 (세션당 최신 1건, upsert)
+- 스냅샷은 마지막으로 포함한 이벤트의 (timestamp, id)를 가지므로, 읽는 쪽은 스냅샷 + 그 이후 이벤트만 조회하면 됨
+- 요약은 이전 스냅샷 요약에 새 이벤트분만 더해 갱신 (전체 이벤트 재스캔 없음)
+- 여러 프로세스에서 실행되어도 advisory lock으로 한 번에 하나의 컴팩터만 동작
+- 후보는 지난 pass(session_compaction_runs.last_run_at) 이후 변경되었거나 그 사이 시간 기준을 넘긴 세션만,
+  (update_time, app_name, user_id, id) keyset 페이지로 조회하고 위치를 저장해 다음 주기에 이어서 조회 (전체 재조회 없음)
+- 기본값은 사용 안 함 (SESSION_COMPACTION_ENABLED)
+"""
+
+COMPACTOR_LOCK_ID = 7_300_001  # pg advisory lock key
+
+# 후보 조회 한 페이지: (update_time, app_name, user_id, id) keyset 순서로 SCAN_SIZE개 세션을 읽고 그 세션들만 이벤트 수를 셈
+# - 지난 pass(since) 이후 변경된 세션 + update_time 이 (since - max_age, run_at - max_age] 라 이번 pass에 시간 기준을 처음 넘길 수 있는 세션
+# - since 가 NULL(첫 pass)이면 전체 세션, run_at 이후 변경된 세션은 다음 pass에서 처리
+CANDIDATES_SQL = text("""
+    WITH page AS (
+        SELECT s.app_name, s.user_id, s.id, s.update_time,
+               snap.last_event_timestamp, snap.last_event_id, snap.session_id IS NOT NULL AS has_snapshot
+        FROM sessions s
+        LEFT JOIN session_snapshots snap
+          ON snap.app_name = s.app_name AND snap.user_id = s.user_id AND snap.session_id = s.id
+        WHERE s.update_time <= CAST(:run_at AS TIMESTAMP)
+          AND (CAST(:since AS TIMESTAMP) IS NULL
+               OR s.update_time > CAST(:since AS TIMESTAMP)
+               OR (s.update_time > CAST(:since AS TIMESTAMP) - make_interval(secs => :max_age)
+                   AND s.update_time <= CAST(:run_at AS TIMESTAMP) - make_interval(secs => :max_age)))
+          AND (CAST(:after_time AS TIMESTAMP) IS NULL
+               OR (s.update_time, s.app_name, s.user_id, s.id)
+                  > (CAST(:after_time AS TIMESTAMP), CAST(:after_app AS VARCHAR),
+                     CAST(:after_user AS VARCHAR), CAST(:after_id AS VARCHAR)))
+          AND (snap.session_id IS NULL OR s.update_time > snap.created_at)
+          AND NOT EXISTS (
+              SELECT 1 FROM session_tombstones t
+              WHERE t.app_name = s.app_name AND t.user_id = s.user_id AND t.session_id = s.id
+          )
+        ORDER BY s.update_time, s.app_name, s.user_id, s.id
+        LIMIT :scan_size
+    )
+    SELECT page.app_name, page.user_id, page.id AS session_id, page.update_time,
+           (stats.new_events >= :min_events
+            OR (stats.new_events > 0
+                AND stats.oldest_new < CAST(:run_at AS TIMESTAMP) - make_interval(secs => :max_age))) AS eligible
+    FROM page
+    CROSS JOIN LATERAL (
+        SELECT count(*) AS new_events, min(e.timestamp) AS oldest_new
+        FROM events e
+        WHERE e.app_name = page.app_name AND e.user_id = page.user_id AND e.session_id = page.id
+          AND (NOT page.has_snapshot
+               OR (e.timestamp, e.id) > (page.last_event_timestamp, page.last_event_id))
+    ) stats
+    ORDER BY page.update_time, page.app_name, page.user_id, page.id
+""")
+
+NEW_EVENT_STATS_SQL = text("""
+    SELECT e.author, count(*) AS cnt, min(e.timestamp) AS first_at, max(e.timestamp) AS last_at
+    FROM events e
+    WHERE e.app_name = :app_name AND e.user_id = :user_id AND e.session_id = :session_id
+      AND (CAST(:after_ts AS TIMESTAMP) IS NULL
+           OR (e.timestamp, e.id) > (CAST(:after_ts AS TIMESTAMP), CAST(:after_id AS VARCHAR)))
+    GROUP BY e.author
+""")
+
+LAST_EVENT_SQL = text("""
+    SELECT e.id, e.timestamp, e.content -> 'parts' -> 0 ->> 'text' AS last_text
+    FROM events e
+    WHERE e.app_name = :app_name AND e.user_id = :user_id AND e.session_id = :session_id
+    ORDER BY e.timestamp DESC, e.id DESC
+    LIMIT 1
+""")
+
+SESSION_STATE_SQL = text("""
+    SELECT state FROM sessions WHERE app_name = :app_name AND user_id = :user_id AND id = :session_id
+""")
+
+# 스냅샷 시점의 상태/이벤트가 일관되도록 REPEATABLE READ로 읽음
+_snapshot_engine = async_engine.execution_options(isolation_level="REPEATABLE READ")
+_compactor_task: Optional[asyncio.Task] = None
+
+
+async def ensure_snapshot_table():
+    async with async_engine.begin() as conn:
+        await conn.run_sync(metadata.create_all, tables=[session_snapshots, session_compaction_runs])
+
+
+async def compact_session(app_name: str, user_id: str, session_id: str) -> Optional[dict]:
+    """
+    세션 하나의 스냅샷 생성/갱신 후 요약 반환, 새 이벤트가 없으면 None
+    """
+    key = {"app_name": app_name, "user_id": user_id, "session_id": session_id}
+    async with _snapshot_engine.begin() as conn:
+        previous = (await conn.execute(
+            select(session_snapshots).where(
+                session_snapshots.c.app_name == app_name,
+                session_snapshots.c.user_id == user_id,
+                session_snapshots.c.session_id == session_id,
+            )
+        )).mappings().first()
+
+        stats = (await conn.execute(NEW_EVENT_STATS_SQL, {
+            **key,
+            "after_ts": previous["last_event_timestamp"] if previous else None,
+            "after_id": previous["last_event_id"] if previous else None,
+        })).all()
+        if not stats:
+            return None
+
+        last_event = (await conn.execute(LAST_EVENT_SQL, key)).first()
+        state = (await conn.execute(SESSION_STATE_SQL, key)).scalar_one_or_none()
+        if state is None:  # 그 사이 삭제된 세션
+            return None
+
+        # 이전 요약에 새 이벤트분을 누적
+        summary = dict(previous["summary"]) if previous else {"authors": {}}
+        authors = dict(summary.get("authors", {}))
+        for row in stats:
+            author = row.author or "unknown"
+            authors[author] = authors.get(author, 0) + row.cnt
+        new_count = sum(row.cnt for row in stats)
+        event_count = (previous["event_count"] if previous else 0) + new_count
+        summary.update({
+            "authors": authors,
+            "event_count": event_count,
+            "first_event_at": summary.get("first_event_at") or min(row.first_at for row in stats).isoformat(),
+            "last_event_at": last_event.timestamp.isoformat(),
+            "last_text": (last_event.last_text or "")[:500],
+        })
+
+        values = {
+            **key,
+            "state": state,
+            "summary": summary,
+            "event_count": event_count,
+            "last_event_timestamp": last_event.timestamp,
+            "last_event_id": last_event.id,
+            "created_at": func.now(),  # sessions.update_time과 같은 DB 시계 기준
+        }
+        stmt = insert(session_snapshots).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["app_name", "user_id", "session_id"],
+            set_={k: stmt.excluded[k] for k in values if k not in key},
+        )
+        await conn.execute(stmt)
+        return summary
+
+
+async def _load_scan_state(conn) -> dict:
+    """진행 중인 pass 위치, 없으면 새 pass 시작 (기준시간 = 현재 DB 시각)"""
+    state = (await conn.execute(
+        select(session_compaction_runs).where(session_compaction_runs.c.id == 1)
+    )).mappings().first()
+    state = dict(state) if state else {"last_run_at": None, "pass_run_at": None}
+    if state["pass_run_at"] is None:
+        state.update({
+            "pass_run_at": (await conn.execute(text("SELECT LOCALTIMESTAMP"))).scalar_one(),
+            "cursor_update_time": None,
+            "cursor_app_name": None,
+            "cursor_user_id": None,
+            "cursor_session_id": None,
+        })
+    return state
+
+
+async def _save_scan_state(conn, state: dict):
+    values = {k: state[k] for k in (
+        "last_run_at", "pass_run_at", "cursor_update_time", "cursor_app_name", "cursor_user_id", "cursor_session_id",
+    )}
+    stmt = insert(session_compaction_runs).values(id=1, **values)
+    await conn.execute(stmt.on_conflict_do_update(index_elements=["id"], set_=values))
+
+
+async def run_compaction_cycle() -> int:
+    """
+    임계값을 넘은 세션들의 스냅샷 갱신, 처리한 세션 수 반환
+    - 후보는 keyset 페이지 단위로 조회하고 위치를 session_compaction_runs 에 저장 → 다음 주기에 이어서 조회
+    - 주기당 스냅샷 SESSION_COMPACTION_BATCH_SIZE 건, 조회 SESSION_COMPACTION_MAX_PAGES 페이지까지
+    """
+    async with async_engine.connect() as lock_conn:
+        locked = (await lock_conn.execute(
+            text("SELECT pg_try_advisory_lock(:lock_id)"), {"lock_id": COMPACTOR_LOCK_ID}
+        )).scalar()
+        if not locked:
+            return 0  # 다른 프로세스가 컴팩션 중
+        try:
+            async with async_engine.connect() as conn:
+                state = await _load_scan_state(conn)
+
+            compacted = 0
+            for _ in range(settings.SESSION_COMPACTION_MAX_PAGES):
+                async with async_engine.connect() as conn:
+                    page = (await conn.execute(CANDIDATES_SQL, {
+                        "since": state["last_run_at"],
+                        "run_at": state["pass_run_at"],
+                        "after_time": state["cursor_update_time"],
+                        "after_app": state["cursor_app_name"],
+                        "after_user": state["cursor_user_id"],
+                        "after_id": state["cursor_session_id"],
+                        "min_events": settings.SESSION_SNAPSHOT_MIN_EVENTS,
+                        "max_age": settings.SESSION_SNAPSHOT_MAX_AGE,
+                        "scan_size": settings.SESSION_COMPACTION_SCAN_SIZE,
+                    })).all()
+
+                for row in page:
+                    if compacted >= settings.SESSION_COMPACTION_BATCH_SIZE:
+                        break
+                    if row.eligible and await compact_session(row.app_name, row.user_id, row.session_id):
+                        compacted += 1
+                    state.update({
+                        "cursor_update_time": row.update_time,
+                        "cursor_app_name": row.app_name,
+                        "cursor_user_id": row.user_id,
+                        "cursor_session_id": row.session_id,
+                    })
+                else:
+                    if len(page) < settings.SESSION_COMPACTION_SCAN_SIZE:
+                        # pass 완료 → 다음 pass는 이번 기준시간 이후 변경분부터
+                        state.update({
+                            "last_run_at": state["pass_run_at"],
+                            "pass_run_at": None,
+                            "cursor_update_time": None,
+                            "cursor_app_name": None,
+                            "cursor_user_id": None,
+                            "cursor_session_id": None,
+                        })
+                async with async_engine.begin() as conn:
+                    await _save_scan_state(conn, state)
+                if state["pass_run_at"] is None or compacted >= settings.SESSION_COMPACTION_BATCH_SIZE:
+                    break
+            return compacted
+        finally:
+            await lock_conn.execute(
+                text("SELECT pg_advisory_unlock(:lock_id)"), {"lock_id": COMPACTOR_LOCK_ID}
+            )
+
+
+async def aget_session_snapshot(app_name: str, user_id: str, session_id: str) -> Optional[dict]:
+    """
+    최신 스냅샷 (state, summary, event_count, cursor), 없거나 soft delete된 세션이면 None
+    - cursor 이후 이벤트만 이어서 조회하면 전체 이벤트를 다시 읽을 필요가 없음
+    """
+    async with async_engine.connect() as conn:
+        snapshot = (await conn.execute(
+            select(session_snapshots).where(
+                session_snapshots.c.app_name == app_name,
+                session_snapshots.c.user_id == user_id,
+                session_snapshots.c.session_id == session_id,
+                ~is_session_deleted(app_name, user_id, session_id),
+            )
+        )).mappings().first()
+    if snapshot is None:
+        return None
+    return {
+        "state": snapshot["state"],
+        "summary": snapshot["summary"],
+        "event_count": snapshot["event_count"],
+        "created_at": snapshot["created_at"].isoformat(),
+        "cursor": encode_cursor(snapshot["last_event_timestamp"], snapshot["last_event_id"]),
+    }
+
+
+async def _compactor_loop():
+    while True:
+        try:
+            compacted = await run_compaction_cycle()
+            if compacted:
+                print(f"🗜️ 세션 스냅샷 갱신: {compacted}건")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # DB 연결 실패(OSError, 타임아웃 등)에도 루프는 계속 (다음 주기에 재시도)
+            print(f"❌ 세션 컴팩션 실패: {e!r}")
+        await asyncio.sleep(settings.SESSION_COMPACTION_INTERVAL)
+
+
+async def start_session_compactor():
+    global _compactor_task
+    if not settings.SESSION_COMPACTION_ENABLED:
+        return
+    await ensure_snapshot_table()
+    _compactor_task = asyncio.create_task(_compactor_loop())
+
+
+async def stop_session_compactor():
+    global _compactor_task
+    if _compactor_task is not None:
+        _compactor_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await _compactor_task
+        _compactor_task = None
@@ -0,0 +1,206 @@
+import asyncio
+import time
+import uuid
+from contextlib import suppress
+from typing import Iterable, Optional
+
+from redis.exceptions import RedisError
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.config import settings
+from app.core.db.async_postgres import async_engine, async_session_factory
+from app.core.db.redis import redis_client
+from app.model.tables import mcp_tools, metadata
+
+"""
+MCP 툴 ID → 툴 이름 변환 (배포 시 AgentConfig.tools 에 사용)
+- 1차: 프로세스 내 TTL 캐시
+- 2차: Redis (mcp_tool:{id}, 여러 프로세스 공유)
+- 둘 다 없는 ID만 모아 DB(mcp_tools) 한 번 조회 (mcp_id = ANY(...)), 테이블은 시작 시 생성
+- 툴 관리 서비스는 upsert_tools()(POST /agent/tools)로 mcp_tools 를 채우고, 저장 후 자동으로 캐시 무효화
+- 툴이 변경되면 invalidate_tools() → Redis 키 삭제 + pub/sub로 모든 프로세스의 1차 캐시 제거
+"""
+
+TOOL_KEY_PREFIX = "mcp_tool"
+INVALIDATE_CHANNEL = "mcp_tool:invalidate"
+INVALIDATE_ALL = "*"
+
+_local_cache: dict[str, tuple[str, float]] = {}  # mcp_id -> (tool_name, 만료 시각)
+_listener_task: Optional[asyncio.Task] = None
+
+
+class ToolResolutionError(ValueError):
+    pass
+
+
+def _tool_key(mcp_id: str) -> str:
+    return f"{TOOL_KEY_PREFIX}:{mcp_id}"
+
+
+def _get_local(mcp_id: str) -> Optional[str]:
+    cached = _local_cache.get(mcp_id)
+    if cached is None:
+        return None
+    tool_name, expires_at = cached
+    if expires_at < time.monotonic():
+        _local_cache.pop(mcp_id, None)
+        return None
+    return tool_name
+
+
+def _set_local(mcp_id: str, tool_name: str):
+    if len(_local_cache) >= settings.TOOL_CACHE_MAX_ENTRIES:
+        _local_cache.clear()  # 상한 초과 시 통째로 비움 (툴 수가 적어 재적재 비용이 낮음)
+    _local_cache[mcp_id] = (tool_name, time.monotonic() + settings.TOOL_CACHE_TTL)
+
+
+async def ensure_tool_table():
+    async with async_engine.begin() as conn:
+        await conn.run_sync(metadata.create_all, tables=[mcp_tools])
+
+
+async def _fetch_from_db(mcp_ids: list[str]) -> dict[str, str]:
+    stmt = select(mcp_tools.c.mcp_id, mcp_tools.c.tool_name).where(
+        mcp_tools.c.mcp_id.in_([uuid.UUID(mcp_id) for mcp_id in mcp_ids]),
+        mcp_tools.c.use_yn == "Y",
+    )
+    try:
+        async with async_session_factory() as session:
+            rows = (await session.execute(stmt)).all()
+    except (SQLAlchemyError, OSError) as e:
+        # 배포 실패 응답(status 99)으로 처리되도록 변환
+        raise ToolResolutionError(f"MCP 툴 조회에 실패했습니다: {e}") from e
+    return {str(mcp_id): tool_name for mcp_id, tool_name in rows}
+
+
+async def upsert_tools(tools: Iterable[tuple[uuid.UUID | str, str, str]]):
+    """
+    (mcp_id, tool_name, use_yn) 목록을 mcp_tools 에 저장 후 해당 ID 캐시 무효화
+    """
+    # 같은 ID가 여러 번 오면 마지막 값 (ON CONFLICT 는 한 문장에서 같은 행을 두 번 갱신할 수 없음)
+    rows = list({
+        str(mcp_id): {"mcp_id": uuid.UUID(str(mcp_id)), "tool_name": tool_name, "use_yn": use_yn, "last_updated_at": func.now()}
+        for mcp_id, tool_name, use_yn in tools
+    }.values())
+    if not rows:
+        return
+    stmt = insert(mcp_tools).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["mcp_id"],
+        set_={k: stmt.excluded[k] for k in ("tool_name", "use_yn", "last_updated_at")},
+    )
+    async with async_engine.begin() as conn:
+        await conn.execute(stmt)
+    await invalidate_tools([row["mcp_id"] for row in rows])
+
+
+async def resolve_tool_names(mcp_ids: Iterable[uuid.UUID | str]) -> list[str]:
+    """
+    MCP 툴 ID 목록을 입력 순서대로 툴 이름 목록으로 변환
+    - 존재하지 않거나 사용 중지된 ID가 있으면 ToolResolutionError
+    """
+    ids = [str(mcp_id) for mcp_id in mcp_ids]
+    resolved: dict[str, str] = {}
+
+    # 1차: 프로세스 내 캐시
+    missing = []
+    for mcp_id in dict.fromkeys(ids):
+        tool_name = _get_local(mcp_id)
+        if tool_name is None:
+            missing.append(mcp_id)
+        else:
+            resolved[mcp_id] = tool_name
+
+    # 2차: Redis
+    if missing:
+        try:
+            values = await redis_client.mget([_tool_key(mcp_id) for mcp_id in missing])
+        except RedisError as e:
+            print(f"❌ 툴 캐시 조회 실패: {e}")
+            values = [None] * len(missing)
+        still_missing = []
+        for mcp_id, tool_name in zip(missing, values):
+            if tool_name is None:
+                still_missing.append(mcp_id)
+            else:
+                resolved[mcp_id] = tool_name
+                _set_local(mcp_id, tool_name)
+        missing = still_missing
+
+    # 3차: DB 한 번에 조회
+    if missing:
+        fetched = await _fetch_from_db(missing)
+        if fetched:
+            try:
+                async with redis_client.pipeline(transaction=False) as pipe:
+                    for mcp_id, tool_name in fetched.items():
+                        pipe.set(_tool_key(mcp_id), tool_name, ex=settings.TOOL_REDIS_TTL)
+                    await pipe.execute()
+            except RedisError as e:
+                print(f"❌ 툴 캐시 저장 실패: {e}")
+        for mcp_id, tool_name in fetched.items():
+            resolved[mcp_id] = tool_name
+            _set_local(mcp_id, tool_name)
+
+        unknown = [mcp_id for mcp_id in missing if mcp_id not in fetched]
+        if unknown:
+            raise ToolResolutionError(f"등록되지 않은 MCP 툴입니다: {', '.join(unknown)}")
+
+    return [resolved[mcp_id] for mcp_id in ids]
+
+
+async def invalidate_tools(mcp_ids: Optional[Iterable[uuid.UUID | str]] = None):
+    """
+    툴 변경 시 호출, mcp_ids가 없으면 전체 무효화
+    """
+    ids = [str(mcp_id) for mcp_id in mcp_ids] if mcp_ids else []
+    if ids:
+        await redis_client.delete(*[_tool_key(mcp_id) for mcp_id in ids])
+    else:
+        keys = [key async for key in redis_client.scan_iter(match=f"{TOOL_KEY_PREFIX}:*")]
+        if keys:
+            await redis_client.delete(*keys)
+    await redis_client.publish(INVALIDATE_CHANNEL, ",".join(ids) or INVALIDATE_ALL)
+
+
+def _drop_local(message: str):
+    if message == INVALIDATE_ALL:
+        _local_cache.clear()
+        return
+    for mcp_id in message.split(","):
+        _local_cache.pop(mcp_id, None)
+
+
+async def _listen_invalidations():
+    while True:
+        pubsub = redis_client.pubsub()
+        try:
+            await pubsub.subscribe(INVALIDATE_CHANNEL)
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    _drop_local(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except RedisError as e:
+            print(f"❌ 툴 캐시 무효화 구독 오류: {e}")
+            _local_cache.clear()  # 놓친 무효화가 있을 수 있으므로 비움
+            await asyncio.sleep(1)
+        finally:
+            with suppress(Exception):
+                await pubsub.aclose()
+
+
+async def start_tool_invalidation_listener():
+    global _listener_task
+    _listener_task = asyncio.create_task(_listen_invalidations())
+
+
+async def stop_tool_invalidation_listener():
+    global _listener_task
+    if _listener_task is not None:
+        _listener_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await _listener_task
+        _listener_task = None
@@ -1,14 +1,81 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, APIRouter
 from prometheus_fastapi_instrumentator import Instrumentator
 from prometheus_fastapi_instrumentator.metrics import (
     latency, requests
 )
+from app.core.chat_client import adk_client, deployer_client
+from app.core.deploy_queue import start_deploy_workers, stop_deploy_workers
+from app.core.db.async_postgres import dispose_async_engine, ensure_history_index
+from app.core.db.pgvector import dispose_vectorstores
+from app.core.scheduler import start_scheduler, stop_scheduler
+from app.core.session_lifecycle import (
+    ensure_lifecycle_tables,
+    start_session_reaper,
+    stop_session_reaper,
+)
+from app.core.session_pool import start_session_pool, stop_session_pool
+from app.core.session_snapshot import start_session_compactor, stop_session_compactor
+from app.core.tool_resolver import (
+    ensure_tool_table,
+    start_tool_invalidation_listener,
+    stop_tool_invalidation_listener,
+)
 from app.router.agent import agent_router
 from app.router.sessions import session_router
+from app.router.retrieval import retrieval_router
 from app.router.prometheus import prometheus_router
 from app.config import settings
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # upstream 별 공유 HTTP 커넥션 풀 생성
+    await deployer_client.start()
+    await adk_client.start()
+    # 세션 이력 keyset 조회용 인덱스
+    try:
+        await ensure_history_index()
+    except Exception as e:
+        print(f"❌ 세션 이력 인덱스 생성 실패: {e}")
+    # 세션 soft delete/스냅샷 테이블 + 삭제 리퍼
+    try:
+        await ensure_lifecycle_tables()
+        await start_session_reaper()
+    except Exception as e:
+        print(f"❌ 세션 리퍼 시작 실패: {e}")
+    # 세션 스냅샷 컴팩터
+    try:
+        await start_session_compactor()
+    except Exception as e:
+        print(f"❌ 세션 컴팩터 시작 실패: {e}")
+    # ADK 세션 사전 생성 풀
+    await start_session_pool()
+    # MCP 툴 테이블 + 캐시 무효화 구독
+    try:
+        await ensure_tool_table()
+    except Exception as e:
+        print(f"❌ MCP 툴 테이블 생성 실패: {e}")
+    await start_tool_invalidation_listener()
+    # 비동기 배포 작업 워커
+    await start_deploy_workers()
+    # 예약 배포 스케줄러
+    await start_scheduler()
+    yield
+    await stop_scheduler()
+    await stop_deploy_workers()
+    await stop_tool_invalidation_listener()
+    await stop_session_pool()
+    await stop_session_compactor()
+    await stop_session_reaper()
+    await adk_client.close()
+    await deployer_client.close()
+    await dispose_async_engine()
+    dispose_vectorstores()
+
  
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 api_router = APIRouter(prefix=settings.API_V1_STR)
 
 Instrumentator(
@@ -17,6 +84,7 @@ Instrumentator(
 
 api_router.include_router(agent_router, prefix="/agent", tags=["Agent"])
 api_router.include_router(session_router, prefix="/agent/session", tags=["Session"])
+api_router.include_router(retrieval_router, prefix="/retrieval", tags=["Retrieval"])
 api_router.include_router(prometheus_router, prefix="/prometheus", tags=["Prometheus"])
 
 app.include_router(api_router)
@@ -1,4 +1,5 @@
 import uuid
+from datetime import datetime
 from pydantic import BaseModel
 from typing import Optional
 
@@ -51,6 +52,65 @@ class DeleteSessionRequest(BaseModel):
     agent_id: uuid.UUID
     agent_name: str
     session_id: uuid.UUID
+    soft_delete: bool = False  # True면 즉시 목록에서 제외하고 SESSION_PURGE_DELAY_DAYS 후 실제 삭제
+
+
+class BulkDeleteSessionRequest(BaseModel):
+    user_id: str
+    user_uuid: uuid.UUID
+    agent_id: uuid.UUID
+    agent_name: str
+    idle_days: Optional[int] = None         # 지정 시 N일 이상 업데이트 없는 세션만, 없으면 전체 세션
+    purge_delay_days: Optional[int] = None  # 실제 삭제 유예(일), 없으면 SESSION_PURGE_DELAY_DAYS, 0이면 다음 리퍼 주기
+
+
+class BulkDeleteSessionResponse(BaseModel):
+    response: AgentResponseData
+    result: AgentResponseResult
+    deleted_count: int = 0
+
+
+# session list / history
+class SessionListRequest(BaseModel):
+    user_id: str
+    user_uuid: uuid.UUID
+    agent_id: uuid.UUID
+    agent_name: str
+
+
+class SessionSummary(BaseModel):
+    session_id: str
+    create_time: datetime
+    update_time: datetime
+
+
+class SessionListResponse(BaseModel):
+    response: AgentResponseData
+    result: AgentResponseResult
+    sessions: list[SessionSummary] = []
+
+
+class SessionHistoryRequest(BaseModel):
+    user_id: str
+    user_uuid: uuid.UUID
+    agent_id: uuid.UUID
+    agent_name: str
+    session_id: uuid.UUID
+
+
+class SessionHistoryStreamRequest(SessionHistoryRequest):
+    cursor: Optional[str] = None      # 이전 응답의 next_cursor, 그 다음 이벤트부터 조회
+    page_size: int = 100              # 한 페이지(라인)에 담을 이벤트 수
+    limit: Optional[int] = None       # 최대 조회 이벤트 수
+    latest: Optional[int] = None      # 최신 N개 모드 (cursor/limit 무시)
+    from_snapshot: bool = False       # 최신 스냅샷(상태+요약)을 먼저 보내고 그 이후 이벤트만 조회 (cursor 와 함께 쓸 수 없음)
+    format: str = "ndjson"            # ndjson / sse
+
+
+class SessionHistoryResponse(BaseModel):
+    response: AgentResponseData
+    result: AgentResponseResult
+    events: list[dict] = []   # ADK Event (json)
 
 
 
@@ -63,7 +123,7 @@ class AgentConfig(BaseModel):
     template: str = "single_node_agent"
     max_tokens: int = 2000
     temperature: float = 0.7
-    tools: list[uuid.UUID] = []
+    tools: list[str] = []   # MCP 툴 이름 (mcp_id → app.core.tool_resolver 로 변환)
 
 
 class UserCredentials(BaseModel):
@@ -82,10 +142,10 @@ class DeploymentRequest(BaseModel):
 # UI to AP Deploy
 class UIDeploySchDetail(BaseModel):
     agent_sch_exec_cycle: str = "01"  # 01: 즉시배포
-    agent_sch_exect_week: list[str]
-    agent_sch_exec_month: list[str]
-    agent_sch_exec_time: str
-    agent_sch_init_message: str
+    agent_sch_exect_week: list[str]   # 실행 요일 "1"(월)~"7"(일) 또는 "MON"~"SUN", 비어 있으면 매일
+    agent_sch_exec_month: list[str]   # 실행 월 "1"~"12", 비어 있으면 매월
+    agent_sch_exec_time: str          # 실행 시각 "HH:MM" (KST)
+    agent_sch_init_message: str       # 예약 실행 시 새 세션에 보낼 초기 메시지
 
 
 class UIDeployRequest(BaseModel):
@@ -95,7 +155,7 @@ class UIDeployRequest(BaseModel):
     agent_name: str
     mcp_id: list[uuid.UUID]
     agent_instruction_message: str
-    agent_sch_type: str = "01"  # 01: 즉시배포
+    agent_sch_type: str = "01"  # 01: 즉시배포, 그 외: 예약 배포 (agent_sch_detail 기준)
     agent_sch_detail: UIDeploySchDetail
 
 
@@ -107,6 +167,8 @@ class AgentDeployResponseData(BaseModel):
     mcp_id: list[uuid.UUID]
     agent_sch_type: str
     session_id: Optional[uuid.UUID] = None
+    schedule_id: Optional[uuid.UUID] = None   # 예약 배포 시
+    next_run_at: Optional[str] = None         # 예약 배포 다음 실행 시각 (KST ISO)
 
 
 class AgentDeployResponse(BaseModel):
@@ -114,6 +176,35 @@ class AgentDeployResponse(BaseModel):
     result: AgentResponseResult
 
 
+# Deploy Job (비동기 배포)
+class AgentDeployJobResponseData(BaseModel):
+    user_id: str
+    user_uuid: uuid.UUID
+    agent_id: uuid.UUID
+    agent_name: str
+    job_id: uuid.UUID
+    job_status: str   # queued / running / succeeded / failed
+
+
+class AgentDeployJobResponse(BaseModel):
+    response: AgentDeployJobResponseData
+    result: AgentResponseResult
+
+
+class ToolInvalidateRequest(BaseModel):
+    mcp_id: list[uuid.UUID] = []   # 비어 있으면 전체 무효화
+
+
+class ToolItem(BaseModel):
+    mcp_id: uuid.UUID
+    tool_name: str
+    use_yn: str = "Y"
+
+
+class ToolUpsertRequest(BaseModel):
+    tools: list[ToolItem]
+
+
 class DeleteAgentRequest(BaseModel):
     user_id: str
     user_uuid: uuid.UUID
@@ -138,6 +229,7 @@ class AgentExecuteRequest(BaseModel):
     prompt_text: str   # 사용자가 입력한 텍스트
     attached_files_fl: str = "N"    # 첨부파일 여부
     attached_files_list: Optional[AgnetExecuteAttachedFiles]
+    rag_collection: Optional[str] = None   # RAG 검색 컬렉션 (RAG_AGENT_COLLECTIONS 에 연결된 것만, 없으면 기본 컬렉션)
 
 
 class AgentExecuteResponse(BaseModel):
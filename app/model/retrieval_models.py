@@ -0,0 +1,56 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.model.agent_models import ResponseReason
+
+
+# /retrieval 공통 옵션
+class RetrievalFilter(BaseModel):
+    source: Optional[str] = None     # 적재 시 source 메타데이터 (파일 경로)
+    page_from: Optional[int] = None  # 시작 페이지 (0부터, 포함)
+    page_to: Optional[int] = None    # 끝 페이지 (포함)
+
+
+class RetrievalOptions(BaseModel):
+    collection_name: str
+    k: int = 4
+    filter: Optional[RetrievalFilter] = None
+    min_score: Optional[float] = None       # 코사인 유사도 하한
+    mmr: bool = False                       # MMR 다양성 재정렬
+    fetch_k: Optional[int] = None           # MMR 후보 수 (없으면 RETRIEVAL_MMR_FETCH_K)
+    mmr_lambda: Optional[float] = None      # 없으면 RETRIEVAL_MMR_LAMBDA
+    include_metadata: bool = False          # 전체 메타데이터 포함 여부 (기본: source/page만)
+
+
+class RetrievalRequest(RetrievalOptions):
+    query: str
+
+
+class BatchRetrievalRequest(RetrievalOptions):
+    queries: list[str]
+
+
+class RetrievalHit(BaseModel):
+    id: str
+    text: str
+    score: float
+    source: Optional[str] = None
+    page: Optional[int] = None
+    metadata: Optional[dict] = None
+
+
+class RetrievalResult(BaseModel):
+    success_ind: bool = True
+    status: str = "04"
+    reason: Optional[ResponseReason] = None
+
+
+class RetrievalResponse(BaseModel):
+    result: RetrievalResult
+    hits: list[RetrievalHit] = []
+
+
+class BatchRetrievalResponse(BaseModel):
+    result: RetrievalResult
+    results: list[list[RetrievalHit]] = []
@@ -1,12 +1,16 @@
 from sqlalchemy import (
     TIMESTAMP,
+    BigInteger,
     Column,
+    Index,
     Integer,
     MetaData,
+    PrimaryKeyConstraint,
     String,
     Table,
+    func,
 )
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
 
 
 metadata = MetaData()  # 테이블 정의들을 담아놓을 컨테이너
@@ -53,3 +57,78 @@ app_sessions = Table(
     Column("create_time", TIMESTAMP, nullable=False, comment="생성시간"),
     Column("update_time", TIMESTAMP, nullable=False, comment="업데이트 시간"),
 )
+
+mcp_tools = Table(
+    "mcp_tools",
+    metadata,
+    Column("mcp_id", UUID(as_uuid=True), primary_key=True, comment="MCP 툴ID"),
+    Column("tool_name", String(100), nullable=False, comment="툴이름"),
+    Column("use_yn", String(1), nullable=False, server_default="Y", comment="사용여부"),
+    Column("last_updated_at", TIMESTAMP, nullable=True, comment="최종수정일시"),
+)
+
+session_snapshots = Table(
+    "session_snapshots",
+    metadata,
+    Column("app_name", String(128), nullable=False, comment="에이전트이름"),
+    Column("user_id", String(128), nullable=False, comment="사용자ID"),
+    Column("session_id", String(128), nullable=False, comment="세션ID"),
+    Column("state", JSONB, nullable=False, comment="스냅샷 시점 세션 상태"),
+    Column("summary", JSONB, nullable=False, comment="스냅샷 요약 (이벤트 수, 작성자별 수, 마지막 메시지 등)"),
+    Column("event_count", Integer, nullable=False, comment="스냅샷에 포함된 이벤트 수"),
+    Column("last_event_timestamp", TIMESTAMP, nullable=False, comment="마지막 포함 이벤트 시간"),
+    Column("last_event_id", String(128), nullable=False, comment="마지막 포함 이벤트ID"),
+    Column("created_at", TIMESTAMP, nullable=False, server_default=func.now(), comment="스냅샷 생성시간"),
+    PrimaryKeyConstraint("app_name", "user_id", "session_id"),
+)
+
+session_compaction_runs = Table(
+    "session_compaction_runs",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=False, comment="항상 1 (단일 행)"),
+    Column("last_run_at", TIMESTAMP, nullable=True, comment="마지막으로 끝까지 훑은 후보 조회(pass)의 기준시간"),
+    Column("pass_run_at", TIMESTAMP, nullable=True, comment="진행 중인 pass의 기준시간"),
+    Column("cursor_update_time", TIMESTAMP, nullable=True, comment="진행 중인 pass의 keyset 위치 (update_time)"),
+    Column("cursor_app_name", String(128), nullable=True, comment="keyset 위치 (app_name)"),
+    Column("cursor_user_id", String(128), nullable=True, comment="keyset 위치 (user_id)"),
+    Column("cursor_session_id", String(128), nullable=True, comment="keyset 위치 (session_id)"),
+)
+
+session_tombstones = Table(
+    "session_tombstones",
+    metadata,
+    Column("app_name", String(128), nullable=False, comment="에이전트이름"),
+    Column("user_id", String(128), nullable=False, comment="사용자ID"),
+    Column("session_id", String(128), nullable=False, comment="세션ID"),
+    Column("deleted_at", TIMESTAMP, nullable=False, server_default=func.now(), comment="삭제(soft delete) 시간"),
+    Column("purge_after", TIMESTAMP, nullable=False, index=True, comment="이 시간 이후 실제 삭제 대상"),
+    PrimaryKeyConstraint("app_name", "user_id", "session_id"),
+)
+
+ingestion_files = Table(
+    "ingestion_files",
+    metadata,
+    Column("collection_name", String(256), nullable=False, comment="PGVector 컬렉션이름"),
+    Column("source", String(1024), nullable=False, comment="원본 파일 경로"),
+    Column("file_hash", String(64), nullable=False, comment="파일 sha256"),
+    Column("chunk_count", Integer, nullable=False, comment="청크 수"),
+    Column("ingested_at", TIMESTAMP, nullable=False, server_default=func.now(), comment="최종 적재시간"),
+    PrimaryKeyConstraint("collection_name", "source"),
+)
+
+ingestion_chunks = Table(
+    "ingestion_chunks",
+    metadata,
+    Column("collection_name", String(256), nullable=False, comment="PGVector 컬렉션이름"),
+    Column("chunk_id", String(36), nullable=False, comment="청크ID (langchain_pg_embedding.id, uuid5)"),
+    Column("source", String(1024), nullable=False, comment="원본 파일 경로"),
+    Column("chunk_hash", String(64), nullable=False, comment="청크 내용 sha256"),
+    Column("content_hash", String(64), nullable=True, comment="정규화된 본문 sha256 (페이지 무관, 중복 검사용)"),
+    Column("lsh_bands", ARRAY(BigInteger), nullable=True, comment="MinHash LSH 밴드 hash (유사 중복 후보 검색용)"),
+    Column("duplicate_of", String(36), nullable=True, comment="중복이면 대신 저장된 청크ID (langchain_pg_embedding.id)"),
+    PrimaryKeyConstraint("collection_name", "chunk_id"),
+    Index("ix_ingestion_chunks_source", "collection_name", "source"),
+    Index("ix_ingestion_chunks_content", "collection_name", "content_hash"),
+    Index("ix_ingestion_chunks_duplicate", "collection_name", "duplicate_of"),
+    Index("ix_ingestion_chunks_bands", "lsh_bands", postgresql_using="gin"),
+)
@@ -1,60 +1,100 @@
+import uuid
+
 from fastapi.responses import StreamingResponse
 import httpx
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from redis.exceptions import RedisError
 
 from google.genai.types import Content, Part
 
-from app.core.chat_client import RequestClient
+from app.core.chat_client import adk_client, deployer_client
+from app.core.rag import cancel_context_fetch, context_parts, start_context_fetch
+from app.core.response_cache import (
+    get_cached_response,
+    invalidate_agent_cache,
+    is_cache_enabled,
+    set_cached_response,
+)
+from app.core.semantic_cache import (
+    invalidate_semantic_cache,
+    is_semantic_cache_enabled,
+    lookup_semantic_cache,
+    store_semantic_cache,
+)
+from app.core.deploy_queue import JOB_QUEUED, enqueue_deploy, get_job, stream_job_events
+from app.core.deploy_service import run_deploy
+from app.core.scheduler import is_scheduled, register_schedule, remove_schedule
+from app.core.session_pool import drop_pool
+from app.core.tool_resolver import invalidate_tools, upsert_tools
 from app.model.agent_models import (
     AgentDeployResponse,
     AgentDeployResponseData,
+    AgentDeployJobResponse,
+    AgentDeployJobResponseData,
     AgentExecuteRequest,
-    AgentResponseResult,
     DeleteAgentRequest,
-    DeploymentRequest,
-    ResponseMessage,
-    ResponseReason,
     ChatADKRequest,
+    ToolInvalidateRequest,
+    ToolUpsertRequest,
     UIDeployRequest,
 )
 from app.config import settings
-from app.utils.formatter import build_metadata, build_session_response, sanitize_agent_name
+from app.utils.formatter import build_metadata, build_result, build_session_response, sanitize_agent_name
 from app.utils.pattern import detect_mime_type
-from app.utils.sse import sse_event
+from app.utils.sse import relay_stream, sse_event
 
 
 agent_router = APIRouter()
-service_client = RequestClient(base_url=settings.BASE_URL)
 
 
 @agent_router.post("/deploy")
-async def post_to_deploy(request: UIDeployRequest):
+async def post_to_deploy(request: UIDeployRequest, job: bool = False):
     """
     에이전트 배포 요청 API
+    - job=true 이면 배포 작업을 큐에 등록하고 job_id를 바로 반환
+      (진행 상황은 /deploy/jobs/{job_id} 조회 또는 /deploy/jobs/{job_id}/events SSE 구독)
+    - agent_sch_type이 즉시배포(01)가 아니면 스케줄만 등록하고, 실행 시각에 배포 + 초기 메시지 전송
     """
     agent_name = sanitize_agent_name(request.agent_name)
-    OVERWRITE_DEPLOY_URL = f"{settings.BASE_URL}:3001/api/v1/agents/deploy/overwrite"
-    CREATE_SESSION_URL = f"{settings.BASE_URL}:30080/users/{request.user_id}/apps/{agent_name}/users/{request.user_id}/sessions"
-    request_payload = DeploymentRequest(
-        user_id=str(request.user_id),
-        agent_config={
-            "name": agent_name, 
-            "description": request.agent_instruction_message,
-            "instruction": request.agent_instruction_message,
-            "model": "gemini-2.0-flash",
-            "template": "single_node_agent",
-            "max_tokens": 2000,
-            "temperature": 0.7,
-            "tools": request.mcp_id,  # mcp_id별로 툴 조회 후 그 이름으로 전달 하도록 수정 필요
-        },
-        user_credentials={
-            "openai_api_key": None,  # OpenAI API 키가 필요한 경우 여기에 추가
-            "google_api_key": settings.GOOGLE_API_KEY,  # Google API 키가 필요한 경우 여기에 추가
-            "weather_api_key": None,  # 날씨 API 키가 필요한 경우 여기에 추가
-        },
-        overwrite=False,
-    )
+    if is_scheduled(request):
+        return await _schedule_deploy(request, agent_name)
+
+    if not job:
+        return await run_deploy(request)
+
+    try:
+        job_id = await enqueue_deploy(request)
+    except RedisError as e:
+        return build_session_response(
+            user_id=request.user_id,
+            user_uuid=request.user_uuid,
+            agent_id=request.agent_id,
+            agent_name=agent_name,
+            success_ind=False,
+            status="99",
+            reason=str(e),
+            location="deploy - enqueue_deploy",
+        )
+
+    return AgentDeployJobResponse(
+        response=AgentDeployJobResponseData(
+            user_id=request.user_id,
+            user_uuid=request.user_uuid,
+            agent_id=request.agent_id,
+            agent_name=agent_name,
+            job_id=job_id,
+            job_status=JOB_QUEUED,
+        ),
+        result=build_result(
+            agent_id=request.agent_id,
+            success_ind=True,
+            status="05",
+            message_text="에이전트 배포가 요청되었습니다.",
+        ),
+    ).model_dump(exclude_none=True)
 
+
+async def _schedule_deploy(request: UIDeployRequest, agent_name: str):
     response_data = AgentDeployResponseData(
         user_id=request.user_id,
         user_uuid=request.user_uuid,
@@ -64,54 +104,77 @@ async def post_to_deploy(request: UIDeployRequest):
         agent_sch_type=request.agent_sch_type,
     )
     try:
-        response = await service_client.post_client(
-            OVERWRITE_DEPLOY_URL, payload=request_payload
-        )
-        session_payload = {
-            "app_name": agent_name,
-            "user_id": str(request.user_id)
-        }
-        
-        sessions = await service_client.post_client(url=CREATE_SESSION_URL, payload=session_payload)
-        # print(sessions)
-        if sessions:
-            session_id = sessions["id"]
-            response_data.session_id = session_id
-
-        message = ResponseMessage(
-            code=f"AGENT-{agent_name}",
-            text=f"에이전트 배포가 완료되었습니다.",
-        )
-        result_data = AgentResponseResult(
-            success_ind=True,
-            status="04",
-            message=message,
+        schedule_id, run_at = await register_schedule(request)
+    except (ValueError, RedisError) as e:
+        result_data = build_result(
+            agent_id=request.agent_id,
+            success_ind=False,
+            status="99",
+            message_text="에이전트 배포 예약에 실패하였습니다.",
+            reason=str(e),
+            location="deploy - register_schedule",
         )
-        return_format = AgentDeployResponse(
-            response=response_data, result=result_data
-        ).model_dump(exclude_none=True)
+        return AgentDeployResponse(response=response_data, result=result_data).model_dump(exclude_none=True)
 
-        return return_format
+    response_data.schedule_id = schedule_id
+    response_data.next_run_at = run_at.isoformat()
+    result_data = build_result(
+        agent_id=request.agent_id,
+        success_ind=True,
+        status="05",
+        message_text="에이전트 배포가 예약되었습니다.",
+    )
+    return AgentDeployResponse(response=response_data, result=result_data).model_dump(exclude_none=True)
 
-    except httpx.HTTPStatusError as e:
-        status_code = e.response.status_code
-        reason = ResponseReason(
-            text=str(e), location=f"{OVERWRITE_DEPLOY_URL} - {status_code}"
-        )
 
-        message = ResponseMessage(
-            code=f"AGENT-{agent_name}",
-            text=f"에이전트 배포에 실패하였습니다.",
-        )
-        result_data = AgentResponseResult(
-            success_ind=False,
-            status="99",
-            message=message,
-            reason=reason,
-        )
-        return_format = AgentDeployResponse(response=response_data, result=result_data).model_dump(exclude_none=True)
+@agent_router.get("/deploy/jobs/{job_id}")
+async def get_deploy_job(job_id: uuid.UUID):
+    """
+    배포 작업 상태 조회 API
+    """
+    job = await get_job(str(job_id))
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"배포 작업({job_id})이 없거나 만료되었습니다.")
+    return {"job_id": str(job_id), **job}
 
-        return return_format
+
+@agent_router.get("/deploy/jobs/{job_id}/events")
+async def stream_deploy_job(job_id: uuid.UUID):
+    """
+    배포 작업 진행 상황 SSE 구독 API
+    - 지금까지의 이벤트를 순서대로 보낸 뒤, 작업이 끝날 때까지 새 이벤트를 전달
+    """
+    if await get_job(str(job_id)) is None:
+        raise HTTPException(status_code=404, detail=f"배포 작업({job_id})이 없거나 만료되었습니다.")
+
+    async def event_generator():
+        async for event in stream_job_events(str(job_id)):
+            yield sse_event(event["status"], event)
+        yield "event: end\ndata: [DONE]\n\n"
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@agent_router.post("/tools")
+async def upsert_tool_names(request: ToolUpsertRequest):
+    """
+    MCP 툴 ID → 이름 등록/수정 API (툴 관리 서비스에서 호출, 저장 후 해당 툴 캐시 무효화)
+    """
+    await upsert_tools((tool.mcp_id, tool.tool_name, tool.use_yn) for tool in request.tools)
+    return {"upserted": [str(tool.mcp_id) for tool in request.tools]}
+
+
+@agent_router.post("/tools/invalidate")
+async def invalidate_tool_cache(request: ToolInvalidateRequest):
+    """
+    MCP 툴 변경 시 툴 이름 캐시 무효화 API (툴 관리 서비스에서 호출)
+    """
+    await invalidate_tools(request.mcp_id)
+    return {"invalidated": [str(mcp_id) for mcp_id in request.mcp_id] or "all"}
 
 
 @agent_router.post("/stop")
@@ -121,7 +184,11 @@ async def delete_agent(request: DeleteAgentRequest):
     """
     DELETE_AGENT_URL = f"{settings.BASE_URL}:3001/api/v1/agents/deployed/{request.user_id}/{request.agent_name}"
     try:
-        await service_client.delete_client(DELETE_AGENT_URL)
+        await remove_schedule(request.user_id, request.agent_name)
+        await deployer_client.delete_client(DELETE_AGENT_URL)
+        await drop_pool(request.user_id, request.agent_name)
+        await invalidate_agent_cache(request.user_id, request.agent_name)
+        await invalidate_semantic_cache(request.user_id, request.agent_name)
         return build_session_response(
             user_id=request.user_id,
             user_uuid=request.user_uuid,
@@ -148,19 +215,54 @@ async def delete_agent(request: DeleteAgentRequest):
 async def chat_agent(request: AgentExecuteRequest):
     """
     에이전트와 채팅하는 API
+    - RAG 연결 에이전트는 컨텍스트 검색을 먼저 시작하고 응답 캐시 조회와 동시에 진행 (최대 RAG_TIMEOUT 대기)
     """
-    user_content = Content(parts=[Part(text=request.prompt_text)], role="user")
+    context_task = start_context_fetch(request.agent_name, request.prompt_text, request.rag_collection)
     adk_run_url = f"{settings.BASE_URL}:30080/users/{request.user_id}/run"
 
+    # opt-in 응답 캐시: 동일 에이전트/설정 버전/프롬프트면 ADK 호출 없이 반환
+    cache_enabled = is_cache_enabled(request.agent_name)
+    semantic_enabled = is_semantic_cache_enabled(request.agent_name)
+    prompt_embedding = None
+    cached = None
+    if cache_enabled:
+        cached = await get_cached_response(request.user_id, request.agent_name, request.prompt_text)
+    if cached is None and semantic_enabled:
+        # exact miss 시 의미가 유사한 이전 프롬프트 조회
+        cached, prompt_embedding = await lookup_semantic_cache(
+            request.user_id, request.agent_name, request.prompt_text
+        )
+        if cached and cache_enabled:
+            await set_cached_response(
+                request.user_id, request.agent_name, request.prompt_text,
+                cached["message"], cached["mime_type"],
+            )
+    if cached:
+        cancel_context_fetch(context_task)
+        return build_metadata(
+            user_id=request.user_id,
+            user_uuid=request.user_uuid,
+            agent_id=request.agent_id,
+            agent_name=request.agent_name,
+            session_id=request.session_id,
+            status="04",
+            success_ind=True,
+            message=cached["message"],
+            mime_type=cached["mime_type"],
+        )
+
+    user_content = Content(
+        parts=[*await context_parts(context_task), Part(text=request.prompt_text)], role="user"
+    )
     chat_adk_request = ChatADKRequest(
         appName=str(request.agent_name),
         userId=str(request.user_id),
         sessionId=str(request.session_id),
         newMessage=user_content.model_dump(),
     )
-    
+
     try:
-        response = await service_client.post_client(
+        response = await adk_client.post_client(
             url=adk_run_url,
             payload=chat_adk_request
         )
@@ -168,6 +270,16 @@ async def chat_agent(request: AgentExecuteRequest):
         mime_type = detect_mime_type(message_content)
         print(f"message: {message_content}")
         print(f"mime-type: {mime_type}")
+
+        if cache_enabled:
+            await set_cached_response(
+                request.user_id, request.agent_name, request.prompt_text, message_content, mime_type
+            )
+        if semantic_enabled and prompt_embedding is not None:
+            await store_semantic_cache(
+                request.user_id, request.agent_name, request.prompt_text,
+                prompt_embedding, message_content, mime_type,
+            )
         
         return build_metadata(
             user_id=request.user_id,
@@ -192,67 +304,102 @@ async def chat_agent(request: AgentExecuteRequest):
             location=f"{adk_run_url}-failed",
         )
 
-    # ===== Streaming 일 경우 =====
-    # async def event_generator():
-    #     # 1. 시작 메타데이터
-    #     yield sse_event(
-    #         "metadata",
-    #         build_metadata(
-    #             user_id=str(request.user_id),
-    #             user_uuid=str(request.user_uuid),
-    #             agent_id=str(request.agent_id),
-    #             session_id=str(request.session_id),
-    #             status_code="05",
-    #             success_ind=True,
-    #             message="실행 요청되었습니다.",
-    #         ),
-    #     )
-
-    #     try:
-    #         # 2. 채팅 스트리밍
-    #         async for chunk in service_client.stream_chat(
-    #             user_id=str(request.user_id),
-    #             chat_request=chat_adk_request.model_dump()
-    #         ):
-    #             yield f"data: {chunk}\n\n"
-
-    #         # 3. 정상 완료 메타데이터
-    #         yield sse_event(
-    #             "result",
-    #             build_metadata(
-    #                 user_id=str(request.user_id),
-    #                 user_uuid=str(request.user_uuid),
-    #                 agent_id=str(request.agent_id),
-    #                 session_id=str(request.session_id),
-    #                 status_code="07",
-    #                 success_ind=True,
-    #                 message="실행 완료되었습니다.",
-    #             ),
-    #         )
-
-    #     except Exception as e:
-    #         # 4. 예외 발생 시 error 이벤트
-    #         yield sse_event(
-    #             "error",
-    #             build_metadata(
-    #                 user_id=str(request.user_id),
-    #                 user_uuid=str(request.user_uuid),
-    #                 agent_id=str(request.agent_id),
-    #                 session_id=str(request.session_id),
-    #                 status_code="99",
-    #                 success_ind=False,
-    #                 message="실행 중 오류 발생",
-    #                 reason=str(e),
-    #                 location="execute - stream_chat",
-    #             ),
-    #         )
-    #         return  # <- 실패 시 바로 종료
-
-    #     # 5. 종료 시그널
-    #     yield "event: end\ndata: [DONE]\n\n"
-
-    # return StreamingResponse(event_generator(), media_type="text/event-stream")
 
+@agent_router.post("/execute/stream")
+async def chat_agent_stream(request: AgentExecuteRequest, http_request: Request):
+    """
+    에이전트와 채팅하는 API (SSE 스트리밍)
+    - ADK /run_sse 응답을 토큰 단위로 중계
+    - 클라이언트 연결이 끊기면 upstream ADK 스트림도 즉시 종료
+    - RAG 연결 에이전트는 검색 컨텍스트(최대 RAG_TIMEOUT 대기)를 프롬프트 앞에 추가
+    """
+    context_task = start_context_fetch(request.agent_name, request.prompt_text, request.rag_collection)
+    user_content = Content(
+        parts=[*await context_parts(context_task), Part(text=request.prompt_text)], role="user"
+    )
+
+    chat_adk_request = ChatADKRequest(
+        appName=str(request.agent_name),
+        userId=str(request.user_id),
+        sessionId=str(request.session_id),
+        newMessage=user_content.model_dump(),
+        streaming=True,
+    )
+
+    async def event_generator():
+        # 1. 시작 메타데이터
+        yield sse_event(
+            "metadata",
+            build_metadata(
+                user_id=request.user_id,
+                user_uuid=request.user_uuid,
+                agent_id=request.agent_id,
+                agent_name=request.agent_name,
+                session_id=request.session_id,
+                status="05",
+                success_ind=True,
+                message="실행 요청되었습니다.",
+            ),
+        )
+
+        chunks: list[str] = []
+        try:
+            # 2. 채팅 스트리밍 (bounded queue 로 backpressure, 연결 종료 시 upstream 취소)
+            async for chunk in relay_stream(
+                http_request,
+                adk_client.stream_chat(
+                    user_id=str(request.user_id),
+                    chat_request=chat_adk_request.model_dump(),
+                ),
+                queue_size=settings.STREAM_QUEUE_SIZE,
+                poll_interval=settings.STREAM_DISCONNECT_POLL_INTERVAL,
+            ):
+                chunks.append(chunk)
+                yield sse_event("message", chunk)
+
+        except Exception as e:
+            # 3. 예외 발생 시 error 이벤트
+            yield sse_event(
+                "error",
+                build_metadata(
+                    user_id=request.user_id,
+                    user_uuid=request.user_uuid,
+                    agent_id=request.agent_id,
+                    agent_name=request.agent_name,
+                    session_id=request.session_id,
+                    status="99",
+                    success_ind=False,
+                    reason=str(e),
+                    location="execute/stream - stream_chat",
+                ),
+            )
+            return  # <- 실패 시 바로 종료
+
+        # 4. 정상 완료 메타데이터 (전체 메시지 포함)
+        message_content = "".join(chunks)
+        yield sse_event(
+            "result",
+            build_metadata(
+                user_id=request.user_id,
+                user_uuid=request.user_uuid,
+                agent_id=request.agent_id,
+                agent_name=request.agent_name,
+                session_id=request.session_id,
+                status="07",
+                success_ind=True,
+                message=message_content,
+                mime_type=detect_mime_type(message_content),
+            ),
+        )
+
+        # 5. 종료 시그널
+        yield "event: end\ndata: [DONE]\n\n"
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 # @agent_router.post("/user/{user_id}/agents")
@@ -0,0 +1,107 @@
+from fastapi import APIRouter
+
+from app.config import settings
+from app.core.rag import agent_collections
+from app.core.retrieval import search_batch
+from app.model.agent_models import ResponseReason
+from app.model.retrieval_models import (
+    BatchRetrievalRequest,
+    BatchRetrievalResponse,
+    RetrievalHit,
+    RetrievalOptions,
+    RetrievalRequest,
+    RetrievalResponse,
+    RetrievalResult,
+)
+
+
+retrieval_router = APIRouter()
+
+
+def _allowed_collections() -> set[str]:
+    """검색 가능한 컬렉션 (시맨틱 캐시 등 내부 컬렉션은 항상 제외)"""
+    allowed = set(settings.RETRIEVAL_ALLOWED_COLLECTIONS) or {
+        collection for agent_name in settings.RAG_AGENT_COLLECTIONS for collection in agent_collections(agent_name)
+    }
+    allowed.discard(settings.SEMANTIC_CACHE_COLLECTION)
+    return allowed
+
+
+def _validate(options: RetrievalOptions, query_count: int):
+    if options.collection_name not in _allowed_collections():
+        raise ValueError(f"검색할 수 없는 컬렉션입니다: {options.collection_name}")
+    if not 1 <= options.k <= settings.RETRIEVAL_MAX_K:
+        raise ValueError(f"k는 1 ~ {settings.RETRIEVAL_MAX_K} 사이여야 합니다.")
+    if not 1 <= query_count <= settings.RETRIEVAL_MAX_BATCH:
+        raise ValueError(f"쿼리 수는 1 ~ {settings.RETRIEVAL_MAX_BATCH} 사이여야 합니다.")
+
+
+async def _search(options: RetrievalOptions, queries: list[str]) -> list[list[RetrievalHit]]:
+    _validate(options, len(queries))
+    metadata_filter = {"source": options.filter.source} if options.filter and options.filter.source else None
+    page_range = (options.filter.page_from, options.filter.page_to) if options.filter else None
+    results = await search_batch(
+        options.collection_name,
+        queries,
+        k=options.k,
+        filter=metadata_filter,
+        page_range=page_range,
+        min_score=options.min_score,
+        mmr=options.mmr,
+        fetch_k=options.fetch_k,
+        mmr_lambda=options.mmr_lambda,
+    )
+    return [
+        [
+            RetrievalHit(
+                id=doc.id,
+                text=doc.page_content,
+                score=round(score, 4),
+                source=doc.metadata.get("source"),
+                page=doc.metadata.get("page"),
+                metadata=doc.metadata if options.include_metadata else None,
+            )
+            for doc, score in hits
+        ]
+        for hits in results
+    ]
+
+
+def _failure(e: Exception, location: str) -> RetrievalResult:
+    return RetrievalResult(
+        success_ind=False, status="99", reason=ResponseReason(text=str(e), location=location)
+    )
+
+
+@retrieval_router.post("/search")
+async def search(request: RetrievalRequest):
+    """
+    컬렉션 벡터 검색 API (에이전트 없이 UI/다른 서비스에서 사용)
+    - collection_name 은 RETRIEVAL_ALLOWED_COLLECTIONS (없으면 RAG_AGENT_COLLECTIONS) 의 컬렉션만 허용
+    - filter: source / 페이지 범위, min_score: 유사도 하한, mmr: 다양성 재정렬
+    - 응답은 id/text/score/source/page 만 (include_metadata=true 시 전체 메타데이터)
+    """
+    try:
+        hits = (await _search(request, [request.query]))[0]
+        return RetrievalResponse(result=RetrievalResult(), hits=hits).model_dump(mode="json", exclude_none=True)
+    except Exception as e:
+        return RetrievalResponse(result=_failure(e, "retrieval/search")).model_dump(
+            mode="json", exclude_none=True
+        )
+
+
+@retrieval_router.post("/search/batch")
+async def search_batch_queries(request: BatchRetrievalRequest):
+    """
+    여러 쿼리 일괄 검색 API (평가 작업 등 대량 쿼리용)
+    - 쿼리 임베딩은 배치 1회, DB 검색은 1회 조회 (쿼리별 결과는 요청 순서대로)
+    """
+    try:
+        results = await _search(request, request.queries)
+        return BatchRetrievalResponse(result=RetrievalResult(), results=results).model_dump(
+            mode="json", exclude_none=True
+        )
+    except Exception as e:
+        return BatchRetrievalResponse(result=_failure(e, "retrieval/search/batch")).model_dump(
+            mode="json", exclude_none=True
+        )
@@ -1,32 +1,53 @@
-from fastapi import APIRouter
+import json
+from typing import Optional
 
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 
-from app.core.chat_client import RequestClient
+
+from app.core.chat_client import adk_client
+from app.core.session_lifecycle import soft_delete_sessions
+from app.core.session_pool import acquire_session, drop_pool
+from app.core.db.async_postgres import (
+    aget_events_for_session,
+    aget_latest_events,
+    aget_sessions,
+    astream_events,
+)
+from app.core.session_snapshot import aget_session_snapshot
 from app.model.agent_models import (
+    BulkDeleteSessionRequest,
+    BulkDeleteSessionResponse,
     CreateSessionRequest,
     DeleteSessionRequest,
+    SessionHistoryRequest,
+    SessionHistoryResponse,
+    SessionHistoryStreamRequest,
+    SessionListRequest,
+    SessionListResponse,
+    SessionSummary,
 )
 from app.config import settings
-from app.utils.formatter import build_session_response
+from app.utils.formatter import build_response_data, build_result, build_session_response
+from app.utils.sse import sse_event
 
 
 session_router = APIRouter()
-service_client = RequestClient(base_url=settings.BASE_URL)
 
 
 @session_router.post("/new")
 async def create_session(request: CreateSessionRequest):
     CREATE_SESSION_URL = f"{settings.BASE_URL}:30080/users/{request.user_id}/apps/{request.agent_name}/users/{request.user_id}/sessions"
-    payload = {"app_name": request.agent_name, "user_id": request.user_id}
 
     try:
-        session = await service_client.post_client(CREATE_SESSION_URL, payload=payload)
+        # 세션 풀이 설정된 에이전트는 미리 만든 세션을 바로 반환
+        session_id = await acquire_session(request.user_id, request.agent_name)
         return build_session_response(
             user_id=request.user_id,
             user_uuid=request.user_uuid,
             agent_id=request.agent_id,
             agent_name=request.agent_name,
-            session_id=session["id"],
+            session_id=session_id,
             status="04",
             success_ind=True,
             message_text="세션이 생성되었습니다.",
@@ -48,12 +69,18 @@ async def create_session(request: CreateSessionRequest):
 async def delete_session(request: DeleteSessionRequest):
     """
     해당 사용자의 특정 에이전트 특정 세션 삭제 API
-    - 현재는 세션별 ADK 제공 URL을 사용하여 세션을 관리 하지만, DB 구축되면 Soft Delete 방식 추가 예정
+    - 기본은 ADK 제공 URL로 즉시 삭제
+    - soft_delete=true 이면 목록/이력에서 바로 제외하고, 실제 삭제는 유예 기간 후 리퍼가 처리
     - 세션 삭제 성공 여부 메시지 반환
     """
     DELETE_SESSION_URL = f"{settings.BASE_URL}:30080/users/{request.user_id}/apps/{request.agent_name}/users/{request.user_id}/sessions/{request.session_id}"
     try:
-        await service_client.delete_client(DELETE_SESSION_URL)
+        if request.soft_delete:
+            await soft_delete_sessions(
+                request.agent_name, request.user_id, session_ids=[str(request.session_id)]
+            )
+        else:
+            await adk_client.delete_client(DELETE_SESSION_URL)
         return build_session_response(
             user_id=request.user_id,
             user_uuid=request.user_uuid,
@@ -76,3 +103,183 @@ async def delete_session(request: DeleteSessionRequest):
             reason=str(e),
             location=f"{DELETE_SESSION_URL}-failed",
         )
+
+
+@session_router.post("/remove/bulk")
+async def bulk_delete_sessions(request: BulkDeleteSessionRequest):
+    """
+    해당 사용자의 특정 에이전트 세션 일괄 삭제 API (soft delete)
+    - idle_days 지정 시 N일 이상 업데이트 없는 세션만, 없으면 전체 세션
+    - 한 번의 INSERT ... SELECT로 tombstone 기록, 실제 삭제는 purge_delay_days 후 리퍼가 배치로 처리
+    """
+    response = build_response_data(
+        request.user_id, request.user_uuid, request.agent_id, request.agent_name
+    )
+    try:
+        if request.idle_days is None:
+            # 전체 삭제면 풀에 남은 미사용 세션도 정리
+            await drop_pool(request.user_id, request.agent_name)
+        deleted_count = await soft_delete_sessions(
+            request.agent_name,
+            request.user_id,
+            idle_days=request.idle_days,
+            purge_delay_days=request.purge_delay_days,
+        )
+        result = build_result(
+            agent_id=request.agent_id,
+            success_ind=True,
+            status="04",
+            message_text=f"세션 {deleted_count}건이 삭제되었습니다.",
+        )
+        return BulkDeleteSessionResponse(
+            response=response, result=result, deleted_count=deleted_count
+        ).model_dump(mode="json", exclude_none=True)
+    except Exception as e:
+        result = build_result(
+            agent_id=request.agent_id,
+            success_ind=False,
+            status="99",
+            reason=str(e),
+            location="session/remove/bulk - soft_delete_sessions",
+        )
+        return BulkDeleteSessionResponse(response=response, result=result).model_dump(
+            mode="json", exclude_none=True
+        )
+
+
+@session_router.post("/list")
+async def list_sessions(request: SessionListRequest):
+    """
+    해당 사용자의 특정 에이전트 세션 목록 조회 API (최근 업데이트 순)
+    - asyncpg 기반 조회라 이벤트 루프를 막지 않음
+    """
+    response = build_response_data(
+        request.user_id, request.user_uuid, request.agent_id, request.agent_name
+    )
+    try:
+        rows = await aget_sessions(request.agent_name, request.user_id)
+        sessions = [
+            SessionSummary(session_id=row.id, create_time=row.create_time, update_time=row.update_time)
+            for row in rows
+        ]
+        result = build_result(
+            agent_id=request.agent_id,
+            success_ind=True,
+            status="04",
+            message_text="세션 목록이 조회되었습니다.",
+        )
+        return SessionListResponse(response=response, result=result, sessions=sessions).model_dump(
+            mode="json", exclude_none=True
+        )
+    except Exception as e:
+        result = build_result(
+            agent_id=request.agent_id,
+            success_ind=False,
+            status="99",
+            reason=str(e),
+            location="session/list - aget_sessions",
+        )
+        return SessionListResponse(response=response, result=result).model_dump(
+            mode="json", exclude_none=True
+        )
+
+
+@session_router.post("/history")
+async def get_session_history(request: SessionHistoryRequest):
+    """
+    특정 세션의 이벤트(대화) 이력 조회 API
+    - asyncpg 기반 조회라 이벤트 루프를 막지 않음
+    """
+    response = build_response_data(
+        request.user_id, request.user_uuid, request.agent_id, request.agent_name, request.session_id
+    )
+    try:
+        events = await aget_events_for_session(
+            request.agent_name, request.user_id, str(request.session_id)
+        )
+        result = build_result(
+            agent_id=request.agent_id,
+            success_ind=True,
+            status="04",
+            message_text="세션 이력이 조회되었습니다.",
+        )
+        return SessionHistoryResponse(
+            response=response,
+            result=result,
+            events=[event.model_dump(mode="json", exclude_none=True, by_alias=True) for event in events],
+        ).model_dump(mode="json", exclude_none=True)
+    except Exception as e:
+        result = build_result(
+            agent_id=request.agent_id,
+            success_ind=False,
+            status="99",
+            reason=str(e),
+            location="session/history - aget_events_for_session",
+        )
+        return SessionHistoryResponse(response=response, result=result).model_dump(
+            mode="json", exclude_none=True
+        )
+
+
+@session_router.post("/history/stream")
+async def stream_session_history(request: SessionHistoryStreamRequest):
+    """
+    특정 세션의 이벤트 이력을 페이지 단위로 스트리밍하는 API (NDJSON 또는 SSE)
+    - (timestamp, id) keyset 커서로 이어서 조회: 응답의 next_cursor를 다음 요청의 cursor로 사용
+    - latest=N 이면 최신 N개만 시간 순으로 반환
+    - from_snapshot=true 이면 {"type": "snapshot", ...} 라인(상태+요약)을 먼저 보내고 스냅샷 이후 이벤트만 조회 (cursor 와 함께 쓰면 422)
+    - 라인 형식: {"type": "page", "events": [...], "next_cursor": ...} ... {"type": "end", "next_cursor": ...}
+    """
+    if request.from_snapshot and request.cursor:
+        raise HTTPException(status_code=422, detail="from_snapshot 과 cursor 는 함께 사용할 수 없습니다.")
+    page_size = max(1, request.page_size)
+
+    def format_line(line_type: str, data: dict) -> str:
+        data = {"type": line_type, **data}
+        if request.format == "sse":
+            return sse_event(line_type, data)
+        return json.dumps(data, ensure_ascii=False) + "\n"
+
+    async def iter_events(after: Optional[str]):
+        if request.latest:
+            for item in await aget_latest_events(
+                request.agent_name, request.user_id, str(request.session_id), request.latest
+            ):
+                yield item
+            return
+        async for item in astream_events(
+            request.agent_name,
+            request.user_id,
+            str(request.session_id),
+            after=after,
+            limit=request.limit,
+            yield_per=page_size,
+        ):
+            yield item
+
+    async def page_generator():
+        page: list[dict] = []
+        next_cursor = request.cursor
+        try:
+            if request.from_snapshot and not request.latest:
+                snapshot = await aget_session_snapshot(
+                    request.agent_name, request.user_id, str(request.session_id)
+                )
+                if snapshot is not None:
+                    next_cursor = snapshot.pop("cursor")
+                    yield format_line("snapshot", {**snapshot, "next_cursor": next_cursor})
+
+            async for event, cursor in iter_events(next_cursor):
+                page.append(event.model_dump(mode="json", exclude_none=True, by_alias=True))
+                next_cursor = cursor
+                if len(page) >= page_size:
+                    yield format_line("page", {"events": page, "next_cursor": next_cursor})
+                    page = []
+            if page:
+                yield format_line("page", {"events": page, "next_cursor": next_cursor})
+            yield format_line("end", {"next_cursor": next_cursor})
+        except Exception as e:
+            yield format_line("error", {"reason": str(e), "next_cursor": next_cursor})
+
+    media_type = "text/event-stream" if request.format == "sse" else "application/x-ndjson"
+    return StreamingResponse(page_generator(), media_type=media_type)
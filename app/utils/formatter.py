@@ -83,7 +83,7 @@ def build_session_response(
         location=location,
     )
     return CreateSessionResponse(response=response, result=result).model_dump(
-        exclude_none=True
+        mode="json", exclude_none=True
     )
 
 
@@ -114,5 +114,5 @@ def build_metadata(
         location=location,
     )
     return AgentExecuteResponse(response=response, result=result).model_dump(
-        exclude_none=True
+        mode="json", exclude_none=True
     )
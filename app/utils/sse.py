@@ -1,8 +1,154 @@
+import asyncio
 import json
-from typing import Any
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Optional
 from pydantic import BaseModel
+from starlette.requests import Request
 
 def sse_event(event: str, data: Any) -> str:
     if isinstance(data, BaseModel):  # Pydantic 모델이면
         data = data.model_dump(mode="json")
     return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@dataclass(slots=True)
+class SSEEvent:
+    event: str = "message"
+    data: str = ""
+    id: Optional[str] = None
+
+
+class SSEParser:
+    """
+    text/event-stream 증분 파서
+    - 네트워크에서 읽은 bytes를 그대로 feed()에 넣으면 완성된 이벤트 목록을 반환
+    - 한 번의 read에 여러 이벤트, 여러 read에 걸친 하나의 이벤트/줄, 멀티라인 data 모두 처리
+    - 완성된 줄만 디코딩하므로 UTF-8 멀티바이트 문자가 청크 경계에서 잘려도 안전
+    - 이미 검사한 바이트는 다시 검사하지 않음 (_scan_pos), 소비한 앞부분은 한 번에 잘라냄
+    """
+    def __init__(self):
+        self._buffer = bytearray()
+        self._scan_pos = 0        # 줄바꿈을 찾지 못한 채 검사가 끝난 위치
+        self._skip_lf = False     # 직전 청크가 '\r'로 끝났으면 다음 '\n'은 같은 줄바꿈
+        self._event = ""
+        self._data: list[str] = []
+        self._id: Optional[str] = None
+
+    def feed(self, chunk: bytes) -> list[SSEEvent]:
+        buf = self._buffer
+        buf.extend(chunk)
+        events: list[SSEEvent] = []
+        line_start = 0
+
+        if self._skip_lf and buf[:1] == b"\n":
+            line_start = 1
+        self._skip_lf = False
+
+        while True:
+            search_from = max(line_start, self._scan_pos)
+            lf = buf.find(b"\n", search_from)
+            cr = buf.find(b"\r", search_from, len(buf) if lf == -1 else lf)
+            if lf == -1 and cr == -1:
+                self._scan_pos = len(buf)
+                break
+
+            if cr != -1:
+                line_end, next_start = cr, cr + 1
+                if next_start < len(buf):
+                    if buf[next_start] == 0x0A:  # '\r\n'
+                        next_start += 1
+                else:
+                    self._skip_lf = True
+            else:
+                line_end, next_start = lf, lf + 1
+
+            event = self._process_line(bytes(buf[line_start:line_end]).decode("utf-8", errors="replace"))
+            if event is not None:
+                events.append(event)
+            line_start = next_start
+            self._scan_pos = next_start
+
+        # 소비한 줄은 잘라내고, 미완성 줄만 버퍼에 남김
+        if line_start:
+            del buf[:line_start]
+            self._scan_pos -= line_start
+        return events
+
+    def _process_line(self, line: str) -> Optional[SSEEvent]:
+        if not line:  # 빈 줄 = 이벤트 dispatch
+            if not self._data:
+                self._event = ""
+                return None
+            event = SSEEvent(
+                event=self._event or "message",
+                data="\n".join(self._data),
+                id=self._id,
+            )
+            self._event = ""
+            self._data = []
+            return event
+
+        if line.startswith(":"):  # 주석 (keep-alive 등)
+            return None
+
+        field, sep, value = line.partition(":")
+        if sep and value.startswith(" "):
+            value = value[1:]
+
+        if field == "data":
+            self._data.append(value)
+        elif field == "event":
+            self._event = value
+        elif field == "id":
+            self._id = value
+        return None
+
+
+_STREAM_END = object()
+
+
+async def relay_stream(
+    request: Request,
+    source: AsyncGenerator[Any, None],
+    queue_size: int = 64,
+    poll_interval: float = 0.5,
+) -> AsyncGenerator[Any, None]:
+    """
+    upstream 제너레이터(source)를 별도 태스크에서 읽어 bounded queue로 중계
+    - queue가 가득 차면 upstream 읽기를 멈춤 (클라이언트가 느리면 TCP 레벨까지 backpressure 전달)
+    - upstream 대기 중에도 poll_interval 마다 클라이언트 연결 종료를 확인
+    - 연결 종료/제너레이터 종료 시 upstream 태스크를 취소하여 ADK 스트림을 즉시 닫음
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    async def pump():
+        try:
+            async for item in source:
+                await queue.put(item)
+        except Exception as e:
+            await queue.put(e)
+            return
+        await queue.put(_STREAM_END)
+
+    producer = asyncio.create_task(pump())
+    try:
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout=poll_interval)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    print("⚠️ 클라이언트 연결 종료 - upstream 스트림 취소")
+                    return
+                continue
+
+            if item is _STREAM_END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        producer.cancel()
+        with suppress(asyncio.CancelledError):
+            await producer
+        await source.aclose()
@@ -1,47 +1,27 @@
+import asyncio
 from pathlib import Path
-from langchain_community.document_loaders import PyMuPDFLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 from app.core.db.pgvector import get_vectorstore
-from app.core.embedding import GeminiEmbeddings
-from app.config import settings
+from app.core.ingestion import ingest_pdf
+from app.core.retrieval import hybrid_search
 
-embedding_client = GeminiEmbeddings(settings.GOOGLE_API_KEY)
 
-
-# 1. PDF 읽기
+# 1. PDF 읽기 → 청크 분리 → 임베딩 & PGVector에 저장 (바뀐 청크만)
 def get_pdf(file_path: str):
     file_stem = Path(file_path).stem
-    loader = PyMuPDFLoader(file_path)
-    docs = loader.load()
-    # print(f"sample_content: {docs[5].page_content[:300]}")
-    # print(f"sample_metadata: {docs[5].metadata}")
-
-    # 2. 청크 분리
-    splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-    chunked_docs = splitter.split_documents(docs)
-
-    vectorstore = get_vectorstore(collection_name=file_stem)
-    existing_docs = vectorstore.similarity_search("test", k=1)
-    if existing_docs:  # 뭔가 이미 들어있으면
-        print(f"⚡ 이미 컬렉션({file_stem})이 존재합니다. 임베딩 건너뜀.")
-        return vectorstore
-    
-    # 3. 임베딩 & PGVector에 저장
-    texts = [d.page_content for d in chunked_docs]
-    metadatas = [d.metadata for d in chunked_docs]
-    vectorstore.add_texts(texts=texts, metadatas=metadatas)
+    result = ingest_pdf(file_path, collection_name=file_stem)
+    if result.skipped:
+        print(f"⚡ 변경 없음({file_stem}). 임베딩 건너뜀.")
+    else:
+        print(f"✅ PDF 임베딩 & 저장 완료 (추가 {result.added}, 중복 {result.duplicates}, 삭제 {result.removed}, 유지 {result.unchanged})")
 
-    print("✅ PDF 임베딩 & 저장 완료")
-
-    return vectorstore
+    return get_vectorstore(collection_name=file_stem)
 
 
 def search_similar(query: str, file_path: str, top_k: int = 5):
-    embedded_query = embedding_client.embed_query(text=query)
-
-    vectorstore = get_pdf(file_path=file_path)
-    results = vectorstore.similarity_search_by_vector(embedding=embedded_query, k=top_k)
+    get_pdf(file_path=file_path)
+    # 키워드 + 벡터 하이브리드 검색 (인덱스: python -m app.core.db.vector_index create|lexical <컬렉션>)
+    results = [doc for doc, _ in asyncio.run(hybrid_search(Path(file_path).stem, query, k=top_k))]
 
     for tmp_result in results:
         tmp_source = tmp_result.metadata["source"]
@@ -0,0 +1,62 @@
+import json
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from starlette.testclient import TestClient
+
+from app.router import agent as agent_module
+from app.router.agent import agent_router
+
+"""
+/agent/execute/stream 엔드포인트 테스트 (ADK stream_chat 은 가짜 generator로 대체)
+- 실제로 스트림을 끝까지 읽어 metadata → message → result → end 순서와 JSON 직렬화를 확인
+"""
+
+
+def parse_sse(body: str) -> list[tuple[str, str]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = block.split("\n")
+        event = next(line[len("event: "):] for line in lines if line.startswith("event: "))
+        data = "\n".join(line[len("data: "):] for line in lines if line.startswith("data: "))
+        events.append((event, data))
+    return events
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def fake_stream_chat(user_id: str, chat_request: dict):
+        for token in ["안녕", "하세요"]:
+            yield token
+
+    monkeypatch.setattr(agent_module.adk_client, "stream_chat", fake_stream_chat)
+    app = FastAPI()
+    app.include_router(agent_router, prefix="/agent")
+    return TestClient(app)
+
+
+def test_execute_stream_relays_tokens(client):
+    payload = {
+        "user_id": "user-1",
+        "user_uuid": str(uuid.uuid4()),
+        "agent_id": str(uuid.uuid4()),
+        "agent_name": "test_agent",
+        "session_id": str(uuid.uuid4()),
+        "prompt_text": "hello",
+        "attached_files_list": None,
+    }
+    with client.stream("POST", "/agent/execute/stream", json=payload) as response:
+        assert response.status_code == 200
+        body = "".join(response.iter_text())
+
+    events = parse_sse(body)
+    assert [event for event, _ in events] == ["metadata", "message", "message", "result", "end"]
+
+    metadata = json.loads(events[0][1])
+    assert metadata["response"]["agent_id"] == payload["agent_id"]
+    assert metadata["result"]["status"] == "05"
+
+    result = json.loads(events[3][1])
+    assert result["result"]["status"] == "07"
+    assert result["response"]["message_text"] == "안녕하세요"
@@ -0,0 +1,33 @@
+from app.core.dedup import ChunkDeduplicator
+
+"""
+청크 중복 제거 메모리 인덱스 테스트 (manifest 조회는 빈 결과로 대체)
+"""
+
+TEXT = "생성형 AI 기술은 다양한 산업 분야에서 빠르게 확산되고 있으며 기업의 도입 사례도 늘고 있다. "
+
+
+def make_deduplicator(monkeypatch, max_chunks: int) -> ChunkDeduplicator:
+    deduplicator = ChunkDeduplicator("test", max_chunks=max_chunks)
+    monkeypatch.setattr(deduplicator, "_load_collection", lambda matches: ({}, [], {}))
+    return deduplicator
+
+
+def test_exact_and_near_duplicates(monkeypatch):
+    deduplicator = make_deduplicator(monkeypatch, max_chunks=10)
+    matches = deduplicator.check([("a", TEXT), ("b", TEXT.upper()), ("c", TEXT + "추가")])
+    assert [match.duplicate_of for match in matches] == [None, "a", "a"]
+
+
+def test_memory_index_is_bounded(monkeypatch):
+    deduplicator = make_deduplicator(monkeypatch, max_chunks=2)
+    topics = ["반도체 공급망", "클라우드 보안", "자율주행 규제", "디지털 헬스케어", "양자 컴퓨팅"]
+    chunks = [
+        (f"id-{i}", f"{topic} 분야의 최근 동향을 정리하면 {topic} 관련 투자와 정책, 기술 개발이 각각 다른 속도로 진행되고 있다.")
+        for i, topic in enumerate(topics)
+    ]
+    deduplicator.check(chunks)
+    assert list(deduplicator._entries) == ["id-3", "id-4"]
+    assert set(deduplicator._texts) == {"id-3", "id-4"}
+    assert set(deduplicator._exact.values()) == {"id-3", "id-4"}
+    assert {stored_id for bucket in deduplicator._buckets.values() for stored_id in bucket} == {"id-3", "id-4"}
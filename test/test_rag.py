@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.core import rag
+from app.core.metrics import RAG_RETRIEVAL_REQUESTS
+
+"""
+/agent/execute RAG 컬렉션 선택/시간 초과 테스트
+"""
+
+
+@pytest.fixture(autouse=True)
+def rag_settings(monkeypatch):
+    monkeypatch.setattr(settings, "RAG_AGENT_COLLECTIONS", {"docs_agent": ["docs", "docs_v2"], "faq_agent": "faq"})
+    monkeypatch.setattr(settings, "RAG_AGENT_TIMEOUTS", {"faq_agent": 0.01})
+
+
+def test_requested_collection_must_be_configured():
+    assert rag.get_rag_collection("docs_agent") == "docs"
+    assert rag.get_rag_collection("docs_agent", "docs_v2") == "docs_v2"
+    # 다른 에이전트/내부 컬렉션은 무시하고 기본 컬렉션 사용
+    assert rag.get_rag_collection("docs_agent", "faq") == "docs"
+    assert rag.get_rag_collection("docs_agent", settings.SEMANTIC_CACHE_COLLECTION) == "docs"
+    assert rag.get_rag_collection("faq_agent") == "faq"
+    assert rag.get_rag_collection("other_agent", "docs") is None
+
+
+def test_timeout_is_per_agent_and_counted(monkeypatch):
+    async def slow_retrieve(collection_name: str, query: str, k=None):
+        await asyncio.sleep(0.2)
+        return [{"text": "late"}]
+
+    monkeypatch.setattr(rag, "retrieve_context", slow_retrieve)
+    assert rag.get_rag_timeout("faq_agent") == 0.01
+    assert rag.get_rag_timeout("docs_agent") == settings.RAG_TIMEOUT
+
+    async def run():
+        task = rag.start_context_fetch("faq_agent", "hello")
+        return await task
+
+    timeouts = RAG_RETRIEVAL_REQUESTS.labels(result="timeout")
+    before = timeouts._value.get()
+    assert asyncio.run(run()) == []
+    assert timeouts._value.get() == before + 1
@@ -0,0 +1,43 @@
+import pytest
+from fastapi import FastAPI
+from starlette.testclient import TestClient
+
+from app.config import settings
+from app.router import retrieval as retrieval_module
+from app.router.retrieval import retrieval_router
+
+"""
+/retrieval/search 컬렉션 허용 목록 테스트 (search_batch 는 가짜 함수로 대체)
+"""
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def fake_search_batch(collection_name: str, queries: list[str], **kwargs):
+        return [[] for _ in queries]
+
+    monkeypatch.setattr(retrieval_module, "search_batch", fake_search_batch)
+    monkeypatch.setattr(settings, "RAG_AGENT_COLLECTIONS", {"test_agent": "docs"})
+    monkeypatch.setattr(settings, "RETRIEVAL_ALLOWED_COLLECTIONS", [])
+    app = FastAPI()
+    app.include_router(retrieval_router, prefix="/retrieval")
+    return TestClient(app)
+
+
+def test_configured_collection_allowed(client):
+    body = client.post("/retrieval/search", json={"collection_name": "docs", "query": "hello"}).json()
+    assert body["result"]["status"] == "04"
+
+
+def test_internal_collection_rejected(client, monkeypatch):
+    body = client.post(
+        "/retrieval/search", json={"collection_name": settings.SEMANTIC_CACHE_COLLECTION, "query": "hello"}
+    ).json()
+    assert body["result"]["status"] == "99"
+
+    # 허용 목록에 넣어도 시맨틱 캐시 컬렉션은 검색 불가
+    monkeypatch.setattr(settings, "RETRIEVAL_ALLOWED_COLLECTIONS", [settings.SEMANTIC_CACHE_COLLECTION])
+    body = client.post(
+        "/retrieval/search/batch", json={"collection_name": settings.SEMANTIC_CACHE_COLLECTION, "queries": ["a"]}
+    ).json()
+    assert body["result"]["status"] == "99"
@@ -0,0 +1,50 @@
+from datetime import datetime
+
+import pytest
+
+from app.core.scheduler import KST, is_one_off, next_run_time
+from app.model.agent_models import UIDeploySchDetail
+
+"""
+예약 배포 실행 주기(agent_sch_exec_cycle) 해석 테스트
+"""
+
+# 2026-10-18 (일) 12:00 KST
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=KST)
+
+
+def detail(cycle: str, week: list[str] = [], month: list[str] = [], time: str = "09:00") -> UIDeploySchDetail:
+    return UIDeploySchDetail(
+        agent_sch_exec_cycle=cycle,
+        agent_sch_exect_week=week,
+        agent_sch_exec_month=month,
+        agent_sch_exec_time=time,
+        agent_sch_init_message="",
+    )
+
+
+def test_one_off():
+    assert is_one_off(detail("02"))
+    assert next_run_time(detail("02"), NOW) == datetime(2026, 10, 19, 9, 0, tzinfo=KST)
+
+
+def test_daily():
+    assert not is_one_off(detail("03"))
+    assert next_run_time(detail("03", time="13:00"), NOW) == datetime(2026, 10, 18, 13, 0, tzinfo=KST)
+
+
+def test_weekly_requires_weekday():
+    assert next_run_time(detail("04", week=["WED"]), NOW) == datetime(2026, 10, 21, 9, 0, tzinfo=KST)
+    with pytest.raises(ValueError):
+        next_run_time(detail("04"), NOW)
+
+
+def test_monthly_first_matching_day():
+    assert next_run_time(detail("05"), NOW) == datetime(2026, 11, 1, 9, 0, tzinfo=KST)
+    # 매월 첫 월요일
+    assert next_run_time(detail("05", week=["MON"]), NOW) == datetime(2026, 11, 2, 9, 0, tzinfo=KST)
+
+
+def test_unknown_cycle():
+    with pytest.raises(ValueError):
+        next_run_time(detail("99"), NOW)
@@ -0,0 +1,26 @@
+import uuid
+
+from fastapi import FastAPI
+from starlette.testclient import TestClient
+
+from app.router.sessions import session_router
+
+"""
+/agent/session/history/stream 요청 검증 테스트 (DB 조회 전에 거절되는 경우만)
+"""
+
+
+def test_from_snapshot_with_cursor_rejected():
+    app = FastAPI()
+    app.include_router(session_router, prefix="/agent/session")
+    payload = {
+        "user_id": "user-1",
+        "user_uuid": str(uuid.uuid4()),
+        "agent_id": str(uuid.uuid4()),
+        "agent_name": "test_agent",
+        "session_id": str(uuid.uuid4()),
+        "cursor": "WyIyMDI2LTEwLTE4VDAwOjAwOjAwIiwgImEiXQ==",
+        "from_snapshot": True,
+    }
+    response = TestClient(app).post("/agent/session/history/stream", json=payload)
+    assert response.status_code == 422
@@ -0,0 +1,38 @@
+import asyncio
+
+from app.config import settings
+from app.core import session_pool
+
+"""
+ADK 세션 사전 생성 풀 키 정규화 테스트 (ADK 호출은 가짜 함수로 대체)
+"""
+
+
+def test_pool_key_uses_sanitized_agent_name(monkeypatch):
+    created, deleted = [], []
+
+    async def fake_create(user_id: str, agent_name: str) -> str:
+        created.append(agent_name)
+        return f"session-{len(created)}"
+
+    async def fake_delete(user_id: str, agent_name: str, session_id: str):
+        deleted.append((agent_name, session_id))
+
+    monkeypatch.setattr(session_pool, "create_adk_session", fake_create)
+    monkeypatch.setattr(session_pool, "_delete_adk_session", fake_delete)
+    monkeypatch.setattr(settings, "SESSION_POOL_SIZE", 1)
+    monkeypatch.setattr(session_pool, "_pools", {})
+    monkeypatch.setattr(session_pool, "_refill_pending", set())
+
+    async def run():
+        monkeypatch.setattr(session_pool, "_refill_queue", asyncio.Queue())
+        await session_pool.acquire_session("user-1", "my agent!")
+        key = ("user-1", "my_agent")
+        assert key in session_pool._pools
+        session_pool._pools[key].append(("pooled", 0.0))
+        await session_pool.drop_pool("user-1", "my agent!")
+        assert key not in session_pool._pools
+
+    asyncio.run(run())
+    assert created == ["my_agent"]
+    assert deleted == [("my_agent", "pooled")]
@@ -0,0 +1,37 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy.exc import ProgrammingError
+
+from app.core import tool_resolver
+from app.core.tool_resolver import ToolResolutionError, resolve_tool_names
+
+"""
+MCP 툴 ID → 이름 변환 실패 처리 테스트 (Redis/DB는 가짜 객체로 대체)
+"""
+
+
+class EmptyRedis:
+    async def mget(self, keys):
+        return [None] * len(keys)
+
+
+class BrokenSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt):
+        raise ProgrammingError("SELECT ...", {}, Exception('relation "mcp_tools" does not exist'))
+
+
+def test_db_error_becomes_tool_resolution_error(monkeypatch):
+    monkeypatch.setattr(tool_resolver, "redis_client", EmptyRedis())
+    monkeypatch.setattr(tool_resolver, "async_session_factory", BrokenSession)
+    monkeypatch.setattr(tool_resolver, "_local_cache", {})
+
+    with pytest.raises(ToolResolutionError):
+        asyncio.run(resolve_tool_names([uuid.uuid4()]))